@@ -0,0 +1,226 @@
+"""
+Бенчмарк накладных расходов декоратора `strict`.
+
+Сравнивает вызовы «голой» функции и той же функции, обёрнутой в `strict`,
+для позиционной, именованной и смешанной передачи 1, 4 и 16 аргументов,
+а также путь с ошибкой `TypeError`.
+
+    python -m task1.benchmark --output strict_baseline.json
+    python -m task1.benchmark --compare strict_baseline.json --threshold 0.25
+
+Режим `--startup N` измеряет время «импорта» модуля из N функций без strict,
+с немедленной компиляцией обёрток и со `strict_module` (ленивая компиляция).
+"""
+import argparse
+import json
+import platform
+import sys
+import time
+import timeit
+import tracemalloc
+import types
+from typing import Any, Callable
+
+from .solution import strict, strict_module
+
+PARAM_COUNTS = (1, 4, 16)
+CALL_KINDS = ('positional', 'keyword', 'mixed')
+
+
+def make_function(param_count: int) -> Callable:
+    """Создаёт функцию с `param_count` параметрами типа int."""
+    params = ', '.join(f'p{i}: int' for i in range(param_count))
+    namespace: dict[str, Any] = {}
+    exec(f"def f({params}) -> int:\n    return p0\n", namespace)
+    return namespace['f']
+
+
+def make_call_args(param_count: int, call_kind: str) -> tuple[tuple, dict]:
+    values = list(range(param_count))
+    if call_kind == 'positional':
+        return tuple(values), {}
+    if call_kind == 'keyword':
+        return (), {f'p{i}': value for i, value in enumerate(values)}
+    split = (param_count + 1) // 2
+    return tuple(values[:split]), {f'p{i}': values[i] for i in range(split, param_count)}
+
+
+def make_cases() -> dict[str, tuple[Callable, Callable]]:
+    """Возвращает {имя случая: (голый вызов, вызов через strict)} без аргументов."""
+    cases = {}
+    for param_count in PARAM_COUNTS:
+        func = make_function(param_count)
+        decorated = strict(func)
+        for call_kind in CALL_KINDS:
+            args, kwargs = make_call_args(param_count, call_kind)
+            cases[f'{call_kind}_{param_count}'] = (
+                lambda f=func, a=args, k=kwargs: f(*a, **k),
+                lambda f=decorated, a=args, k=kwargs: f(*a, **k),
+            )
+
+    func = make_function(4)
+    decorated = strict(func)
+    bad_args = (0, 1, 2, 3.0)
+
+    def failing_call() -> None:
+        try:
+            decorated(*bad_args)
+        except TypeError:
+            pass
+
+    cases['type_error_4'] = (lambda: func(*bad_args), failing_call)
+    return cases
+
+
+def time_call(call: Callable, number: int, repeat: int) -> float:
+    """Лучшее время одного вызова в наносекундах."""
+    timings = timeit.repeat(call, number=number, repeat=repeat)
+    return min(timings) / number * 1e9
+
+
+def allocated_per_call(call: Callable, number: int = 1000) -> float:
+    """
+    Сколько байт выделяет один вызов, в среднем по `number` вызовам: перед
+    каждым вызовом сбрасывается пик tracemalloc, после — берётся его прирост.
+    Учитываются и временные объекты, освобождённые к концу вызова (кроме
+    взятых из free list интерпретатора, например небольших словарей).
+    """
+    call()  # прогрев: кэши и ленивые структуры не должны попадать в замер
+    total = 0
+    tracemalloc.start()
+    try:
+        for _ in range(number):
+            before = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+            call()
+            total += tracemalloc.get_traced_memory()[1] - before
+    finally:
+        tracemalloc.stop()
+    return round(total / number, 1)
+
+
+def run_benchmark(number: int = 100_000, repeat: int = 5) -> dict[str, dict[str, float]]:
+    results = {}
+    for name, (bare_call, strict_call) in make_cases().items():
+        bare_ns = time_call(bare_call, number, repeat)
+        strict_ns = time_call(strict_call, number, repeat)
+        results[name] = {
+            'bare_ns': round(bare_ns, 1),
+            'strict_ns': round(strict_ns, 1),
+            'overhead_ns': round(strict_ns - bare_ns, 1),
+            'bare_bytes': allocated_per_call(bare_call),
+            'strict_bytes': allocated_per_call(strict_call),
+        }
+    return results
+
+
+def compare_results(baseline: dict[str, dict[str, float]],
+                    current: dict[str, dict[str, float]],
+                    threshold: float, min_delta_ns: float) -> list[str]:
+    """
+    Возвращает список регрессий: случаи, где накладные расходы выросли больше
+    чем на `threshold` (доля) и одновременно больше чем на `min_delta_ns`.
+    """
+    regressions = []
+    for name, base in baseline.items():
+        if name not in current:
+            continue
+        base_overhead = max(base['overhead_ns'], 0.0)
+        overhead = current[name]['overhead_ns']
+        delta = overhead - base_overhead
+        if delta > min_delta_ns and overhead > base_overhead * (1 + threshold):
+            regressions.append(
+                f"{name}: {base_overhead:.1f} -> {overhead:.1f} нс/вызов (+{delta:.1f})"
+            )
+    return regressions
+
+
+def make_module_source(function_count: int, param_count: int = 4) -> str:
+    params = ', '.join(f'p{i}: int' for i in range(param_count))
+    return ''.join(f"def f{n}({params}) -> int:\n    return p0\n\n"
+                   for n in range(function_count))
+
+
+def run_startup_benchmark(function_count: int, repeat: int = 5) -> dict[str, float]:
+    """Лучшее время (мс) создания модуля из `function_count` функций в трёх режимах."""
+    code = compile(make_module_source(function_count), '<strict_startup>', 'exec')
+
+    def load(mode: str) -> types.ModuleType:
+        module = types.ModuleType(f'strict_startup_{mode}')
+        exec(code, vars(module))
+        if mode == 'eager':
+            for name in [name for name in vars(module) if name.startswith('f')]:
+                setattr(module, name, strict(getattr(module, name)))
+        elif mode == 'lazy':
+            strict_module(module)
+        return module
+
+    results = {}
+    for mode in ('bare', 'eager', 'lazy'):
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            load(mode)
+            timings.append(time.perf_counter() - started)
+        results[f'{mode}_ms'] = round(min(timings) * 1e3, 2)
+
+    module = load('lazy')
+    started = time.perf_counter_ns()
+    module.f0(0, 1, 2, 3)
+    results['lazy_first_call_us'] = round((time.perf_counter_ns() - started) / 1e3, 1)
+    return results
+
+
+def format_table(results: dict[str, dict[str, float]]) -> str:
+    header = (f"{'случай':<16}{'bare, нс':>12}{'strict, нс':>12}{'overhead, нс':>14}"
+              f"{'bare, Б':>10}{'strict, Б':>11}")
+    rows = [header]
+    for name, r in results.items():
+        rows.append(f"{name:<16}{r['bare_ns']:>12.1f}{r['strict_ns']:>12.1f}"
+                    f"{r['overhead_ns']:>14.1f}{r['bare_bytes']:>10.1f}{r['strict_bytes']:>11.1f}")
+    return '\n'.join(rows)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--number', type=int, default=100_000,
+                        help='вызовов в одном замере')
+    parser.add_argument('--repeat', type=int, default=5, help='число замеров')
+    parser.add_argument('--output', help='записать результаты в JSON как baseline')
+    parser.add_argument('--compare', help='JSON baseline для сравнения')
+    parser.add_argument('--threshold', type=float, default=0.25,
+                        help='допустимый относительный рост overhead (0.25 = 25%%)')
+    parser.add_argument('--min-delta-ns', type=float, default=20.0,
+                        help='рост overhead меньше этого порога считается шумом')
+    parser.add_argument('--startup', type=int, metavar='N',
+                        help='измерить время загрузки модуля из N функций')
+    args = parser.parse_args(argv)
+
+    if args.startup:
+        for name, value in run_startup_benchmark(args.startup, args.repeat).items():
+            print(f"{name:<20}{value:>10}")
+        return 0
+
+    results = run_benchmark(number=args.number, repeat=args.repeat)
+    print(format_table(results))
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({'python': platform.python_version(), 'results': results},
+                      f, ensure_ascii=False, indent=2)
+        print(f"Baseline записан в {args.output}")
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            baseline = json.load(f)['results']
+        regressions = compare_results(baseline, results, args.threshold, args.min_delta_ns)
+        if regressions:
+            print("Регрессия накладных расходов strict:")
+            print('\n'.join(regressions))
+            return 1
+        print("Регрессий нет")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,203 @@
+"""
+Компилятор проверок для аннотаций `strict`.
+
+Каждая аннотация (`int`, `list[int]`, `dict[str, float]`, `Optional[int]`,
+`int | str`, `tuple[int, ...]`, ...) один раз превращается в специализированную
+функцию `checker(value) -> bool`. Проверки кэшируются (LRU, `CACHE_SIZE`
+записей) по значению аннотации и стратегии обхода контейнеров; нехешируемые
+аннотации компилируются заново при каждом обращении.
+"""
+import types
+from functools import lru_cache
+from itertools import chain, islice
+from typing import Any, Callable, NamedTuple, Union, get_args, get_origin
+
+Checker = Callable[[Any], bool]
+
+_CONCRETE_CONTAINERS = (list, tuple, dict, set, frozenset)
+_UNION_ORIGINS = (Union, types.UnionType)
+CACHE_SIZE = 1024
+
+
+class ContainerStrategy(NamedTuple):
+    """
+    Как проверять элементы контейнеров длиннее `threshold`.
+
+    `full` — все элементы, `sample` — первые и последние `k` элементов списков и
+    кортежей, но только первые `k` ключей словарей и элементов множеств (в порядке
+    итерации: у множества нет «конца»), `length` — только тип самого контейнера.
+    Контейнеры не длиннее `threshold` всегда проверяются целиком.
+    """
+    mode: str = 'full'
+    threshold: int = 1000
+    k: int = 16
+
+
+FULL_SCAN = ContainerStrategy('full')
+LENGTH_ONLY = ContainerStrategy('length', threshold=0)
+
+
+def sample_edges(k: int = 16, threshold: int = 1000) -> ContainerStrategy:
+    """Проверять у больших контейнеров только крайние `k` элементов (см. ContainerStrategy)."""
+    if k < 1:
+        raise ValueError(f"Размер выборки должен быть положительным, получен {k}")
+    return ContainerStrategy('sample', threshold, k)
+
+
+def is_bare_class(annotation: Any) -> bool:
+    # list[int] (и Any начиная с 3.11) тоже проходят isinstance(..., type)
+    return isinstance(annotation, type) and annotation is not Any and not get_args(annotation)
+
+
+def type_name(annotation: Any) -> str:
+    """Имя аннотации для сообщений об ошибках."""
+    if is_bare_class(annotation):
+        return annotation.__name__
+    return repr(annotation).replace('typing.', '')
+
+
+def compile_checker(annotation: Any, strategy: ContainerStrategy = FULL_SCAN) -> Checker | None:
+    """
+    Возвращает проверку для аннотации или None, если аннотация ничего не ограничивает
+    (`Any`, строковые и прочие неподдерживаемые аннотации).
+    """
+    try:
+        hash(annotation)
+    except TypeError:  # например, Annotated с изменяемыми метаданными
+        return _compile(annotation, strategy)
+    return _compile_cached(annotation, strategy)
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _compile_cached(annotation: Any, strategy: ContainerStrategy) -> Checker | None:
+    return _compile(annotation, strategy)
+
+
+def _compile(annotation: Any, strategy: ContainerStrategy) -> Checker | None:
+    if annotation is Any:
+        return None
+    if annotation is None:
+        annotation = type(None)
+
+    origin = get_origin(annotation)
+    args = get_args(annotation)
+
+    if origin in _UNION_ORIGINS:
+        return _compile_union(args, strategy)
+    if origin is None:
+        if is_bare_class(annotation):
+            return lambda value: type(value) is annotation
+        return None
+    if not isinstance(origin, type):
+        return None
+
+    if origin in _CONCRETE_CONTAINERS:
+        def is_container(value: Any) -> bool:
+            return type(value) is origin
+    else:
+        def is_container(value: Any) -> bool:
+            return isinstance(value, origin)
+
+    if not args:
+        return is_container
+    if origin is tuple:
+        return _compile_tuple(args, is_container, strategy)
+    if issubclass(origin, dict) and len(args) == 2:
+        return _compile_mapping(args, is_container, strategy)
+    if issubclass(origin, (list, set, frozenset)) and len(args) == 1:
+        return _compile_collection(args[0], is_container, strategy)
+    return is_container
+
+
+def _compile_union(args: tuple, strategy: ContainerStrategy) -> Checker | None:
+    exact_types = set()
+    others = []
+    for arg in args:
+        if is_bare_class(arg):
+            exact_types.add(arg)
+            continue
+        checker = compile_checker(arg, strategy)
+        if checker is None:
+            return None
+        others.append(checker)
+    exact_types = frozenset(exact_types)
+    if not others:
+        return lambda value: type(value) in exact_types
+    return lambda value: (type(value) in exact_types
+                          or any(check(value) for check in others))
+
+
+def _items_to_check(items: Any, strategy: ContainerStrategy) -> Any:
+    """Элементы, которые проверяются при данной стратегии (или None — не проверять)."""
+    if strategy.mode == 'full' or len(items) <= strategy.threshold:
+        return items
+    if strategy.mode == 'length':
+        return None
+    k = strategy.k
+    if isinstance(items, (list, tuple)):
+        return chain(items[:k], items[-k:])
+    return islice(items, k)
+
+
+def _all_match(element_checker: Checker | None, element: Any) -> Callable[[Any], bool]:
+    """Быстрая проверка всех элементов: для голого класса — без вызова функции на элемент."""
+    if element_checker is None:
+        return lambda items: True
+    if is_bare_class(element):
+        def all_exact(items: Any) -> bool:
+            for item in items:
+                if type(item) is not element:
+                    return False
+            return True
+        return all_exact
+
+    def all_checked(items: Any) -> bool:
+        for item in items:
+            if not element_checker(item):
+                return False
+        return True
+    return all_checked
+
+
+def _compile_collection(element: Any, is_container: Checker,
+                        strategy: ContainerStrategy) -> Checker:
+    all_match = _all_match(compile_checker(element, strategy), element)
+
+    def check(value: Any) -> bool:
+        if not is_container(value):
+            return False
+        items = _items_to_check(value, strategy)
+        return items is None or all_match(items)
+    return check
+
+
+def _compile_mapping(args: tuple, is_container: Checker, strategy: ContainerStrategy) -> Checker:
+    keys_match = _all_match(compile_checker(args[0], strategy), args[0])
+    values_match = _all_match(compile_checker(args[1], strategy), args[1])
+
+    def check(value: Any) -> bool:
+        if not is_container(value):
+            return False
+        keys = _items_to_check(value, strategy)
+        if keys is None:
+            return True
+        if keys is value:
+            return keys_match(value.keys()) and values_match(value.values())
+        keys = list(keys)
+        return keys_match(keys) and values_match([value[key] for key in keys])
+    return check
+
+
+def _compile_tuple(args: tuple, is_container: Checker, strategy: ContainerStrategy) -> Checker:
+    if len(args) == 2 and args[1] is Ellipsis:
+        return _compile_collection(args[0], is_container, strategy)
+    element_checkers = tuple(compile_checker(arg, strategy) for arg in args)
+
+    def check(value: Any) -> bool:
+        if not is_container(value) or len(value) != len(element_checkers):
+            return False
+        for element_checker, item in zip(element_checkers, value):
+            if element_checker is not None and not element_checker(item):
+                return False
+        return True
+    return check
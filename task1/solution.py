@@ -1,38 +1,612 @@
-from inspect import signature
+import collections.abc
+import os
+import re
+import sys
+import warnings
+import weakref
+from inspect import (Parameter, isasyncgenfunction, iscoroutinefunction, isfunction,
+                     isgeneratorfunction, signature)
 from functools import wraps
-from typing import Callable
+from time import perf_counter_ns
+from types import ModuleType
+from typing import Any, Callable, NamedTuple, get_args, get_origin, get_type_hints
 
+from .checkers import (FULL_SCAN, Checker, ContainerStrategy, compile_checker,
+                       is_bare_class, type_name)
 
-def strict(func: Callable):
-    @wraps(func)
-    def wrapper(*args, **kwargs):
-        args_kwargs = {
-            **{param_name: arg_value for (param_name, _), arg_value
-               in zip(signature(func).parameters.items(), args)},
-            **kwargs
-        }
+POLICY_ENV_VAR = 'STRICT_POLICY'
+STATS_ENV_VAR = 'STRICT_STATS'
 
-        for arg_name, arg_value in args_kwargs.items():
-            expected_type = func.__annotations__.get(arg_name)
-            if expected_type and type(arg_value) is not expected_type:
-                raise TypeError(
-                    f"Аргумент {arg_name} должен быть типа {expected_type.__name__}, "
-                    f"получен {type(arg_value).__name__}"
-                )
+_POSITIONAL_KINDS = (Parameter.POSITIONAL_ONLY, Parameter.POSITIONAL_OR_KEYWORD)
+_SAMPLE_RE = re.compile(r'sample\(\s*(\d+)\s*\)')
+_ITERATOR_ORIGINS = (
+    collections.abc.Iterator, collections.abc.Iterable, collections.abc.Generator,
+    collections.abc.AsyncIterator, collections.abc.AsyncIterable, collections.abc.AsyncGenerator,
+)
 
-        return func(*args, **kwargs)
 
+class Policy(NamedTuple):
+    """Политика проверки: `always`, `sample` (каждый `every`-й вызов) или `off`."""
+    mode: str
+    every: int = 1
+
+
+ALWAYS = Policy('always')
+OFF = Policy('off')
+
+
+def sample(every: int) -> Policy:
+    """Проверять один вызов из `every`."""
+    if every < 1:
+        raise ValueError(f"Период выборки должен быть положительным, получен {every}")
+    return Policy('sample', every)
+
+
+def parse_policy(value: str) -> Policy:
+    """Разбирает строку вида `always`, `off` или `sample(100)`."""
+    value = value.strip().lower()
+    if value == 'always':
+        return ALWAYS
+    if value == 'off':
+        return OFF
+    match = _SAMPLE_RE.fullmatch(value)
+    if match:
+        return sample(int(match.group(1)))
+    raise ValueError(f"Неизвестная политика strict: {value!r}")
+
+
+def _coerce_policy(policy: Policy | str) -> Policy:
+    return parse_policy(policy) if isinstance(policy, str) else policy
+
+
+# Читается один раз при импорте; дальше меняется только через set_default_policy
+_default_policy = parse_policy(os.environ.get(POLICY_ENV_VAR, 'always'))
+
+
+def set_default_policy(policy: Policy | str) -> None:
+    """Задаёт глобальную политику для функций, декорируемых после вызова."""
+    global _default_policy
+    _default_policy = _coerce_policy(policy)
+
+
+def get_default_policy() -> Policy:
+    return _default_policy
+
+
+_default_containers = FULL_SCAN
+
+
+def set_default_container_strategy(containers: ContainerStrategy) -> None:
+    """Задаёт глобальную стратегию проверки больших контейнеров."""
+    global _default_containers
+    _default_containers = containers
+
+
+def get_default_container_strategy() -> ContainerStrategy:
+    return _default_containers
+
+
+_default_stats = os.environ.get(STATS_ENV_VAR, '').strip().lower() in ('1', 'true', 'yes', 'on')
+
+
+def set_default_stats(enabled: bool) -> None:
+    """Включает сбор счётчиков для функций, декорируемых после вызова."""
+    global _default_stats
+    _default_stats = enabled
+
+
+class _Counters:
+    """Счётчики одной функции; обновляются на месте, без аллокаций на вызов."""
+    __slots__ = ('name', 'calls', 'violations', 'check_ns', 'body_ns', '__weakref__')
+    FIELDS = ('calls', 'violations', 'check_ns', 'body_ns')
+
+    def __init__(self, name: str):
+        self.name = name
+        self.reset()
+
+    def reset(self) -> None:
+        self.calls = 0
+        self.violations = 0
+        self.check_ns = 0
+        self.body_ns = 0
+
+
+# Счётчики живут в обёртке (`__strict_counters__`); реестр держит их слабо, чтобы
+# выброшенные или передекорированные функции не оставались в `stats()` навсегда.
+_counters: 'weakref.WeakValueDictionary[int, _Counters]' = weakref.WeakValueDictionary()
+
+
+def stats() -> dict[str, dict[str, int]]:
+    """
+    Снимок счётчиков по функциям с `stats=True` и их сброс.
+
+    Для каждой функции: число вызовов, число нарушений типов и суммарное время
+    (нс) в проверках и в теле функции. Для корутин и генераторов время тела —
+    это время до их завершения, включая ожидание и время потребителя.
+    """
+    snapshot: dict[str, dict[str, int]] = {}
+    for counters in list(_counters.values()):
+        if not counters.calls:
+            continue
+        entry = snapshot.setdefault(counters.name, dict.fromkeys(_Counters.FIELDS, 0))
+        for field in _Counters.FIELDS:
+            entry[field] += getattr(counters, field)
+        counters.reset()
+    return snapshot
+
+
+def _type_error(arg_name: str, expected_type: Any, arg_value: Any) -> TypeError:
+    return TypeError(
+        f"Аргумент {arg_name} должен быть типа {type_name(expected_type)}, "
+        f"получен {type(arg_value).__name__}"
+    )
+
+
+ArgSpec = tuple[str, Any, Checker | None]  # имя, аннотация, проверка (None — не проверять)
+
+
+def _resolve_annotations(func: Callable, check_return: bool) -> dict[str, Any]:
+    """
+    Аннотации `func` со строками, вычисленными в её модуле (`from __future__ import
+    annotations`, ссылки вперёд). Если имя ещё не определено, берутся исходные
+    аннотации с предупреждением: строковые из них не проверяются.
+    """
+    annotations = func.__annotations__
+    # Без строк на верхнем уровне (среди проверяемых) вычислять нечего —
+    # не платим за get_type_hints
+    if not any(isinstance(annotation, str) for name, annotation in annotations.items()
+               if check_return or name != 'return'):
+        return annotations
+    try:
+        return get_type_hints(func, include_extras=True)
+    except Exception as exc:
+        warnings.warn(f"strict: не удалось вычислить аннотации {func.__qualname__} ({exc}); "
+                      f"строковые аннотации не проверяются", RuntimeWarning)
+        return annotations
+
+
+def _build_tables(func: Callable, annotations: dict[str, Any], containers: ContainerStrategy
+                  ) -> tuple[tuple[ArgSpec, ...], dict[str, ArgSpec]]:
+    """Таблица «позиция -> аргумент» и таблица «имя -> аргумент» для именованной передачи."""
+    positional = []
+    by_name = {}
+    for param in signature(func).parameters.values():
+        annotation = annotations.get(param.name)
+        checker = None if annotation is None else compile_checker(annotation, containers)
+        spec = (param.name, annotation, checker)
+        if param.kind in _POSITIONAL_KINDS:
+            positional.append(spec)
+        if checker is not None and param.kind is not Parameter.POSITIONAL_ONLY:
+            by_name[param.name] = spec
+    return tuple(positional), by_name
+
+
+def _make_generic_check(positional: tuple[ArgSpec, ...],
+                        by_name: dict[str, ArgSpec]) -> Callable[[tuple, dict], None]:
+    """
+    Проверка для произвольной смеси позиционных и именованных аргументов.
+    Совпадение `type(x) is annotation` для голых классов проверяется без вызова checker.
+    """
+    def check(args: tuple, kwargs: dict) -> None:
+        for (arg_name, annotation, checker), arg_value in zip(positional, args):
+            if (checker is not None and type(arg_value) is not annotation
+                    and not checker(arg_value)):
+                raise _type_error(arg_name, annotation, arg_value)
+        for arg_name, arg_value in kwargs.items():
+            spec = by_name.get(arg_name)
+            if (spec is not None and type(arg_value) is not spec[1]
+                    and not spec[2](arg_value)):
+                raise _type_error(arg_name, spec[1], arg_value)
+
+    return check
+
+
+def _function_kind(func: Callable) -> str:
+    if iscoroutinefunction(func):
+        return 'coroutine'
+    if isasyncgenfunction(func):
+        return 'async_generator'
+    if isgeneratorfunction(func):
+        return 'generator'
+    return 'function'
+
+
+def _result_annotation(annotations: dict[str, Any], kind: str) -> Any:
+    """Аннотация результата: возвращаемого (или ожидаемого) значения либо элементов генератора."""
+    annotation = annotations.get('return')
+    if kind in ('function', 'coroutine'):
+        return annotation
+    if get_origin(annotation) in _ITERATOR_ORIGINS and get_args(annotation):
+        return get_args(annotation)[0]
+    return None
+
+
+def _result_error(kind: str, expected_type: Any, value: Any) -> TypeError:
+    subject = ("Значение, выданное генератором," if kind.endswith('generator')
+               else "Возвращаемое значение")
+    return TypeError(
+        f"{subject} должно быть типа {type_name(expected_type)}, "
+        f"получен {type(value).__name__}"
+    )
+
+
+def _indent(lines: list[str], level: int = 1) -> list[str]:
+    return [' ' * (4 * level) + line for line in lines]
+
+
+def _raise_source(result_check: str | None, with_stats: bool) -> list[str]:
+    """Строки, бросающие TypeError, если значение `value` нарушает `result_check`."""
+    if not result_check:
+        return []
+    return [f"if {result_check}:",
+            *(["    counters.violations += 1"] if with_stats else []),
+            "    raise result_error(kind, rt, value)"]
+
+
+def _call_source(kind: str, call: str, result_check: str | None,
+                 with_stats: bool = False) -> list[str]:
+    """
+    Строки, вызывающие `func` так, как этого требует её вид: `await` для корутин.
+    Генератор (обычный или асинхронный) возвращается сразу, чтобы аргументы
+    проверялись при вызове, а не при первом `next()`; если нужно проверять
+    элементы или считать время, он оборачивается в `items` (см. `_items_source`).
+    `result_check` — условие нарушения для значения `value` (None — не проверять).
+    """
+    if kind.endswith('generator'):
+        if not result_check and not with_stats:
+            return [f"return {call}"]
+        return [f"return items({call}{', checked' if with_stats else ''})"]
+    call = f"await {call}" if kind == 'coroutine' else call
+    if not result_check:
+        return [f"return {call}"]
+    return [f"value = {call}", *_raise_source(result_check, with_stats), "return value"]
+
+
+def _items_source(kind: str, result_check: str | None, with_stats: bool) -> list[str]:
+    """
+    Генератор `items`, через который обёртка отдаёт элементы генератора `func`:
+    проверяет каждый элемент и, с `with_stats`, считает время тела до закрытия.
+    Как `yield from` (PEP 380), пересылает send/throw (asend/athrow) во вложенный генератор.
+    """
+    raise_lines = _raise_source(result_check, with_stats)
+    if kind == 'generator':
+        header = "def items(gen, checked):" if with_stats else "def items(gen):"
+        body = ["return (yield from gen)"] if not result_check else [
+            "try:",
+            "    value = next(gen)",
+            "    while True:",
+            *_indent(raise_lines, 2),
+            "        try:",
+            "            sent = yield value",
+            "        except GeneratorExit:",
+            "            raise",
+            "        except BaseException as exc:",
+            "            value = gen.throw(exc)",
+            "        else:",
+            "            value = gen.send(sent)",
+            "except StopIteration as stop:",
+            "    return stop.value",
+            "finally:",
+            "    gen.close()"]
+    else:
+        header = "async def items(agen, checked):" if with_stats else "async def items(agen):"
+        body = [
+            "try:",
+            "    value = await agen.__anext__()",
+            "    while True:",
+            *_indent(raise_lines, 2),
+            "        try:",
+            "            sent = yield value",
+            "        except GeneratorExit:",
+            "            raise",
+            "        except BaseException as exc:",
+            "            value = await agen.athrow(exc)",
+            "        else:",
+            "            value = await agen.asend(sent)",
+            "except StopAsyncIteration:",
+            "    return",
+            "finally:",
+            "    await agen.aclose()"]
+    if with_stats:
+        body = ["try:",
+                *_indent(body),
+                "finally:",
+                "    counters.body_ns += perf_counter_ns() - checked"]
+    return [header, *_indent(body)]
+
+
+def _compile_wrapper(func: Callable, policy: Policy, containers: ContainerStrategy,
+                     check_return: bool, counters: _Counters | None = None) -> Callable:
+    """
+    Генерирует обёртку под конкретную функцию.
+
+    Для частого случая «все аргументы позиционные» проверка сводится к нескольким
+    сравнениям `type(x) is T` (для голых классов) или вызовам заранее
+    скомпилированных проверок (для контейнеров и объединений); остальные вызовы
+    проходят через таблицы из `_build_tables`. При политике `sample(n)`
+    обёртка ведёт обратный счётчик и проверяет только каждый n-й вызов.
+
+    Для корутины обёртка — `async def`; для генераторов — обычная функция,
+    которая проверяет аргументы сразу при вызове и возвращает генератор.
+    Результат или каждый выданный элемент проверяется только при `check_return`.
+    С `counters` обёртка дополнительно считает вызовы, нарушения и время в
+    проверках и в теле функции (для генераторов — до их закрытия).
+    """
+    kind = _function_kind(func)
+    annotations = _resolve_annotations(func, check_return)
+    positional, by_name = _build_tables(func, annotations, containers)
+    closure: dict[str, Any] = {
+        'func': func,
+        'kind': kind,
+        'check_generic': _make_generic_check(positional, by_name),
+        'type_error': _type_error,
+        'result_error': _result_error,
+    }
+
+    result_check = None
+    result_annotation = _result_annotation(annotations, kind) if check_return else None
+    result_checker = (None if result_annotation is None
+                      else compile_checker(result_annotation, containers))
+    if result_checker is not None:
+        closure['rt'] = result_annotation
+        if is_bare_class(result_annotation):
+            result_check = "type(value) is not rt"
+        else:
+            closure['rc'] = result_checker
+            result_check = "not rc(value)"
+
+    checks = [f"if kwargs or len(args) != {len(positional)}:",
+              "    check_generic(args, kwargs)"]
+    fast_checks = []
+    for index, (arg_name, annotation, checker) in enumerate(positional):
+        if checker is None:
+            continue
+        closure[f't{index}'] = annotation
+        if is_bare_class(annotation):
+            condition = f"type(args[{index}]) is not t{index}"
+        else:
+            closure[f'c{index}'] = checker
+            condition = f"not c{index}(args[{index}])"
+        fast_checks += [f"if {condition}:",
+                        f"    raise type_error({arg_name!r}, t{index}, args[{index}])"]
+    sampled = policy.mode == 'sample' and policy.every > 1
+
+    if counters is None:
+        lines = []
+        if sampled:
+            lines += ["nonlocal countdown",
+                      "countdown -= 1",
+                      "if countdown:",
+                      *_indent(_call_source(kind, "func(*args, **kwargs)", None)),
+                      f"countdown = {policy.every}"]
+        lines += [*checks,
+                  *_indent(_call_source(kind, "func(*args, **kwargs)", result_check)),
+                  *fast_checks,
+                  *_call_source(kind, "func(*args)", result_check)]
+    else:
+        # С замерами проверки и вызов разнесены, чтобы время считалось раздельно
+        closure['counters'] = counters
+        closure['perf_counter_ns'] = perf_counter_ns
+        checks += ["else:", *_indent(fast_checks or ["pass"])]
+        guarded = ["try:",
+                   *_indent(checks),
+                   "except TypeError:",
+                   "    counters.violations += 1",
+                   "    raise",
+                   "finally:",
+                   "    checked = perf_counter_ns()",
+                   "    counters.check_ns += checked - started"]
+        lines = ["counters.calls += 1",
+                 "started = checked = perf_counter_ns()"]
+        if sampled:
+            lines += ["nonlocal countdown",
+                      "countdown -= 1",
+                      "if not countdown:",
+                      f"    countdown = {policy.every}",
+                      *_indent(guarded)]
+        else:
+            lines += guarded
+        call_lines = _call_source(kind, "func(*args, **kwargs)", result_check, with_stats=True)
+        if kind.endswith('generator'):
+            # Время тела генератора считает `items` при его закрытии
+            lines += call_lines
+        else:
+            lines += ["try:",
+                      *_indent(call_lines),
+                      "finally:",
+                      "    counters.body_ns += perf_counter_ns() - checked"]
+
+    items_lines = []
+    if kind.endswith('generator') and (result_check or counters is not None):
+        items_lines = _items_source(kind, result_check, counters is not None)
+    prefix = 'async def' if kind == 'coroutine' else 'def'
+    source = (
+        f"def make_wrapper({', '.join(closure)}):\n"
+        "    countdown = 1\n"
+        + ''.join(line + "\n" for line in _indent(items_lines)) +
+        f"    {prefix} wrapper(*args, **kwargs):\n"
+        + '\n'.join(_indent(lines, 2)) + "\n"
+        "    return wrapper\n"
+    )
+    namespace: dict[str, Any] = {}
+    exec(source, namespace)
+    return namespace['make_wrapper'](**closure)
+
+
+class _Options(NamedTuple):
+    """Настройки strict, разрешённые на момент декорирования."""
+    policy: Policy
+    containers: ContainerStrategy
+    check_return: bool
+    stats: bool
+
+
+def _build(func: Callable, options: _Options) -> Callable:
+    """Компилирует обёртку сразу."""
+    counters = None
+    if options.stats:
+        counters = _Counters(f"{func.__module__}.{func.__qualname__}")
+        _counters[id(counters)] = counters
+    wrapper = wraps(func)(_compile_wrapper(func, options.policy, options.containers,
+                                           options.check_return, counters))
+    wrapper.__strict_original__ = func
+    if counters is not None:
+        wrapper.__strict_counters__ = counters
     return wrapper
 
 
+def _make_stub(kind: str, resolve: Callable[[], Callable]) -> Callable:
+    """
+    Заглушка того же вида, что и скомпилированная обёртка (`async def` только для
+    корутин); без exec, чтобы создание было дешёвым.
+    """
+    if kind == 'coroutine':
+        async def stub(*args, **kwargs):
+            return await resolve()(*args, **kwargs)
+    else:
+        def stub(*args, **kwargs):
+            return resolve()(*args, **kwargs)
+    return stub
+
+
+def _build_lazy(func: Callable, options: _Options,
+                rebind: Callable[[Callable], None] | None = None) -> Callable:
+    """
+    Возвращает заглушку того же вида, что и `func`: обёртка компилируется при первом
+    вызове, после чего `rebind` подменяет заглушку там, где она хранится (атрибут класса
+    или модуля). Вызовы через ранее сохранённые ссылки на заглушку перенаправляются
+    в скомпилированную обёртку.
+    """
+    compiled = None
+
+    def resolve() -> Callable:
+        nonlocal compiled
+        if compiled is None:
+            compiled = _build(func, options)
+            if rebind is not None:
+                rebind(compiled)
+        return compiled
+
+    stub = wraps(func)(_make_stub(_function_kind(func), resolve))
+    stub.__strict_original__ = func
+    return stub
+
+
+def _lazy_attribute(owner: Any, name: str, value: Any, options: _Options) -> Any:
+    """Ленивая обёртка для функции, staticmethod или classmethod в `owner`; иначе None."""
+    if isinstance(value, (staticmethod, classmethod)):
+        descriptor = type(value)
+        func = value.__func__
+    elif isfunction(value):
+        descriptor = None
+        func = value
+    else:
+        return None
+
+    def wrap(f: Callable) -> Any:
+        return f if descriptor is None else descriptor(f)
+
+    def rebind(compiled: Callable) -> None:
+        # Не перетираем атрибут, если его успели заменить чем-то другим
+        if vars(owner).get(name) is stub:
+            setattr(owner, name, wrap(compiled))
+
+    stub = wrap(_build_lazy(getattr(func, '__strict_original__', func), options, rebind))
+    return stub
+
+
+def _strict_class(cls: type, options: _Options) -> type:
+    for name, value in list(vars(cls).items()):
+        stub = _lazy_attribute(cls, name, value, options)
+        if stub is not None:
+            setattr(cls, name, stub)
+    return cls
+
+
+def strict(func: Callable | None = None, *, policy: Policy | str | None = None,
+           containers: ContainerStrategy | None = None, check_return: bool = False,
+           stats: bool | None = None, lazy: bool = False):
+    """
+    Проверяет точное соответствие типов аргументов аннотациям `func`.
+
+    Можно использовать как `@strict` или `@strict(policy=..., containers=...)`;
+    без явных настроек берутся глобальные (`set_default_policy`, переменная
+    окружения `STRICT_POLICY`, `set_default_container_strategy`).
+    При политике `off` функция возвращается без обёртки.
+
+    Корутины получают `async def`-обёртку; обёртка генератора (обычного или
+    асинхронного) проверяет аргументы сразу при вызове и возвращает генератор.
+    `check_return=True` дополнительно проверяет возвращаемое (ожидаемое) значение
+    или, лениво, каждый элемент генератора. Повторное применение `strict`
+    к уже обёрнутой функции не добавляет второй слой, а пересобирает обёртку.
+
+    `stats=True` (или `set_default_stats`, переменная окружения `STRICT_STATS`)
+    включает счётчики, доступные через `strict.stats()`.
+
+    Применённый к классу, `strict` оборачивает все его функции, staticmethod и
+    classmethod (`self`/`cls` без аннотаций не проверяются). Для классов и
+    `strict_module` обёртки компилируются лениво — при первом вызове; для отдельной
+    функции это включается через `lazy=True`.
+    """
+    if func is None:
+        return lambda f: strict(f, policy=policy, containers=containers,
+                                check_return=check_return, stats=stats, lazy=lazy)
+
+    policy = _default_policy if policy is None else _coerce_policy(policy)
+    options = _Options(policy,
+                       _default_containers if containers is None else containers,
+                       check_return,
+                       _default_stats if stats is None else stats)
+    if isinstance(func, type):
+        return func if policy.mode == 'off' else _strict_class(func, options)
+
+    func = getattr(func, '__strict_original__', func)
+    if policy.mode == 'off':
+        return func
+    return _build_lazy(func, options) if lazy else _build(func, options)
+
+
+def strict_module(module: ModuleType | str, *, policy: Policy | str | None = None,
+                  containers: ContainerStrategy | None = None, check_return: bool = False,
+                  stats: bool | None = None) -> ModuleType:
+    """
+    Применяет `strict` ко всем функциям и классам, определённым в модуле
+    (импортированные из других модулей не трогаются). Обёртки компилируются
+    при первом вызове, поэтому время импорта не зависит от числа функций.
+    """
+    if isinstance(module, str):
+        module = sys.modules[module]
+    policy = _default_policy if policy is None else _coerce_policy(policy)
+    if policy.mode == 'off':
+        return module
+    options = _Options(policy,
+                       _default_containers if containers is None else containers,
+                       check_return,
+                       _default_stats if stats is None else stats)
+    for name, value in list(vars(module).items()):
+        if getattr(value, '__module__', None) != module.__name__:
+            continue
+        if isinstance(value, type):
+            _strict_class(value, options)
+            continue
+        stub = _lazy_attribute(module, name, value, options)
+        if stub is not None:
+            setattr(module, name, stub)
+    return module
+
+
+strict.stats = stats
+
+
 @strict
 def sum_two(a: int, b: int) -> int:
     """Сумма двух целых чисел"""
     return a + b
 
 
-try:
-    print(sum_two(1, 2))
-    print(sum_two(1, 2.4))
-except TypeError as e:
-    print(e)
+if __name__ == "__main__":
+    try:
+        print(sum_two(1, 2))
+        print(sum_two(1, 2.4))
+    except TypeError as e:
+        print(e)
@@ -1,6 +1,14 @@
+import asyncio
+import gc
+import inspect
+import types
+from contextlib import asynccontextmanager, contextmanager
+from typing import AsyncIterator, Generator
+
 import pytest
 
-from .solution import strict
+from .solution import (OFF, get_default_policy, parse_policy, sample, set_default_policy, strict,
+                       strict_module)
 
 
 def add_numbers(a: int, b: float) -> float:
@@ -71,3 +79,396 @@ def test_strict_incorrect_types(func, args, kwargs, expected_error):
     with pytest.raises(TypeError) as exc_info:
         decorated_func(*args, **kwargs)
     assert str(exc_info.value) == expected_error, f"Ожидалась ошибка: {expected_error}"
+
+
+def test_strict_mixed_args_and_unannotated():
+    """Тестирует смешанную передачу аргументов и пропуск неаннотированных параметров."""
+    def mixed(a: int, b, c: str) -> str:
+        return f"{a}{b}{c}"
+
+    decorated_func = strict(mixed)
+    assert decorated_func(1, [], c="x") == "1[]x"
+    assert decorated_func(1, b=2.5, c="y") == "12.5y"
+    with pytest.raises(TypeError) as exc_info:
+        decorated_func(1, None, c=2)
+    assert str(exc_info.value) == "Аргумент c должен быть типа str, получен int"
+
+
+def test_strict_preserves_metadata():
+    """Тестирует сохранение имени и документации декорируемой функции."""
+    decorated_func = strict(add_numbers)
+    assert decorated_func.__name__ == "add_numbers"
+    assert decorated_func.__wrapped__ is add_numbers
+
+
+def test_strict_sample_policy():
+    """Тестирует политику sample(n): проверяется только каждый n-й вызов."""
+    decorated_func = strict(add_numbers, policy=sample(3))
+    with pytest.raises(TypeError):
+        decorated_func(1, 2)  # первый вызов проверяется
+    assert decorated_func(1, 2) == 3
+    assert decorated_func(1, 2) == 3
+    with pytest.raises(TypeError):
+        decorated_func(1, 2)
+
+
+def test_strict_off_policy_returns_original():
+    """Тестирует, что при политике off обёртка не создаётся."""
+    assert strict(add_numbers, policy="off") is add_numbers
+    assert strict(policy=OFF)(check_string) is check_string
+
+
+def test_default_policy():
+    """Тестирует глобальную политику по умолчанию."""
+    previous = get_default_policy()
+    set_default_policy("off")
+    try:
+        assert strict(add_numbers) is add_numbers
+    finally:
+        set_default_policy(previous)
+    assert strict(add_numbers) is not add_numbers
+
+
+@pytest.mark.parametrize(
+    "value, expected",
+    [("always", ("always", 1)), (" OFF ", ("off", 1)), ("sample(100)", ("sample", 100))],
+    ids=["always", "off", "sample"],
+)
+def test_parse_policy(value, expected):
+    """Тестирует разбор политики из строки (переменная окружения STRICT_POLICY)."""
+    assert tuple(parse_policy(value)) == expected
+
+
+@pytest.mark.parametrize("value", ["sometimes", "sample(0)", "sample()"])
+def test_parse_policy_invalid(value):
+    """Тестирует отказ на некорректной политике."""
+    with pytest.raises(ValueError):
+        parse_policy(value)
+
+
+def test_strict_coroutine():
+    """Тестирует обёртку корутины: проверку аргументов и ожидаемого результата."""
+    async def fetch(n: int) -> str:
+        return "x" * n if n >= 0 else n
+
+    decorated_func = strict(fetch, check_return=True)
+    assert inspect.iscoroutinefunction(decorated_func)
+    assert asyncio.run(decorated_func(2)) == "xx"
+    with pytest.raises(TypeError) as exc_info:
+        asyncio.run(decorated_func(2.0))
+    assert str(exc_info.value) == "Аргумент n должен быть типа int, получен float"
+    with pytest.raises(TypeError) as exc_info:
+        asyncio.run(decorated_func(-1))
+    assert str(exc_info.value) == "Возвращаемое значение должно быть типа str, получен int"
+    assert asyncio.run(strict(fetch)(-1)) == -1
+
+
+def test_strict_generator_checks_items_lazily():
+    """Тестирует ленивую проверку элементов генератора и пересылку send/return."""
+    def numbers(limit: int) -> Generator[int, int, str]:
+        received = 0
+        for i in range(limit):
+            received = yield (i if received != -1 else "bad")
+        return "done"
+
+    decorated_func = strict(numbers, check_return=True)
+    gen = decorated_func(3)
+    assert inspect.isgenerator(gen)
+    assert next(gen) == 0
+    assert gen.send(5) == 1
+    with pytest.raises(TypeError) as exc_info:
+        gen.send(-1)
+    assert str(exc_info.value) == ("Значение, выданное генератором, "
+                                   "должно быть типа int, получен str")
+
+    gen = decorated_func(1)
+    assert next(gen) == 0
+    with pytest.raises(StopIteration) as stop_info:
+        next(gen)
+    assert stop_info.value.value == "done"
+    with pytest.raises(TypeError):
+        decorated_func("3")
+
+
+def test_strict_async_generator():
+    """Тестирует обёртку асинхронного генератора."""
+    async def items(limit: int) -> AsyncIterator[int]:
+        for i in range(limit):
+            yield i
+        yield "end"
+
+    async def collect(agen):
+        return [item async for item in agen]
+
+    assert inspect.isasyncgen(strict(items)(2))
+    assert asyncio.run(collect(strict(items)(2))) == [0, 1, "end"]
+    with pytest.raises(TypeError):
+        asyncio.run(collect(strict(items, check_return=True)(2)))
+    with pytest.raises(TypeError):
+        strict(items)(2.0)
+
+
+def test_strict_generator_forwards_throw():
+    """Тестирует пересылку throw во вложенный генератор (в том числе под @contextmanager)."""
+    def guarded() -> Generator[int, None, None]:
+        try:
+            yield 1
+        except ValueError:
+            yield -1
+
+    gen = strict(guarded, check_return=True)()
+    assert next(gen) == 1
+    assert gen.throw(ValueError) == -1
+
+    events = []
+
+    @contextmanager
+    @strict(check_return=True)
+    def resource() -> Generator[str, None, None]:
+        try:
+            yield "res"
+        except KeyError:
+            events.append("handled")
+        finally:
+            events.append("closed")
+
+    with resource() as value:
+        assert value == "res"
+        raise KeyError("body")
+    assert events == ["handled", "closed"]
+
+
+@pytest.mark.parametrize("lazy", [False, True], ids=["compiled", "lazy"])
+def test_strict_async_generator_forwards_athrow(lazy: bool):
+    """Тестирует пересылку athrow и asend до и после ленивой компиляции."""
+    events = []
+
+    async def guarded(start: int) -> AsyncIterator[int]:
+        try:
+            received = yield start
+            yield received
+        except ValueError:
+            events.append("handled")
+            yield -1
+        finally:
+            events.append("closed")
+
+    @asynccontextmanager
+    @strict(lazy=lazy)
+    async def resource(name: str) -> AsyncIterator[str]:
+        try:
+            yield name
+        except KeyError:
+            events.append("body error")
+
+    async def run():
+        agen = strict(guarded, lazy=lazy)(1)
+        assert await agen.__anext__() == 1
+        assert await agen.asend(7) == 7
+        assert await agen.athrow(ValueError) == -1
+        await agen.aclose()
+        async with resource("res") as value:
+            assert value == "res"
+            raise KeyError("body")
+
+    asyncio.run(run())
+    assert events == ["handled", "closed", "body error"]
+
+
+def test_strict_sync_return_and_no_double_wrapping():
+    """Тестирует проверку результата и повторное применение strict без второго слоя."""
+    def half(a: int) -> int:
+        return a // 2 if a % 2 == 0 else a / 2
+
+    decorated_func = strict(strict(half), check_return=True)
+    assert decorated_func.__wrapped__ is half
+    assert decorated_func(4) == 2
+    with pytest.raises(TypeError) as exc_info:
+        decorated_func(3)
+    assert str(exc_info.value) == "Возвращаемое значение должно быть типа int, получен float"
+
+
+def test_strict_stats():
+    """Тестирует счётчики вызовов, нарушений и времени."""
+    decorated_func = strict(add_numbers, stats=True, policy=sample(2))
+    strict.stats()
+    assert decorated_func(1, 2.0) == 3.0
+    assert decorated_func(1, 2) == 3  # не проверяется политикой sample(2)
+    with pytest.raises(TypeError):
+        decorated_func(a=1, b=2)
+
+    snapshot = strict.stats()
+    name = f"{add_numbers.__module__}.{add_numbers.__qualname__}"
+    assert snapshot[name]["calls"] == 3
+    assert snapshot[name]["violations"] == 1
+    assert snapshot[name]["check_ns"] > 0
+    assert snapshot[name]["body_ns"] > 0
+    assert name not in strict.stats()  # снимок сбрасывает счётчики
+
+
+def test_strict_stats_drops_discarded_functions():
+    """Тестирует, что счётчики выброшенной обёртки не остаются в снимке."""
+    name = f"{add_numbers.__module__}.{add_numbers.__qualname__}"
+    strict.stats()
+    decorated_func = strict(add_numbers, stats=True)
+    decorated_func(1, 2.0)
+    assert decorated_func.__strict_counters__.calls == 1
+
+    del decorated_func
+    gc.collect()
+    assert name not in strict.stats()
+
+    redecorated = strict(add_numbers, stats=True)
+    redecorated(1, 2.0)
+    assert strict.stats()[name]["calls"] == 1
+
+
+def test_strict_stats_counts_result_violations():
+    """Тестирует учёт нарушений типа результата в счётчиках."""
+    async def echo(value: int) -> str:
+        return value
+
+    decorated_func = strict(echo, stats=True, check_return=True)
+    strict.stats()
+    with pytest.raises(TypeError):
+        asyncio.run(decorated_func(1))
+    snapshot = strict.stats()
+    assert snapshot[f"{echo.__module__}.{echo.__qualname__}"]["violations"] == 1
+
+
+def test_strict_stats_generator():
+    """Тестирует счётчики генератора: аргументы — при вызове, элементы — при итерации."""
+    def countdown(start: int) -> Generator[int, None, None]:
+        yield from range(start, 0, -1)
+        yield "пуск"
+
+    decorated_func = strict(countdown, stats=True, check_return=True)
+    strict.stats()
+    with pytest.raises(TypeError):
+        decorated_func("3")
+    gen = decorated_func(2)
+    assert next(gen) == 2 and next(gen) == 1
+    with pytest.raises(TypeError):
+        next(gen)
+    snapshot = strict.stats()[f"{countdown.__module__}.{countdown.__qualname__}"]
+    assert snapshot["calls"] == 2
+    assert snapshot["violations"] == 2
+    assert snapshot["body_ns"] > 0
+
+
+def test_strict_class():
+    """Тестирует применение strict к классу: методы, staticmethod, classmethod."""
+    @strict
+    class Calculator:
+        def __init__(self, base: int):
+            self.base = base
+
+        def add(self, value: int) -> int:
+            return self.base + value
+
+        @staticmethod
+        def twice(value: float) -> float:
+            return value * 2
+
+        @classmethod
+        def create(cls, base: int) -> "Calculator":
+            return cls(base)
+
+    calc = Calculator.create(1)
+    assert calc.add(2) == 3
+    assert Calculator.twice(1.5) == 3.0
+    assert calc.twice(value=2.0) == 4.0
+    with pytest.raises(TypeError) as exc_info:
+        calc.add("2")
+    assert str(exc_info.value) == "Аргумент value должен быть типа int, получен str"
+    with pytest.raises(TypeError):
+        Calculator.twice(1)
+    with pytest.raises(TypeError):
+        Calculator.create(1.0)
+    with pytest.raises(TypeError):
+        Calculator("1")
+
+
+def test_strict_lazy_compilation():
+    """Тестирует, что обёртка компилируется при первом вызове и подменяет заглушку."""
+    class Service:
+        def handle(self, request_id: int) -> int:
+            return request_id
+
+    strict(Service)
+    stub = vars(Service)["handle"]
+    assert stub.__name__ == "handle"
+    assert Service().handle(5) == 5
+    compiled = vars(Service)["handle"]
+    assert compiled is not stub
+    assert compiled.__wrapped__ is stub.__wrapped__
+    # заглушка по старой ссылке продолжает проверять аргументы
+    with pytest.raises(TypeError):
+        stub(Service(), "5")
+
+    lazy_func = strict(add_numbers, lazy=True)
+    assert lazy_func(1, 2.0) == 3.0
+    with pytest.raises(TypeError):
+        lazy_func(1, 2)
+
+
+def test_strict_module():
+    """Тестирует применение strict ко всем функциям и классам модуля."""
+    module = types.ModuleType("strict_test_module")
+    exec(
+        "import asyncio\n"
+        "from task1.test_task1 import add_numbers\n"
+        "def double(x: int) -> int:\n"
+        "    return x * 2\n"
+        "async def wait(x: int) -> int:\n"
+        "    return x\n"
+        "class Box:\n"
+        "    def put(self, item: str) -> str:\n"
+        "        return item\n",
+        vars(module),
+    )
+    strict_module(module)
+    assert module.double(2) == 4
+    with pytest.raises(TypeError):
+        module.double(2.0)
+    assert inspect.iscoroutinefunction(module.wait)
+    with pytest.raises(TypeError):
+        asyncio.run(module.wait("1"))
+    with pytest.raises(TypeError):
+        module.Box().put(1)
+    # импортированные функции не оборачиваются
+    assert module.add_numbers is add_numbers
+    assert module.asyncio is asyncio
+
+
+def test_strict_postponed_annotations():
+    """Тестирует аннотации-строки (PEP 563): вычисляются при декорировании или первом вызове."""
+    module = types.ModuleType("strict_future_module")
+    exec(
+        "from __future__ import annotations\n"
+        "from task1.solution import strict\n"
+        "@strict(check_return=True)\n"
+        "def double(x: int) -> int:\n"
+        "    return x * 2\n"
+        "@strict(lazy=True)\n"
+        "def size(node: Node, items: list[Node]) -> int:\n"
+        "    return len(items)\n"
+        "class Node:\n"
+        "    pass\n",
+        vars(module),
+    )
+    assert module.double(2) == 4
+    with pytest.raises(TypeError) as exc_info:
+        module.double("x")
+    assert str(exc_info.value) == "Аргумент x должен быть типа int, получен str"
+    # Node определён после декорирования: ленивая обёртка вычисляет его при первом вызове
+    assert module.size(module.Node(), [module.Node()]) == 1
+    with pytest.raises(TypeError):
+        module.size(module.Node(), [1])
+
+    def later(node: "Undefined") -> int:  # noqa: F821
+        return 0
+
+    with pytest.warns(RuntimeWarning, match="later"):
+        decorated_func = strict(later)
+    assert decorated_func(1) == 0
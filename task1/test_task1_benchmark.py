@@ -0,0 +1,74 @@
+import json
+
+import pytest
+
+from .benchmark import (allocated_per_call, compare_results, main, make_cases,
+                        run_startup_benchmark)
+
+
+def test_make_cases_cover_matrix():
+    """Тестирует, что бенчмарк покрывает все виды вызовов и путь с ошибкой."""
+    cases = make_cases()
+    for call_kind in ("positional", "keyword", "mixed"):
+        for param_count in (1, 4, 16):
+            bare_call, strict_call = cases[f"{call_kind}_{param_count}"]
+            assert bare_call() == strict_call() == 0
+    bare_call, strict_call = cases["type_error_4"]
+    bare_call()
+    strict_call()
+
+
+@pytest.mark.parametrize(
+    "overhead, expected_regressions",
+    [
+        (100.0, 0),
+        (120.0, 0),   # в пределах порога
+        (135.0, 1),   # выше порога на 35%
+    ],
+    ids=["same", "within_threshold", "regression"],
+)
+def test_compare_results(overhead, expected_regressions):
+    """Тестирует обнаружение регрессии накладных расходов."""
+    baseline = {"positional_1": {"overhead_ns": 100.0}}
+    current = {"positional_1": {"overhead_ns": overhead}}
+    regressions = compare_results(baseline, current, threshold=0.25, min_delta_ns=10.0)
+    assert len(regressions) == expected_regressions
+
+
+def test_allocated_per_call_counts_temporary_allocations():
+    """Тестирует замер памяти, выделяемой за вызов, включая сразу освобождённую."""
+    assert allocated_per_call(lambda: None, number=200) < 1
+    assert 8000 <= allocated_per_call(lambda: [0] * 1000, number=200) < 8200
+
+    def wrapper(**kwargs):
+        return len(dict(kwargs, extra=True))
+
+    assert allocated_per_call(lambda: wrapper(**dict.fromkeys("abcdefghijklmnop")),
+                              number=200) > 0
+
+
+def test_compare_results_ignores_noise():
+    """Тестирует, что рост меньше min_delta_ns не считается регрессией."""
+    baseline = {"positional_1": {"overhead_ns": 10.0}}
+    current = {"positional_1": {"overhead_ns": 25.0}}
+    assert compare_results(baseline, current, threshold=0.25, min_delta_ns=20.0) == []
+
+
+def test_main_writes_and_compares_baseline(tmp_path, capsys):
+    """Тестирует запись baseline и режим сравнения."""
+    baseline_file = tmp_path / "baseline.json"
+    assert main(["--number", "10", "--repeat", "1", "--output", str(baseline_file)]) == 0
+    data = json.loads(baseline_file.read_text(encoding="utf-8"))
+    assert "positional_16" in data["results"]
+
+    for result in data["results"].values():
+        result["overhead_ns"] = 1e9
+    baseline_file.write_text(json.dumps(data), encoding="utf-8")
+    assert main(["--number", "10", "--repeat", "1", "--compare", str(baseline_file)]) == 0
+
+
+def test_run_startup_benchmark():
+    """Тестирует замер времени загрузки модуля в трёх режимах."""
+    results = run_startup_benchmark(function_count=20, repeat=1)
+    assert set(results) == {"bare_ms", "eager_ms", "lazy_ms", "lazy_first_call_us"}
+    assert all(value >= 0 for value in results.values())
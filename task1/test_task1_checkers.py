@@ -0,0 +1,94 @@
+from typing import Annotated, Any, Optional
+
+import pytest
+
+from .checkers import (CACHE_SIZE, LENGTH_ONLY, _compile_cached, compile_checker, sample_edges,
+                       type_name)
+from .solution import strict
+
+
+@pytest.mark.parametrize(
+    "annotation, value, expected",
+    [
+        (list[int], [1, 2, 3], True),
+        (list[int], [1, "2", 3], False),
+        (list[int], (1, 2), False),
+        (list[int], [True], False),
+        (dict[str, float], {"a": 1.0, "b": 2.5}, True),
+        (dict[str, float], {"a": 1}, False),
+        (dict[str, float], {1: 1.0}, False),
+        (Optional[int], None, True),
+        (Optional[int], 5, True),
+        (Optional[int], "5", False),
+        (int | str, "x", True),
+        (int | str, 1.0, False),
+        (tuple[int, ...], (1, 2, 3), True),
+        (tuple[int, ...], (1, 2.0), False),
+        (tuple[int, str], (1, "a"), True),
+        (tuple[int, str], (1, "a", 2), False),
+        (set[str], {"a", "b"}, True),
+        (list[list[int]], [[1], [2, 3]], True),
+        (list[list[int]], [[1], [2, "3"]], False),
+        (list[int | None], [1, None], True),
+        (list, [1, "a"], True),
+    ],
+)
+def test_compile_checker(annotation, value, expected):
+    """Тестирует скомпилированные проверки контейнеров и объединений."""
+    assert compile_checker(annotation)(value) is expected
+
+
+def test_compile_checker_skips_unconstrained():
+    """Тестирует, что Any и строковые аннотации не проверяются."""
+    assert compile_checker(Any) is None
+    assert compile_checker("int") is None
+    assert compile_checker(Optional[Any]) is None
+
+
+def test_compile_checker_cache():
+    """Тестирует кэш проверок: по значению аннотации, ограниченный, без нехешируемых."""
+    assert compile_checker(list[int]) is compile_checker(list[int])
+    assert compile_checker(list[int]) is not compile_checker(list[int], LENGTH_ONLY)
+    assert _compile_cached.cache_info().maxsize == CACHE_SIZE
+
+    # нехешируемая аннотация компилируется без кэша, а не падает с TypeError
+    unhashable = Annotated[list[int], {"unit": "шт"}]
+    assert compile_checker(unhashable) is not compile_checker(unhashable)
+
+
+def test_container_strategies():
+    """Тестирует стратегии проверки больших контейнеров."""
+    values = [1] * 100 + ["x"] + [1] * 100
+    assert compile_checker(list[int])(values) is False
+    assert compile_checker(list[int], sample_edges(k=10, threshold=50))(values) is True
+    assert compile_checker(list[int], sample_edges(k=10, threshold=50))(values + ["y"]) is False
+    assert compile_checker(list[int], LENGTH_ONLY)(values) is True
+    assert compile_checker(list[int], LENGTH_ONLY)((1, 2)) is False
+    # небольшие контейнеры проверяются целиком при любой стратегии
+    assert compile_checker(list[int], sample_edges(k=1, threshold=1000))(values) is False
+
+
+@pytest.mark.parametrize(
+    "annotation, expected",
+    [(int, "int"), (list[int], "list[int]"), (Optional[int], "Optional[int]"),
+     (int | str, "int | str")],
+)
+def test_type_name(annotation, expected):
+    """Тестирует имена аннотаций в сообщениях об ошибках."""
+    assert type_name(annotation) == expected
+
+
+def test_strict_container_arguments():
+    """Тестирует strict с контейнерными аннотациями и объединениями."""
+    @strict
+    def total(values: list[int], scale: float | None, label: str) -> float:
+        return sum(values) * (scale or 1.0)
+
+    assert total([1, 2], 2.0, "x") == 6.0
+    assert total([1, 2], None, label="x") == 3.0
+    with pytest.raises(TypeError) as exc_info:
+        total([1, 2.0], None, "x")
+    assert str(exc_info.value) == "Аргумент values должен быть типа list[int], получен list"
+    with pytest.raises(TypeError) as exc_info:
+        total([1], scale=1, label="x")
+    assert str(exc_info.value) == "Аргумент scale должен быть типа float | None, получен int"
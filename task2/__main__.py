@@ -0,0 +1,47 @@
+"""
+Подсчёт страниц категории по буквам любым из движков.
+
+    python -m task2 --engine async-api --output beasts.csv
+    python -m task2 --engine html --concurrency 4 --category "Животные по алфавиту"
+    python -m task2 --compare async-api sync-api html
+
+Обход с контрольными точками и продолжением (`--resume`) — отдельный CLI
+`python -m task2.checkpoint`.
+"""
+import argparse
+import sys
+
+from .engines import ENGINES, create_engine, format_comparison, run_engine
+from .metrics import Metrics
+from .solution import DEFAULT_CATEGORY, write_to_csv
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m task2", description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--engine", choices=ENGINES, default="async-api")
+    parser.add_argument("--category", default=DEFAULT_CATEGORY)
+    parser.add_argument("--output", default="beasts.csv", help="CSV со счётчиками букв")
+    parser.add_argument("--concurrency", type=int, default=8,
+                        help="параллельных запросов (async-api) или цепочек (html)")
+    parser.add_argument("--compare", nargs="+", choices=ENGINES, metavar="ENGINE",
+                        help="запустить несколько движков и сравнить результаты")
+    parser.add_argument("--metrics-json", help="записать метрики запросов в JSON")
+    parser.add_argument("--metrics-prom", help="записать метрики в формате Prometheus")
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        results = [run_engine(create_engine(name, args.concurrency), args.category)
+                   for name in args.compare]
+        print(format_comparison(results))
+        return int(any(result.titles != results[0].titles for result in results))
+
+    metrics = Metrics()
+    result = run_engine(create_engine(args.engine, args.concurrency), args.category, metrics)
+    write_to_csv(result.letter_counts, filename=args.output)
+    metrics.dump(args.metrics_json, args.metrics_prom)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
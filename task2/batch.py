@@ -0,0 +1,208 @@
+"""
+Подсчёт букв сразу для многих категорий за один прогон.
+
+Все категории обходятся в одной `aiohttp.ClientSession` через общий
+`AdaptiveRateLimiter`, поэтому одновременные обходы делят один бюджет
+запросов и вместе реагируют на 429. Сначала одним-двумя запросами
+`prop=categoryinfo` узнаются размеры категорий, и обходы запускаются от
+больших к меньшим (не более `parallel` одновременно): крупная категория,
+начатая последней, растянула бы весь прогон.
+
+    python -m task2.batch "Животные по алфавиту" "Птицы по алфавиту" --output-dir counts
+    python -m task2.batch --file categories.txt --combined counts.csv
+"""
+import argparse
+import asyncio
+import csv
+import hashlib
+import logging
+import os
+import re
+import time
+from collections import Counter
+from collections.abc import Iterable
+
+import aiohttp
+
+from .metrics import Metrics
+from .rate_limit import AdaptiveRateLimiter
+from .solution import (ORDER_RUS_ALPHABET, collect_category_titles, count_letters, request_json,
+                       write_to_csv)
+from .tree import category_title
+
+logger = logging.getLogger(__name__)
+
+# Ограничение API на число заголовков в одном запросе (без apihighlimits)
+TITLES_PER_REQUEST = 50
+DEFAULT_OUTPUT_DIR = "beasts_by_category"
+
+
+def read_categories(path: str) -> list[str]:
+    """Категории из файла: по одной на строку, пустые строки и `#`-комментарии пропускаются."""
+    with open(path, encoding="utf-8") as f:
+        lines = [line.strip() for line in f]
+    return unique([line for line in lines if line and not line.startswith("#")])
+
+
+def unique(categories: Iterable[str]) -> list[str]:
+    return list(dict.fromkeys(categories))
+
+
+async def fetch_category_sizes(categories: list[str], session: aiohttp.ClientSession,
+                               limiter: AdaptiveRateLimiter,
+                               metrics: Metrics | None = None) -> dict[str, int]:
+    """Число страниц в каждой категории (0 — категория не найдена или пуста)."""
+    sizes = dict.fromkeys(categories, 0)
+    for offset in range(0, len(categories), TITLES_PER_REQUEST):
+        chunk = {category_title(category): category
+                 for category in categories[offset:offset + TITLES_PER_REQUEST]}
+        params: dict[str, str | int] = {
+            "action": "query",
+            "prop": "categoryinfo",
+            "titles": "|".join(chunk),
+            "format": "json",
+        }
+        data = await request_json(session, limiter, params, "categoryinfo", metrics)
+        query = data.get("query", {})
+        # API приводит заголовки к каноническому виду (пробелы, регистр первой буквы)
+        aliases = {item["to"]: item["from"] for item in query.get("normalized", [])}
+        for page in query.get("pages", {}).values():
+            category = chunk.get(aliases.get(page["title"], page["title"]))
+            if category is not None:
+                sizes[category] = page.get("categoryinfo", {}).get("pages", 0)
+    return sizes
+
+
+async def crawl_categories(categories: list[str], session: aiohttp.ClientSession,
+                           limiter: AdaptiveRateLimiter, parallel: int = 4,
+                           metrics: Metrics | None = None) -> dict[str, dict[str, int]]:
+    """
+    Счётчики букв для каждой категории (в порядке `categories`).
+
+    Обходы стартуют от больших категорий к меньшим, одновременно — не больше
+    `parallel`; запросы всех обходов идут через один `limiter`.
+    """
+    sizes = await fetch_category_sizes(categories, session, limiter, metrics)
+    results: dict[str, dict[str, int]] = {}
+    semaphore = asyncio.Semaphore(parallel)
+
+    async def crawl(category: str) -> None:
+        async with semaphore:
+            started = time.perf_counter()
+            titles = await collect_category_titles(category, session, limiter, metrics)
+            results[category] = count_letters(titles)
+            logger.info(f"Категория '{category}': {len(titles)} заголовков "
+                        f"за {time.perf_counter() - started:.2f} секунд")
+
+    for category in categories:
+        if not sizes[category]:
+            logger.warning(f"Категория '{category}' не найдена или пуста")
+            results[category] = {}
+    order = sorted((category for category in categories if sizes[category]),
+                   key=sizes.__getitem__, reverse=True)
+    # Задачи создаются по убыванию размера, а семафор пропускает их в порядке очереди
+    await asyncio.gather(*(crawl(category) for category in order))
+    return {category: results[category] for category in categories}
+
+
+def count_categories(categories: Iterable[str], limiter: AdaptiveRateLimiter | None = None,
+                     parallel: int = 4,
+                     metrics: Metrics | None = None) -> dict[str, dict[str, int]]:
+    """Синхронная обёртка над `crawl_categories` с одной сессией на весь прогон."""
+    categories = unique(categories)
+    limiter = limiter or AdaptiveRateLimiter()
+
+    async def run() -> dict[str, dict[str, int]]:
+        async with aiohttp.ClientSession() as session:
+            return await crawl_categories(categories, session, limiter, parallel, metrics)
+
+    return asyncio.run(run())
+
+
+def category_filename(category: str, disambiguate: bool = False) -> str:
+    """Имя CSV для категории; с `disambiguate` — с коротким хешем полного названия."""
+    name = re.sub(r"[^\w-]+", "_", category).strip("_") or "category"
+    if disambiguate:
+        name = f"{name}-{hashlib.sha1(category.encode('utf-8')).hexdigest()[:8]}"
+    return f"{name}.csv"
+
+
+def category_filenames(categories: Iterable[str]) -> dict[str, str]:
+    """
+    Имена CSV для категорий. Очистка названий теряет символы, поэтому категории,
+    имена файлов которых совпали (без учёта регистра — как в файловых системах
+    macOS и Windows), получают суффикс-хеш и не перезаписывают друг друга.
+    """
+    categories = list(categories)
+    plain = {category: category_filename(category) for category in categories}
+    counts = Counter(filename.casefold() for filename in plain.values())
+    filenames = {}
+    for category, filename in plain.items():
+        if counts[filename.casefold()] > 1:
+            filename = category_filename(category, disambiguate=True)
+            logger.warning(f"Категория '{category}' записывается в {filename}: "
+                           f"имя файла совпало с другой категорией")
+        filenames[category] = filename
+    return filenames
+
+
+def write_category_csvs(results: dict[str, dict[str, int]],
+                        directory: str = DEFAULT_OUTPUT_DIR) -> list[str]:
+    """По CSV на категорию (формат `write_to_csv`); возвращает пути файлов."""
+    os.makedirs(directory, exist_ok=True)
+    filenames = category_filenames(results)
+    paths = []
+    for category, letter_counts in results.items():
+        path = os.path.join(directory, filenames[category])
+        write_to_csv(letter_counts, filename=path)
+        paths.append(path)
+    return paths
+
+
+def write_long_csv(results: dict[str, dict[str, int]], filename: str) -> None:
+    """Один CSV в длинном формате: строки `category,letter,count`."""
+    with open(filename, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["category", "letter", "count"])
+        for category, letter_counts in results.items():
+            for letter in sorted(letter_counts, key=ORDER_RUS_ALPHABET.__getitem__):
+                writer.writerow([category, letter, letter_counts[letter]])
+    logger.info(f"Результаты записаны в {filename}")
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("categories", nargs="*", help="названия категорий")
+    parser.add_argument("--file", help="файл со списком категорий, по одной на строку")
+    parser.add_argument("--parallel", type=int, default=4,
+                        help="категорий, обходимых одновременно")
+    parser.add_argument("--output-dir", default=DEFAULT_OUTPUT_DIR,
+                        help="каталог для CSV по категориям")
+    parser.add_argument("--combined", help="вместо CSV по категориям — один CSV "
+                                           "в длинном формате")
+    parser.add_argument("--metrics-json", help="записать метрики запросов в JSON")
+    parser.add_argument("--metrics-prom", help="записать метрики в формате Prometheus")
+    args = parser.parse_args(argv)
+
+    categories = list(args.categories)
+    if args.file:
+        categories += read_categories(args.file)
+    if not categories:
+        parser.error("не указано ни одной категории")
+
+    start_time = time.time()
+    metrics = Metrics() if args.metrics_json or args.metrics_prom else None
+    results = count_categories(categories, parallel=args.parallel, metrics=metrics)
+    if args.combined:
+        write_long_csv(results, args.combined)
+    else:
+        write_category_csvs(results, args.output_dir)
+    if metrics is not None:
+        metrics.dump(args.metrics_json, args.metrics_prom)
+    logger.info(f"Категорий: {len(results)}, "
+                f"время выполнения: {time.time() - start_time:.2f} секунд")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+"""
+Бенчмарк пропускной способности краулеров на локальной замене Википедии.
+
+Поднимает `FakeWikiServer` с синтетической категорией и по очереди запускает
+асинхронный обход API (`solution`), синхронный (`solution_sync`) и обход
+HTML-страниц (`solution_html`, последовательно и параллельными цепочками).
+Для каждого выводит число запросов, страниц/с, заголовков/с, p50/p99 задержки
+ответа (измеряется сервером, включая внедрённую задержку) и общее время.
+Если какой-то движок собрал не все заголовки категории, после таблицы
+печатается список недостач и код выхода — 1.
+
+    python -m task2.benchmark --size 20000 --latency 0.02
+    python -m task2.benchmark --engines async sync --throttle-rate 0.05 --output bench.json
+
+Режим `--parse [FILE ...]` сравнивает разбор сохранённых страниц категории
+потоковым парсером и BeautifulSoup (без файлов — на страницах, сгенерированных
+локальным сервером).
+"""
+import argparse
+import json
+import logging
+import time
+import timeit
+from typing import Callable
+from unittest.mock import patch
+
+from . import solution, solution_html, solution_sync
+from .fake_wiki import HTML_LIMIT, Faults, FakeWikiServer, SyntheticCategory, percentile
+
+ENGINES = ("async", "sync", "html", "html-parallel")
+
+
+def run_async(server: FakeWikiServer) -> list[str]:
+    with patch.object(solution, "API_URL", server.api_url):
+        return list(solution.get_category_members_api(server.category.name))
+
+
+def run_sync(server: FakeWikiServer) -> list[str]:
+    with patch.object(solution_sync, "API_URL", server.api_url):
+        return list(solution_sync.iter_category_members_api(server.category.name))
+
+
+def run_html(server: FakeWikiServer) -> list[str]:
+    with patch.object(solution_html, "BASE_URL", server.base_url):
+        return solution_html.get_category_members_html()
+
+
+def run_html_parallel(server: FakeWikiServer) -> list[str]:
+    with patch.object(solution_html, "BASE_URL", server.base_url):
+        return solution_html.get_category_members_html_parallel()
+
+
+RUNNERS: dict[str, Callable[[FakeWikiServer], list[str]]] = {
+    "async": run_async,
+    "sync": run_sync,
+    "html": run_html,
+    "html-parallel": run_html_parallel,
+}
+
+
+def measure_engine(engine: str, server: FakeWikiServer) -> dict[str, float]:
+    """Запускает краулер против сервера и собирает метрики одного прогона."""
+    server.reset_stats()
+    start = time.perf_counter()
+    titles = RUNNERS[engine](server)
+    wall = time.perf_counter() - start
+    unique = len(set(titles))
+    return {
+        "requests": server.requests,
+        "pages": server.ok,
+        "throttled": server.throttled,
+        "errors": server.errors,
+        "bytes": server.bytes_sent,
+        "titles": unique,
+        "expected_titles": len(server.category),
+        "pages_per_s": server.ok / wall if wall else 0.0,
+        "titles_per_s": unique / wall if wall else 0.0,
+        "p50_ms": percentile(server.latencies, 50) * 1e3,
+        "p99_ms": percentile(server.latencies, 99) * 1e3,
+        "wall_s": wall,
+    }
+
+
+def missing_titles(results: dict[str, dict[str, float]]) -> dict[str, int]:
+    """Сколько заголовков категории не собрал каждый движок (только движки с недостачей)."""
+    return {engine: row["expected_titles"] - row["titles"] for engine, row in results.items()
+            if row["titles"] < row["expected_titles"]}
+
+
+def run_benchmark(category: SyntheticCategory, faults: Faults = Faults(),
+                  engines: tuple[str, ...] = ENGINES) -> dict[str, dict[str, float]]:
+    with FakeWikiServer(category, faults) as server:
+        return {engine: measure_engine(engine, server) for engine in engines}
+
+
+def run_parser_benchmark(pages: list[str], repeat: int = 5) -> dict[str, float]:
+    """Лучшее время разбора всех страниц (мс) потоковым парсером и BeautifulSoup."""
+    def parse_all(parse: Callable[[str], tuple[list[str], str | None]]) -> Callable[[], None]:
+        return lambda: [parse(page) for page in pages]
+
+    for page in pages:
+        if solution_html.parse_category_page(page) != solution_html.parse_category_page_soup(page):
+            raise ValueError("Результаты парсеров расходятся")
+    stream_ms = min(timeit.repeat(parse_all(solution_html.parse_category_page),
+                                  number=1, repeat=repeat)) * 1e3
+    soup_ms = min(timeit.repeat(parse_all(solution_html.parse_category_page_soup),
+                                number=1, repeat=repeat)) * 1e3
+    return {"pages": len(pages), "stream_ms": stream_ms, "soup_ms": soup_ms,
+            "speedup": soup_ms / stream_ms if stream_ms else 0.0}
+
+
+def synthetic_pages(category: SyntheticCategory) -> list[str]:
+    server = FakeWikiServer(category)
+    return [server.render_page(start, min(start + HTML_LIMIT, len(category)))
+            for start in range(0, len(category), HTML_LIMIT)]
+
+
+def format_table(results: dict[str, dict[str, float]]) -> str:
+    header = (f"{'engine':<13} {'req':>6} {'pages/s':>9} {'titles/s':>10} "
+              f"{'p50 ms':>8} {'p99 ms':>8} {'wall s':>8} {'titles':>13}")
+    lines = [header, '-' * len(header)]
+    for engine, row in results.items():
+        lines.append(
+            f"{engine:<13} {row['requests']:>6} {row['pages_per_s']:>9.1f} "
+            f"{row['titles_per_s']:>10.0f} {row['p50_ms']:>8.2f} {row['p99_ms']:>8.2f} "
+            f"{row['wall_s']:>8.2f} {row['titles']:>6}/{row['expected_titles']:<6}"
+        )
+    return '\n'.join(lines)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--engines', nargs='+', choices=ENGINES, default=list(ENGINES))
+    parser.add_argument('--size', type=int, default=5000, help='страниц в категории')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--latency', type=float, default=0.0, help='задержка ответа, с')
+    parser.add_argument('--jitter', type=float, default=0.0)
+    parser.add_argument('--throttle-rate', type=float, default=0.0, help='доля ответов 429')
+    parser.add_argument('--retry-after', type=float, default=1.0)
+    parser.add_argument('--error-rate', type=float, default=0.0, help='доля ответов 5xx')
+    parser.add_argument('--output', help='записать результаты в JSON')
+    parser.add_argument('--parse', nargs='*', metavar='FILE',
+                        help='бенчмарк разбора сохранённых HTML-страниц категории')
+    parser.add_argument('--repeat', type=int, default=5, help='число замеров разбора')
+    args = parser.parse_args(argv)
+
+    logging.getLogger().setLevel(logging.WARNING)
+    category = SyntheticCategory(size=args.size, seed=args.seed)
+    if args.parse is not None:
+        pages = []
+        for filename in args.parse:
+            with open(filename, encoding='utf-8') as f:
+                pages.append(f.read())
+        result = run_parser_benchmark(pages or synthetic_pages(category), args.repeat)
+        print(f"страниц: {result['pages']}, потоковый: {result['stream_ms']:.1f} мс, "
+              f"BeautifulSoup: {result['soup_ms']:.1f} мс, ускорение: {result['speedup']:.1f}x")
+        return 0
+    faults = Faults(args.latency, args.jitter, args.throttle_rate, args.retry_after,
+                    args.error_rate)
+    results = run_benchmark(category, faults, tuple(args.engines))
+    print(format_table(results))
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+    missing = missing_titles(results)
+    if missing:
+        # Результаты неполных прогонов несравнимы: скорость куплена потерей данных
+        print("Собраны не все заголовки: " + ", ".join(
+            f"{engine} -{count}" for engine, count in missing.items()))
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,282 @@
+"""
+Контрольные точки долгого обхода категории с возможностью продолжения.
+
+Прогресс хранится по диапазонам ключей сортировки: граница диапазона,
+курсор следующей страницы (`cmcontinue` для API или URL следующей страницы
+для HTML), счётчики букв и признак завершения. Файл перезаписывается
+атомарно (временный файл + `os.replace`), поэтому после падения процесса
+на диске всегда целый снимок. С `--resume` обходятся только незавершённые
+диапазоны, начиная с сохранённого курсора.
+
+Продолжение обхода есть только в этом CLI: `python -m task2` и `main`
+отдельных краулеров контрольных точек не ведут и всегда начинают заново.
+
+    python -m task2.checkpoint --engine api --checkpoint crawl.json
+    python -m task2.checkpoint --engine api --checkpoint crawl.json --resume
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import threading
+import time
+from collections.abc import Iterable
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from typing import Any
+
+import aiohttp
+
+from .http_client import HttpClient
+from .rate_limit import AdaptiveRateLimiter
+from .solution import (RUS_ALPHABET, SortkeyRange, fetch_pages, first_letter, get_partitions,
+                       get_prefixes, write_to_csv)
+from .solution_html import iter_chain_pages
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHECKPOINT_PATH = "crawl_checkpoint.json"
+ENGINES = ("api", "html")
+
+
+class PartitionProgress:
+    """Прогресс одного диапазона."""
+
+    __slots__ = ('start', 'end', 'cursor', 'done', 'counts', 'titles')
+
+    def __init__(self, start: str, end: str | None = None, cursor: str | None = None,
+                 done: bool = False, counts: dict[str, int] | None = None, titles: int = 0):
+        self.start = start
+        self.end = end
+        self.cursor = cursor
+        self.done = done
+        self.counts = counts or {}
+        self.titles = titles
+
+    @property
+    def part(self) -> SortkeyRange:
+        return SortkeyRange(self.start, self.end)
+
+    def to_dict(self) -> dict[str, Any]:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+class Checkpoint:
+    """Прогресс обхода по диапазонам; сохраняется каждые `save_every` страниц."""
+
+    def __init__(self, path: str, category: str, engine: str, save_every: int = 5):
+        self.path = path
+        self.category = category
+        self.engine = engine
+        self.save_every = save_every
+        self.partitions: dict[str, PartitionProgress] = {}
+        self._unsaved = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, path: str, category: str, engine: str, save_every: int = 5) -> "Checkpoint":
+        """Читает контрольную точку; если файла нет или он от другого обхода — пустая."""
+        checkpoint = cls(path, category, engine, save_every)
+        try:
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            logger.info(f"Контрольная точка {path} не найдена, обход с начала")
+            return checkpoint
+        if data.get("category") != category or data.get("engine") != engine:
+            logger.warning(f"Контрольная точка {path} относится к другому обходу, обход с начала")
+            return checkpoint
+        for item in data["partitions"]:
+            progress = PartitionProgress(**item)
+            checkpoint.partitions[progress.start] = progress
+        return checkpoint
+
+    def add(self, part: SortkeyRange) -> PartitionProgress:
+        with self._lock:
+            progress = self.partitions.get(part.start)
+            if progress is None:
+                progress = PartitionProgress(part.start, part.end)
+                self.partitions[part.start] = progress
+            return progress
+
+    def narrow(self, progress: PartitionProgress, end: str) -> None:
+        """Сужает диапазон, остаток которого отдан новым диапазонам."""
+        with self._lock:
+            progress.end = end
+
+    def advance(self, progress: PartitionProgress, cursor: str | None,
+                titles: Iterable[str] = ()) -> None:
+        """
+        Учитывает заголовки обработанной страницы и курсор следующей (None — диапазон
+        пройден). Счётчики и курсор меняются вместе, поэтому снимок всегда согласован.
+        """
+        with self._lock:
+            for title in titles:
+                progress.titles += 1
+                letter = first_letter(title)
+                if letter is not None:
+                    progress.counts[letter] = progress.counts.get(letter, 0) + 1
+            progress.cursor = cursor
+            progress.done = cursor is None
+            self._unsaved += 1
+            if progress.done or self._unsaved >= self.save_every:
+                self._save_locked()
+
+    def unfinished(self) -> list[PartitionProgress]:
+        return [progress for progress in self.partitions.values() if not progress.done]
+
+    def letter_counts(self) -> dict[str, int]:
+        counts: dict[str, int] = {}
+        for progress in self.partitions.values():
+            for letter, count in progress.counts.items():
+                counts[letter] = counts.get(letter, 0) + count
+        return counts
+
+    def save(self) -> None:
+        with self._lock:
+            self._save_locked()
+
+    def _save_locked(self) -> None:
+        data = {
+            "category": self.category,
+            "engine": self.engine,
+            "partitions": [progress.to_dict() for progress in self.partitions.values()],
+        }
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+        self._unsaved = 0
+
+
+async def crawl_api(checkpoint: Checkpoint, session: aiohttp.ClientSession,
+                    limiter: AdaptiveRateLimiter | None = None, split: bool = True) -> None:
+    """
+    Обходит незавершённые диапазоны через API, отмечая прогресс в `checkpoint`.
+
+    При продолжении (`split=False`) набор диапазонов уже зафиксирован в
+    контрольной точке, поэтому плотные диапазоны повторно не делятся.
+    """
+    limiter = limiter or AdaptiveRateLimiter()
+    pending: set[asyncio.Task] = set()
+
+    async def crawl(progress: PartitionProgress) -> None:
+        narrowed = False
+        page: list[str] = []
+
+        def on_progress(cursor: str | None) -> None:
+            # fetch_pages вызывает его после обработки страницы (или без страницы в конце)
+            checkpoint.advance(progress, cursor, page)
+            page.clear()
+
+        def spawn(part: SortkeyRange) -> None:
+            nonlocal narrowed
+            if not narrowed:
+                # Новые диапазоны идут по возрастанию: первый отсекает хвост текущего
+                checkpoint.narrow(progress, part.start)
+                narrowed = True
+            start(checkpoint.add(part))
+
+        async for members in fetch_pages(
+                progress.part, checkpoint.category, session, limiter,
+                spawn if split else None,
+                cmcontinue=progress.cursor, on_progress=on_progress):
+            page[:] = [member["title"] for member in members]
+
+    def start(progress: PartitionProgress) -> None:
+        pending.add(asyncio.create_task(crawl(progress)))
+
+    for progress in checkpoint.unfinished():
+        start(progress)
+    while pending:
+        done, _ = await asyncio.wait(pending)
+        pending.difference_update(done)
+        for task in done:
+            if task.exception() is not None:
+                logger.error(f"Ошибка при обходе диапазона: {task.exception()}")
+
+
+def crawl_html(checkpoint: Checkpoint, workers: int = 8, delay: float = 0.5,
+               client: HttpClient | None = None) -> None:
+    """
+    Обходит незавершённые цепочки HTML-страниц, отмечая прогресс в `checkpoint`.
+    Переданный `client` не закрывается; собственный клиент закрывается по завершении.
+    """
+    def crawl(progress: PartitionProgress) -> None:
+        for titles, next_url in iter_chain_pages(progress.part, client, delay,
+                                                 start_url=progress.cursor,
+                                                 category=checkpoint.category):
+            checkpoint.advance(progress, next_url, titles)
+
+    owned = HttpClient(pool_maxsize=workers) if client is None else nullcontext(client)
+    with owned as client, ThreadPoolExecutor(max_workers=workers) as executor:
+        for future in [executor.submit(crawl, progress) for progress in checkpoint.unfinished()]:
+            exception = future.exception()
+            if exception is not None:
+                logger.error(f"Ошибка при обходе цепочки: {exception}")
+
+
+def initial_partitions(engine: str) -> list[SortkeyRange]:
+    if engine == "html":
+        # Первая цепочка HTML начинается с начала категории, как в solution_html
+        return get_partitions(['', *RUS_ALPHABET[1:]])
+    return get_partitions(get_prefixes(length=1))
+
+
+def count_with_checkpoint(category: str = "Животные по алфавиту", engine: str = "api",
+                          path: str = DEFAULT_CHECKPOINT_PATH, resume: bool = False,
+                          save_every: int = 5, workers: int = 8) -> dict[str, int]:
+    """Считает буквы, сохраняя прогресс; с `resume` продолжает прерванный обход."""
+    if resume:
+        checkpoint = Checkpoint.load(path, category, engine, save_every)
+    else:
+        checkpoint = Checkpoint(path, category, engine, save_every)
+    resumed = bool(checkpoint.partitions)
+    if not resumed:
+        for part in initial_partitions(engine):
+            checkpoint.add(part)
+    logger.info(f"Незавершённых диапазонов: {len(checkpoint.unfinished())} "
+                f"из {len(checkpoint.partitions)}")
+
+    if engine == "api":
+        async def run() -> None:
+            async with aiohttp.ClientSession() as session:
+                await crawl_api(checkpoint, session, split=not resumed)
+
+        asyncio.run(run())
+    else:
+        crawl_html(checkpoint, workers)
+    checkpoint.save()
+
+    unfinished = checkpoint.unfinished()
+    if unfinished:
+        logger.warning(f"Не завершено диапазонов: {len(unfinished)}; "
+                       f"продолжите обход с --resume")
+    return checkpoint.letter_counts()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Подсчёт по буквам с контрольными точками")
+    parser.add_argument("--engine", choices=ENGINES, default="api")
+    parser.add_argument("--category", default="Животные по алфавиту")
+    parser.add_argument("--checkpoint", default=DEFAULT_CHECKPOINT_PATH,
+                        help="файл контрольной точки")
+    parser.add_argument("--resume", action="store_true",
+                        help="продолжить обход незавершённых диапазонов")
+    parser.add_argument("--save-every", type=int, default=5,
+                        help="сохранять прогресс каждые N страниц")
+    parser.add_argument("--workers", type=int, default=8, help="потоков для HTML")
+    parser.add_argument("--output", default="beasts.csv")
+    args = parser.parse_args()
+
+    start_time = time.time()
+    letter_counts = count_with_checkpoint(args.category, args.engine, args.checkpoint,
+                                          args.resume, args.save_every, args.workers)
+    write_to_csv(letter_counts, filename=args.output)
+    logger.info(f"Подсчитано заголовков: {sum(letter_counts.values())}")
+    logger.info(f"Время выполнения: {time.time() - start_time:.2f} секунд")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+"""
+Общие фикстуры тестов task2: быстрый лимитер и локальная «Википедия».
+"""
+from contextlib import ExitStack
+from unittest.mock import patch
+
+import pytest
+
+from .fake_wiki import FakeWikiServer
+from .rate_limit import AdaptiveRateLimiter
+
+
+def make_fast_limiter() -> AdaptiveRateLimiter:
+    return AdaptiveRateLimiter(rate=1000.0, burst=1000, concurrency=16)
+
+
+@pytest.fixture
+def fast_limiter():
+    """Фабрика лимитера без заметных пауз (можно подставить вместо класса)."""
+    return make_fast_limiter
+
+
+@pytest.fixture
+def fake_wiki():
+    """
+    Фабрика `fake_wiki(category, faults, seed=..., ...)`: запускает `FakeWikiServer`
+    до конца теста и направляет на него краулеры API (async и sync) и HTML.
+    """
+    with ExitStack() as stack:
+        def start(*args, **kwargs) -> FakeWikiServer:
+            server = stack.enter_context(FakeWikiServer(*args, **kwargs))
+            stack.enter_context(patch("task2.solution.API_URL", server.api_url))
+            stack.enter_context(patch("task2.solution_sync.API_URL", server.api_url))
+            stack.enter_context(patch("task2.solution_html.BASE_URL", server.base_url))
+            # Синхронные краулеры ждут между повторами через time.sleep
+            stack.enter_context(patch("time.sleep"))
+            return server
+        yield start
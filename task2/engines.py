@@ -0,0 +1,157 @@
+"""
+Общий интерфейс трёх реализаций подсчёта по буквам.
+
+Движок (`Engine`) по имени категории отдаёт её заголовки; запросы и их статусы
+пишутся в переданный `Metrics`. `run_engine` замеряет прогон и считает буквы,
+`compare_results` сравнивает результаты нескольких движков с первым из них.
+Точка входа командной строки — `python -m task2` (см. `task2/__main__.py`).
+"""
+import logging
+import time
+from collections.abc import Iterable
+from typing import NamedTuple, Protocol
+
+from . import solution, solution_html, solution_sync
+from .http_client import HttpClient
+from .metrics import Metrics
+from .rate_limit import AdaptiveRateLimiter
+
+logger = logging.getLogger(__name__)
+
+
+class Engine(Protocol):
+    name: str
+
+    def collect_titles(self, category: str, metrics: Metrics) -> Iterable[str]:
+        ...
+
+
+class AsyncApiEngine:
+    """Асинхронный обход API по диапазонам ключей сортировки (`solution`)."""
+
+    name = "async-api"
+
+    def __init__(self, concurrency: int = 8):
+        self.concurrency = concurrency
+
+    def collect_titles(self, category: str, metrics: Metrics) -> Iterable[str]:
+        limiter = AdaptiveRateLimiter(concurrency=self.concurrency,
+                                      max_concurrency=max(self.concurrency, 64))
+        return solution.get_category_members_api(category, limiter, metrics)
+
+
+class SyncApiEngine:
+    """Одна цепочка cmcontinue через `HttpClient` (`solution_sync`)."""
+
+    name = "sync-api"
+
+    def __init__(self, concurrency: int = 1):
+        # Цепочка cmcontinue последовательна: параллельность не используется
+        self.concurrency = 1
+
+    def collect_titles(self, category: str, metrics: Metrics) -> Iterable[str]:
+        with HttpClient(metrics=metrics) as client:
+            return list(solution_sync.iter_category_members_api(category, client))
+
+
+class HtmlEngine:
+    """Страницы категории; при `concurrency` > 1 — параллельные цепочки по буквам."""
+
+    name = "html"
+
+    def __init__(self, concurrency: int = 8):
+        self.concurrency = concurrency
+
+    def collect_titles(self, category: str, metrics: Metrics) -> Iterable[str]:
+        if self.concurrency > 1:
+            return solution_html.get_category_members_html_parallel(
+                self.concurrency, metrics=metrics, category=category)
+        with HttpClient(metrics=metrics) as client:
+            return solution_html.get_category_members_html(client, category)
+
+
+ENGINES: dict[str, type[Engine]] = {
+    engine.name: engine for engine in (AsyncApiEngine, SyncApiEngine, HtmlEngine)
+}
+
+
+def create_engine(name: str, concurrency: int = 8) -> Engine:
+    try:
+        return ENGINES[name](concurrency)
+    except KeyError:
+        raise ValueError(f"Неизвестный движок: {name}") from None
+
+
+class EngineResult(NamedTuple):
+    engine: str
+    titles: frozenset[str]
+    letter_counts: dict[str, int]
+    requests: int
+    wall_time: float
+
+
+def run_engine(engine: Engine, category: str = solution.DEFAULT_CATEGORY,
+               metrics: Metrics | None = None) -> EngineResult:
+    """Прогон движка: уникальные заголовки, счётчики букв, число запросов и время."""
+    metrics = metrics or Metrics()
+    logger.info(f"Движок {engine.name}: обход категории '{category}'")
+    start = time.perf_counter()
+    titles = frozenset(engine.collect_titles(category, metrics))
+    wall_time = time.perf_counter() - start
+    letter_counts = solution.count_letters(titles)
+    # Повторённые внутри клиента запросы тоже попадают в статусы
+    requests = sum(metrics.statuses.values())
+    logger.info(f"Движок {engine.name}: {len(titles)} заголовков, {requests} запросов, "
+                f"{wall_time:.2f} секунд")
+    return EngineResult(engine.name, titles, letter_counts, requests, wall_time)
+
+
+def compare_results(results: list[EngineResult]) -> dict[str, dict]:
+    """
+    Расхождения каждого движка с первым (эталонным): заголовки, которых нет
+    или которые лишние, и буквы с разными счётчиками (значения — пары
+    эталон/движок).
+    """
+    reference = results[0]
+    diffs = {}
+    for result in results[1:]:
+        letters = sorted(set(reference.letter_counts) | set(result.letter_counts),
+                         key=solution.ORDER_RUS_ALPHABET.__getitem__)
+        diffs[result.engine] = {
+            "missing": sorted(reference.titles - result.titles),
+            "extra": sorted(result.titles - reference.titles),
+            "letters": {letter: (reference.letter_counts.get(letter, 0),
+                                 result.letter_counts.get(letter, 0))
+                        for letter in letters
+                        if reference.letter_counts.get(letter, 0)
+                        != result.letter_counts.get(letter, 0)},
+        }
+    return diffs
+
+
+def format_comparison(results: list[EngineResult], examples: int = 5) -> str:
+    header = f"{'engine':<10} {'titles':>8} {'requests':>9} {'wall s':>8}  diff"
+    lines = [header, '-' * len(header)]
+    diffs = compare_results(results)
+    for result in results:
+        diff = diffs.get(result.engine)
+        if diff is None:
+            status = "эталон"
+        elif not (diff["missing"] or diff["extra"]):
+            status = "совпадает"
+        else:
+            status = f"-{len(diff['missing'])} +{len(diff['extra'])}"
+        lines.append(f"{result.engine:<10} {len(result.titles):>8} {result.requests:>9} "
+                     f"{result.wall_time:>8.2f}  {status}")
+    for engine, diff in diffs.items():
+        for kind in ("missing", "extra"):
+            if diff[kind]:
+                shown = ", ".join(diff[kind][:examples])
+                hidden = len(diff[kind]) - examples
+                more = f" (и ещё {hidden})" if hidden > 0 else ""
+                lines.append(f"{engine} {kind}: {shown}{more}")
+        if diff["letters"]:
+            lines.append(f"{engine} letters: " + ", ".join(
+                f"{letter} {expected}->{actual}"
+                for letter, (expected, actual) in diff["letters"].items()))
+    return '\n'.join(lines)
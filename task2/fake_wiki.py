@@ -0,0 +1,339 @@
+"""
+Локальная замена ru.wikipedia.org для офлайн-тестов и бенчмарков краулеров.
+
+Отдаёт синтетические категории через `w/api.php?list=categorymembers`
+(cmcontinue, cmstartsortkeyprefix, cmprop), их размеры через
+`prop=categoryinfo` и HTML-страницы категорий (`/wiki/Категория:...`,
+переход по `pagefrom`, 200 ссылок на страницу).
+Умеет добавлять задержку, отвечать 429 с Retry-After и 5xx; сжимает ответы
+gzip, если клиент об этом просит.
+
+    python -m task2.fake_wiki --size 20000 --latency 0.05 --throttle-rate 0.02
+"""
+import argparse
+import asyncio
+import bisect
+import html
+import itertools
+import math
+import random
+import socket
+import threading
+import time
+from typing import NamedTuple
+from urllib.parse import quote
+
+from aiohttp import web
+
+from .solution import RUS_ALPHABET, sortkey_position
+
+CATEGORY_PREFIX = "Категория:"
+API_LIMIT = 500
+HTML_LIMIT = 200
+_LOWER_ALPHABET = RUS_ALPHABET.lower()
+
+
+class Faults(NamedTuple):
+    """Внедряемые задержки и ошибки (вероятности — на каждый запрос)."""
+    latency: float = 0.0
+    jitter: float = 0.0
+    throttle_rate: float = 0.0
+    retry_after: float = 1.0
+    error_rate: float = 0.0
+    error_status: int = 500
+
+
+class SyntheticCategory:
+    """Категория из `size` страниц, отсортированных как в API (по ключу сортировки)."""
+
+    def __init__(self, name: str = "Животные по алфавиту", size: int = 5000,
+                 letter_weights: dict[str, float] | None = None, seed: int = 0):
+        """
+        :param letter_weights: относительные частоты первых букв
+            (по умолчанию — равномерно по RUS_ALPHABET); допускаются и нерусские буквы
+        """
+        self.name = normalize_title(name)
+        weights = letter_weights or {letter: 1.0 for letter in RUS_ALPHABET}
+        rng = random.Random(seed)
+        letters = rng.choices(list(weights), weights=list(weights.values()), k=size)
+        titles = [
+            f"{letter}{''.join(rng.choices(_LOWER_ALPHABET, k=rng.randint(2, 8)))} {index}"
+            for index, letter in enumerate(letters)
+        ]
+        titles.sort(key=sortkey_position)
+        self.titles = titles
+        self.pageids = rng.sample(range(1, size * 10 + 1), size)
+        self._keys = [sortkey_position(title) for title in titles]
+
+    def __len__(self) -> int:
+        return len(self.titles)
+
+    def letter_counts(self) -> dict[str, int]:
+        """Ожидаемый результат подсчёта по буквам."""
+        counts: dict[str, int] = {}
+        for title in self.titles:
+            letter = title[0].upper()
+            if letter in RUS_ALPHABET:
+                counts[letter] = counts.get(letter, 0) + 1
+        return counts
+
+    def position(self, sortkey: str) -> int:
+        """Индекс первой страницы с ключом не меньше `sortkey`."""
+        return bisect.bisect_left(self._keys, sortkey_position(sortkey))
+
+    def member(self, index: int) -> dict:
+        return {"pageid": self.pageids[index], "ns": 0, "title": self.titles[index],
+                "sortkeyprefix": "", "type": "page", "timestamp": "2024-01-01T00:00:00Z"}
+
+
+def normalize_title(title: str) -> str:
+    title = title.replace("_", " ")
+    return title[len(CATEGORY_PREFIX):] if title.startswith(CATEGORY_PREFIX) else title
+
+
+def percentile(values: list[float], q: float) -> float:
+    """Перцентиль по ближайшему рангу (0 для пустого списка)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[max(math.ceil(q / 100 * len(ordered)) - 1, 0)]
+
+
+class FakeWikiServer:
+    """
+    aiohttp-приложение с синтетической категорией (и дополнительными `extra_categories`).
+
+    Использование из синхронного кода: `with FakeWikiServer(category) as server: ...` —
+    сервер работает в отдельном потоке со своим циклом событий.
+    """
+
+    def __init__(self, category: SyntheticCategory, faults: Faults = Faults(),
+                 host: str = "127.0.0.1", port: int = 0, seed: int = 0,
+                 extra_categories: tuple[SyntheticCategory, ...] = ()):
+        self.category = category
+        self.categories = {item.name: item for item in (category, *extra_categories)}
+        self.faults = faults
+        self.host = host
+        self.port = port
+        self._rng = random.Random(seed)
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._runner: web.AppRunner | None = None
+        self._thread: threading.Thread | None = None
+        self.reset_stats()
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    @property
+    def api_url(self) -> str:
+        return f"{self.base_url}/w/api.php"
+
+    def reset_stats(self) -> None:
+        self.requests = 0
+        self.ok = 0
+        self.throttled = 0
+        self.errors = 0
+        self.bytes_sent = 0
+        self.latencies: list[float] = []
+
+    def make_app(self) -> web.Application:
+        app = web.Application(middlewares=[self._measure])
+        app.router.add_get("/w/api.php", self.handle_api)
+        app.router.add_get("/w/index.php", self.handle_index)
+        app.router.add_get("/wiki/{title}", self.handle_wiki)
+        return app
+
+    @web.middleware
+    async def _measure(self, request: web.Request, handler) -> web.StreamResponse:
+        started = time.perf_counter()
+        self.requests += 1
+        faults = self.faults
+        if faults.latency or faults.jitter:
+            await asyncio.sleep(faults.latency + self._rng.uniform(0, faults.jitter))
+        roll = self._rng.random()
+        if roll < faults.throttle_rate:
+            self.throttled += 1
+            response = web.Response(status=429, text="Too Many Requests",
+                                    # Как MediaWiki: целое число секунд (дробное urllib3 не примет)
+                                    headers={"Retry-After": str(math.ceil(faults.retry_after))})
+        elif roll < faults.throttle_rate + faults.error_rate:
+            self.errors += 1
+            response = web.Response(status=faults.error_status, text="Server Error")
+        else:
+            try:
+                response = await handler(request)
+                self.ok += 1
+            except web.HTTPException as e:
+                response = e
+        body = getattr(response, "body", None)
+        self.bytes_sent += len(body) if isinstance(body, bytes) else 0
+        if "gzip" in request.headers.get("Accept-Encoding", ""):
+            response.enable_compression()
+        self.latencies.append(time.perf_counter() - started)
+        return response
+
+    async def handle_api(self, request: web.Request) -> web.Response:
+        query = request.query
+        if query.get("prop") == "categoryinfo":
+            return web.json_response(self._category_info(query.get("titles", "")))
+        if query.get("list") != "categorymembers":
+            return web.json_response({"error": {"code": "badvalue", "info": "list"}})
+        category = self.categories.get(normalize_title(query.get("cmtitle", "")))
+        if category is None:
+            return web.json_response({"batchcomplete": "", "query": {"categorymembers": []}})
+        limit = min(int(query.get("cmlimit", 10)), API_LIMIT)
+        if "cmcontinue" in query:
+            start = int(query["cmcontinue"].rsplit("|", 1)[-1])
+        else:
+            start = category.position(query.get("cmstartsortkeyprefix", ""))
+        end = min(start + limit, len(category))
+        fields = set(query.get("cmprop", "ids|title").split("|"))
+        members = [self._api_member(category, index, fields) for index in range(start, end)]
+        if "page" not in query.get("cmtype", "page").split("|"):
+            members = []
+        data: dict = {"query": {"categorymembers": members}}
+        if end < len(category):
+            data["continue"] = {"cmcontinue": f"page|{end}", "continue": "-||"}
+        else:
+            data["batchcomplete"] = ""
+        return web.json_response(data)
+
+    def _category_info(self, titles: str) -> dict:
+        """Ответ `prop=categoryinfo`: размер известных категорий, остальные — missing."""
+        pages = {}
+        for index, title in enumerate(filter(None, titles.split("|")), start=1):
+            category = self.categories.get(normalize_title(title))
+            if category is None:
+                pages[str(-index)] = {"ns": 14, "title": title, "missing": ""}
+            else:
+                pages[str(index)] = {"pageid": index, "ns": 14, "title": title,
+                                     "categoryinfo": {"size": len(category),
+                                                      "pages": len(category),
+                                                      "files": 0, "subcats": 0}}
+        return {"batchcomplete": "", "query": {"pages": pages}}
+
+    @staticmethod
+    def _api_member(category: SyntheticCategory, index: int, fields: set[str]) -> dict:
+        member = category.member(index)
+        result = {"ns": 0, "title": member["title"]}
+        if "ids" in fields:
+            result["pageid"] = member["pageid"]
+        for field in ("sortkeyprefix", "type", "timestamp"):
+            if field in fields:
+                result[field] = member[field]
+        return result
+
+    async def handle_wiki(self, request: web.Request) -> web.Response:
+        return self._category_page(request.match_info["title"], request.query.get("pagefrom"))
+
+    async def handle_index(self, request: web.Request) -> web.Response:
+        return self._category_page(request.query.get("title", ""), request.query.get("pagefrom"))
+
+    def _category_page(self, title: str, pagefrom: str | None) -> web.Response:
+        category = self.categories.get(normalize_title(title))
+        if not title.replace("_", " ").startswith(CATEGORY_PREFIX) or category is None:
+            raise web.HTTPNotFound()
+        start = category.position(pagefrom) if pagefrom else 0
+        end = min(start + HTML_LIMIT, len(category))
+        return web.Response(text=self.render_page(start, end, category),
+                            content_type="text/html")
+
+    def render_page(self, start: int, end: int,
+                    category: SyntheticCategory | None = None) -> str:
+        """HTML страницы категории с разметкой, повторяющей MediaWiki."""
+        category = category or self.category
+        category_title = f"{CATEGORY_PREFIX}{category.name}"
+        nav = ""
+        if end < len(category):
+            href = (f"/w/index.php?title={quote(category_title.replace(' ', '_'))}"
+                    f"&pagefrom={quote(category.titles[end])}#mw-pages")
+            nav = (f'(<a href="{html.escape(href)}" title="{html.escape(category_title)}">'
+                   f'Следующая страница</a>)')
+        # Как в MediaWiki: ссылки сгруппированы по первой букве ключа сортировки
+        groups = "\n".join(
+            f'<div class="mw-category-group"><h3>{html.escape(letter)}</h3>\n<ul>\n'
+            + "\n".join(
+                f'<li><a href="/wiki/{quote(title.replace(" ", "_"))}" '
+                f'title="{html.escape(title)}">{html.escape(title)}</a></li>'
+                for title in titles
+            )
+            + "\n</ul></div>"
+            for letter, titles in itertools.groupby(category.titles[start:end],
+                                                    key=lambda title: title[:1].upper())
+        )
+        return (
+            "<!DOCTYPE html>\n<html><head><title>"
+            f"{html.escape(category_title)} — Википедия</title></head><body>\n"
+            '<div id="mw-navigation"><a href="/wiki/Main" title="Заглавная">Заглавная</a></div>\n'
+            f'<div id="mw-subcategories"></div>\n'
+            f'<div id="mw-pages">\n<h2>Страницы в категории «{html.escape(category.name)}»'
+            f"</h2>\n{nav}\n"
+            f'<div lang="ru" dir="ltr" class="mw-content-ltr"><div class="mw-category">'
+            f"\n{groups}\n</div></div>\n{nav}\n</div>\n"
+            '<div id="catlinks"><a href="/wiki/Служебная:Категории" '
+            'title="Служебная:Категории">Категории</a></div>\n'
+            "</body></html>\n"
+        )
+
+    def start(self) -> "FakeWikiServer":
+        """Запускает сервер в фоновом потоке и ждёт, пока он начнёт принимать соединения."""
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        sock.bind((self.host, self.port))
+        self.port = sock.getsockname()[1]
+        self._loop = asyncio.new_event_loop()
+        ready = threading.Event()
+
+        def run() -> None:
+            assert self._loop is not None
+            asyncio.set_event_loop(self._loop)
+            self._runner = web.AppRunner(self.make_app(), access_log=None)
+            self._loop.run_until_complete(self._runner.setup())
+            self._loop.run_until_complete(web.SockSite(self._runner, sock).start())
+            ready.set()
+            self._loop.run_forever()
+
+        self._thread = threading.Thread(target=run, name="fake-wiki", daemon=True)
+        self._thread.start()
+        ready.wait()
+        return self
+
+    def stop(self) -> None:
+        if self._loop is None or self._runner is None or self._thread is None:
+            return
+        asyncio.run_coroutine_threadsafe(self._runner.cleanup(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+        self._loop = self._runner = self._thread = None
+
+    def __enter__(self) -> "FakeWikiServer":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Локальная замена API и HTML Википедии")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--category", default="Животные по алфавиту")
+    parser.add_argument("--size", type=int, default=5000)
+    parser.add_argument("--latency", type=float, default=0.0, help="задержка ответа, с")
+    parser.add_argument("--jitter", type=float, default=0.0, help="случайная добавка к задержке, с")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="доля ответов 429")
+    parser.add_argument("--retry-after", type=float, default=1.0)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="доля ответов 5xx")
+    args = parser.parse_args()
+
+    category = SyntheticCategory(args.category, args.size)
+    faults = Faults(args.latency, args.jitter, args.throttle_rate, args.retry_after,
+                    args.error_rate)
+    server = FakeWikiServer(category, faults, args.host, args.port)
+    web.run_app(server.make_app(), host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+"""
+Общий HTTP-клиент синхронных краулеров (`solution_sync`, `solution_html`).
+
+Одна `requests.Session` с пулом keep-alive соединений вместо `requests.get`
+на каждую страницу (новое соединение и TLS-рукопожатие на каждый запрос),
+явное `Accept-Encoding: gzip`, повторы urllib3 `Retry` с экспоненциальной
+паузой на 429/5xx (с учётом Retry-After) и настраиваемый User-Agent.
+Клиент считает байты на проводе (до распаковки) и долю переиспользованных
+соединений.
+"""
+import logging
+import threading
+import time
+from typing import Callable
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from .metrics import Metrics
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_USER_AGENT = "tetrika-junior-crawler/1.0 (https://github.com/NikkZav/tetrika-junior)"
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+class _ObservedRetry(Retry):
+    """Retry, сообщающий о фактических паузах перед повторами."""
+
+    on_sleep: Callable[[float], None] | None = None
+
+    def new(self, **kwargs) -> "_ObservedRetry":
+        retry = super().new(**kwargs)
+        retry.on_sleep = self.on_sleep
+        return retry
+
+    def sleep(self, response=None) -> None:
+        started = time.monotonic()
+        super().sleep(response)
+        if self.on_sleep is not None:
+            self.on_sleep(time.monotonic() - started)
+
+
+class HttpClient:
+    """Пул соединений с повторами; потокобезопасен для одновременных GET-запросов."""
+
+    def __init__(self, user_agent: str = DEFAULT_USER_AGENT,
+                 pool_connections: int = 4, pool_maxsize: int = 8,
+                 retries: int = 5, backoff_factor: float = 0.5, timeout: float = 10.0,
+                 metrics: Metrics | None = None):
+        """
+        :param pool_connections: сколько хостов держать в пуле
+        :param pool_maxsize: соединений на хост (не меньше числа потоков-краулеров)
+        :param retries: повторов на 429/5xx и ошибки соединения
+        :param backoff_factor: база экспоненциальной паузы между повторами, с
+        :param metrics: куда записывать длительность, размер и статусы запросов
+            (включая повторённые внутри urllib3) и паузы перед повторами
+        """
+        self.timeout = timeout
+        self.metrics = metrics
+        self.session = requests.Session()
+        self.session.headers.update({"User-Agent": user_agent, "Accept-Encoding": "gzip"})
+        retry = _ObservedRetry(total=retries, backoff_factor=backoff_factor,
+                               status_forcelist=RETRY_STATUSES,
+                               allowed_methods=frozenset({"GET"}),
+                               respect_retry_after_header=True)
+        if metrics is not None:
+            retry.on_sleep = metrics.retry_wait
+        self.adapter = HTTPAdapter(pool_connections=pool_connections,
+                                   pool_maxsize=pool_maxsize, max_retries=retry)
+        self.session.mount("https://", self.adapter)
+        self.session.mount("http://", self.adapter)
+        self.responses = 0
+        self.bytes_wire = 0
+        self.bytes_decoded = 0
+        self._lock = threading.Lock()
+
+    def get(self, url: str, params: dict | None = None) -> requests.Response:
+        """GET с повторами; тело ответа читается сразу, соединение возвращается в пул."""
+        metrics = self.metrics
+        started = metrics.request_started() if metrics is not None else 0.0
+        status: int | str = "error"
+        size = None
+        try:
+            response = self.session.get(url, params=params, timeout=self.timeout)
+            content = response.content
+            status, size = response.status_code, response.raw.tell()
+            if metrics is not None and response.raw.retries is not None:
+                for attempt in response.raw.retries.history:
+                    if attempt.status is not None:
+                        metrics.count_status(attempt.status)
+        finally:
+            if metrics is not None:
+                metrics.request_finished(started, status, size)
+        with self._lock:
+            self.responses += 1
+            self.bytes_wire += size
+            self.bytes_decoded += len(content)
+        return response
+
+    def stats(self) -> dict[str, float]:
+        """Число запросов (включая повторы), новых соединений, байты и доля переиспользования."""
+        pools = self.adapter.poolmanager.pools
+        pools = [pools[key] for key in pools.keys()]
+        requests_sent = sum(pool.num_requests for pool in pools)
+        connections = sum(pool.num_connections for pool in pools)
+        return {
+            "responses": self.responses,
+            "requests": requests_sent,
+            "connections": connections,
+            "reuse_rate": 1 - connections / requests_sent if requests_sent else 0.0,
+            "bytes_wire": self.bytes_wire,
+            "bytes_decoded": self.bytes_decoded,
+        }
+
+    def log_stats(self) -> None:
+        stats = self.stats()
+        logger.info(f"HTTP: запросов {stats['requests']}, соединений {stats['connections']} "
+                    f"(переиспользование {stats['reuse_rate']:.0%}), "
+                    f"получено {stats['bytes_wire']} байт "
+                    f"({stats['bytes_decoded']} после распаковки)")
+
+    def close(self) -> None:
+        self.session.close()
+
+    def __enter__(self) -> "HttpClient":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+_default_client: HttpClient | None = None
+_default_lock = threading.Lock()
+
+
+def get_default_client() -> HttpClient:
+    """Общий клиент процесса: соединения переиспользуются между вызовами краулеров."""
+    global _default_client
+    with _default_lock:
+        if _default_client is None:
+            _default_client = HttpClient()
+        return _default_client
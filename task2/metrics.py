@@ -0,0 +1,163 @@
+"""
+Метрики обхода: чем был занят медленный прогон — сетью, троттлингом или разбором.
+
+`Metrics` собирает гистограммы длительности запросов, размеров ответов,
+времени декодирования JSON и разбора HTML, счётчики статусов (429/5xx),
+число и суммарную длительность пауз перед повторами и число одновременных
+запросов во времени (пик по секундам от начала обхода). В конце прогона
+метрики пишутся в JSON и в текстовый формат Prometheus.
+"""
+import json
+import threading
+import time
+from collections.abc import Sequence
+
+LATENCY_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (1024, 4096, 16384, 65536, 262144, 1048576)
+DECODE_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1)
+
+
+class Histogram:
+    """Кумулятивная гистограмма в духе Prometheus (верхние границы корзин)."""
+
+    __slots__ = ('bounds', 'counts', 'sum', 'count')
+
+    def __init__(self, bounds: Sequence[float]):
+        self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        for index, bound in enumerate(self.bounds):
+            if value <= bound:
+                break
+        else:
+            index = len(self.bounds)
+        self.counts[index] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self) -> list[tuple[str, int]]:
+        """Пары (граница `le`, число наблюдений не больше неё), последняя — `+Inf`."""
+        result, total = [], 0
+        for bound, count in zip([*map(str, self.bounds), '+Inf'], self.counts):
+            total += count
+            result.append((bound, total))
+        return result
+
+    def to_dict(self) -> dict:
+        return {"buckets": dict(self.cumulative()), "sum": self.sum, "count": self.count}
+
+
+class Metrics:
+    """Потокобезопасный сборщик метрик одного прогона."""
+
+    HISTOGRAMS = {
+        "request_duration_seconds": ("Длительность HTTP-запроса", LATENCY_BUCKETS),
+        "response_size_bytes": ("Размер тела ответа", SIZE_BUCKETS),
+        "json_decode_seconds": ("Время декодирования JSON", DECODE_BUCKETS),
+        "html_parse_seconds": ("Время разбора HTML-страницы", DECODE_BUCKETS),
+    }
+
+    def __init__(self, prefix: str = "crawler"):
+        self.prefix = prefix
+        self.histograms = {name: Histogram(bounds)
+                           for name, (_, bounds) in self.HISTOGRAMS.items()}
+        self.statuses: dict[str, int] = {}
+        self.retries = 0
+        self.retry_wait_seconds = 0.0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.in_flight_timeline: dict[int, int] = {}
+        self._started_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def request_started(self) -> float:
+        """Отмечает начало запроса; возвращает отметку времени для `request_finished`."""
+        now = time.monotonic()
+        with self._lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            second = int(now - self._started_at)
+            self.in_flight_timeline[second] = max(self.in_flight_timeline.get(second, 0),
+                                                  self.in_flight)
+        return now
+
+    def request_finished(self, started: float, status: int | str,
+                         size: int | None = None) -> None:
+        """`status` — HTTP-код или имя ошибки, если ответа нет."""
+        elapsed = time.monotonic() - started
+        with self._lock:
+            self.in_flight -= 1
+            self.histograms["request_duration_seconds"].observe(elapsed)
+            if size is not None:
+                self.histograms["response_size_bytes"].observe(size)
+            self.statuses[str(status)] = self.statuses.get(str(status), 0) + 1
+
+    def count_status(self, status: int) -> None:
+        """Учитывает ответ, который не дошёл до вызывающего (повторён внутри клиента)."""
+        with self._lock:
+            self.statuses[str(status)] = self.statuses.get(str(status), 0) + 1
+
+    def retry_wait(self, seconds: float) -> None:
+        with self._lock:
+            self.retries += 1
+            self.retry_wait_seconds += seconds
+
+    def observe(self, name: str, value: float) -> None:
+        with self._lock:
+            self.histograms[name].observe(value)
+
+    def count(self, predicate) -> int:
+        return sum(count for status, count in self.statuses.items()
+                   if status.isdigit() and predicate(int(status)))
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            return {
+                "elapsed_seconds": time.monotonic() - self._started_at,
+                "histograms": {name: histogram.to_dict()
+                               for name, histogram in self.histograms.items()},
+                "statuses": dict(self.statuses),
+                "throttled": self.count(lambda status: status == 429),
+                "server_errors": self.count(lambda status: status >= 500),
+                "retries": self.retries,
+                "retry_wait_seconds": self.retry_wait_seconds,
+                "max_in_flight": self.max_in_flight,
+                "in_flight_timeline": sorted(self.in_flight_timeline.items()),
+            }
+
+    def to_prometheus(self) -> str:
+        """Текстовый формат экспозиции Prometheus."""
+        lines = []
+        with self._lock:
+            for name, (help_text, _) in self.HISTOGRAMS.items():
+                metric = f"{self.prefix}_{name}"
+                histogram = self.histograms[name]
+                lines += [f"# HELP {metric} {help_text}", f"# TYPE {metric} histogram"]
+                lines += [f'{metric}_bucket{{le="{bound}"}} {count}'
+                          for bound, count in histogram.cumulative()]
+                lines += [f"{metric}_sum {histogram.sum}", f"{metric}_count {histogram.count}"]
+            metric = f"{self.prefix}_responses_total"
+            lines += [f"# HELP {metric} Ответы по HTTP-статусу", f"# TYPE {metric} counter"]
+            lines += [f'{metric}{{status="{status}"}} {count}'
+                      for status, count in sorted(self.statuses.items())]
+            for name, help_text, kind, value in (
+                ("retries_total", "Повторы после 429/5xx", "counter", self.retries),
+                ("retry_wait_seconds_total", "Суммарная пауза перед повторами", "counter",
+                 self.retry_wait_seconds),
+                ("in_flight_max", "Пик одновременных запросов", "gauge", self.max_in_flight),
+            ):
+                metric = f"{self.prefix}_{name}"
+                lines += [f"# HELP {metric} {help_text}", f"# TYPE {metric} {kind}",
+                          f"{metric} {value}"]
+        return "\n".join(lines) + "\n"
+
+    def dump(self, json_path: str | None = None, prometheus_path: str | None = None) -> None:
+        if json_path:
+            with open(json_path, "w", encoding="utf-8") as f:
+                json.dump(self.to_dict(), f, ensure_ascii=False, indent=2)
+        if prometheus_path:
+            with open(prometheus_path, "w", encoding="utf-8") as f:
+                f.write(self.to_prometheus())
@@ -0,0 +1,201 @@
+"""
+Потоковый подсчёт букв с памятью, не зависящей от размера категории.
+
+Конвейер: загрузчики страниц по диапазонам ключей сортировки → ограниченная
+очередь страниц → дедупликация по целочисленному pageid (битовая карта) →
+инкрементальный счётчик букв. Счётчики доступны в любой момент, снимки
+CSV можно писать прямо во время обхода. Этим же конвейером считает
+`python -m task2.solution`.
+"""
+import argparse
+import asyncio
+import logging
+import os
+import time
+from collections import defaultdict
+from collections.abc import AsyncIterator, Iterable
+
+import aiohttp
+
+from .metrics import Metrics
+from .rate_limit import AdaptiveRateLimiter
+from .solution import (DEFAULT_CATEGORY, SortkeyRange, fetch_pages, first_letter, get_partitions,
+                       get_prefixes, write_to_csv)
+
+logger = logging.getLogger(__name__)
+
+_DONE = object()
+
+
+class PageIdSet:
+    """
+    Множество pageid в виде битовой карты: один бит на идентификатор.
+
+    Память зависит от максимального pageid (для ruwiki — единицы мегабайт),
+    а не от числа страниц в категории, и не содержит объектов на элемент.
+    """
+
+    def __init__(self):
+        self._bits = bytearray()
+        self._size = 0
+
+    def add(self, pageid: int) -> bool:
+        """Добавляет pageid; возвращает True, если его ещё не было."""
+        index, bit = divmod(pageid, 8)
+        if index >= len(self._bits):
+            self._bits.extend(bytes(max(index + 1 - len(self._bits), len(self._bits))))
+        mask = 1 << bit
+        if self._bits[index] & mask:
+            return False
+        self._bits[index] |= mask
+        self._size += 1
+        return True
+
+    def __contains__(self, pageid: int) -> bool:
+        index, bit = divmod(pageid, 8)
+        return index < len(self._bits) and bool(self._bits[index] & (1 << bit))
+
+    def __len__(self) -> int:
+        return self._size
+
+
+class LetterCounter:
+    """Инкрементальный счётчик первых букв с дедупликацией по pageid."""
+
+    def __init__(self):
+        self.counts: dict[str, int] = defaultdict(int)
+        self.seen = PageIdSet()
+        self.pages = 0
+        self.duplicates = 0
+
+    def add_page(self, members: Iterable[dict]) -> None:
+        self.pages += 1
+        for member in members:
+            pageid = member.get("pageid")
+            if pageid is not None and not self.seen.add(pageid):
+                self.duplicates += 1
+                continue
+            letter = first_letter(member["title"])
+            if letter is not None:
+                self.counts[letter] += 1
+
+    def snapshot(self) -> dict[str, int]:
+        return dict(self.counts)
+
+
+def write_snapshot(letter_counts: dict[str, int], filename: str) -> None:
+    """Атомарно записывает снимок счётчиков в CSV (читатель не увидит половину файла)."""
+    tmp_filename = f"{filename}.tmp"
+    write_to_csv(letter_counts, filename=tmp_filename)
+    os.replace(tmp_filename, filename)
+
+
+async def stream_pages(category: str, session: aiohttp.ClientSession,
+                       limiter: AdaptiveRateLimiter,
+                       partitions: list[SortkeyRange] | None = None,
+                       max_pages_in_flight: int = 8,
+                       metrics: Metrics | None = None) -> AsyncIterator[list[dict]]:
+    """
+    Сливает страницы всех диапазонов в один поток.
+
+    Очередь ограничена `max_pages_in_flight`: если потребитель не успевает,
+    загрузчики ждут, и в памяти одновременно находится ограниченное число страниц.
+    Ошибка в любом диапазоне пробрасывается потребителю (остальные загрузчики
+    отменяются), чтобы неполный подсчёт не выдавался за полный.
+    """
+    queue: asyncio.Queue = asyncio.Queue(maxsize=max_pages_in_flight)
+    tasks: set[asyncio.Task] = set()
+    active = 0
+
+    async def produce(part: SortkeyRange) -> None:
+        nonlocal active
+        try:
+            async for members in fetch_pages(part, category, session, limiter, spawn,
+                                             metrics=metrics):
+                await queue.put(members)
+        except Exception as e:
+            logger.error(f"Ошибка при обходе диапазона '{part.start}': {e}")
+            await queue.put(e)
+            return
+        active -= 1
+        if not active:
+            await queue.put(_DONE)
+
+    def spawn(part: SortkeyRange) -> None:
+        nonlocal active
+        active += 1
+        task = asyncio.create_task(produce(part))
+        tasks.add(task)
+        task.add_done_callback(tasks.discard)
+
+    for part in partitions or get_partitions(get_prefixes(length=1)):
+        spawn(part)
+    try:
+        while True:
+            members = await queue.get()
+            if members is _DONE:
+                return
+            if isinstance(members, Exception):
+                raise members
+            yield members
+    finally:
+        for task in list(tasks):
+            task.cancel()
+
+
+async def count_letters_streaming(category: str, session: aiohttp.ClientSession,
+                                  limiter: AdaptiveRateLimiter | None = None,
+                                  counter: LetterCounter | None = None,
+                                  snapshot_path: str | None = None,
+                                  snapshot_every: int = 20,
+                                  max_pages_in_flight: int = 8,
+                                  metrics: Metrics | None = None) -> dict[str, int]:
+    """Считает буквы по мере поступления страниц; каждые `snapshot_every` страниц пишет CSV."""
+    counter = counter or LetterCounter()
+    limiter = limiter or AdaptiveRateLimiter()
+    async for members in stream_pages(category, session, limiter,
+                                      max_pages_in_flight=max_pages_in_flight,
+                                      metrics=metrics):
+        counter.add_page(members)
+        if snapshot_path and counter.pages % snapshot_every == 0:
+            write_snapshot(counter.snapshot(), snapshot_path)
+    if snapshot_path:
+        write_snapshot(counter.snapshot(), snapshot_path)
+    logger.info(f"Обработано страниц: {counter.pages}, уникальных pageid: {len(counter.seen)}, "
+                f"повторов: {counter.duplicates}")
+    return counter.snapshot()
+
+
+def count_category_letters(category: str = DEFAULT_CATEGORY,
+                           limiter: AdaptiveRateLimiter | None = None,
+                           metrics: Metrics | None = None, **options) -> dict[str, int]:
+    """Синхронная обёртка над `count_letters_streaming` со своей сессией и замером времени."""
+    start_time = time.time()
+
+    async def run() -> dict[str, int]:
+        async with aiohttp.ClientSession() as session:
+            return await count_letters_streaming(category, session, limiter,
+                                                 metrics=metrics, **options)
+
+    letter_counts = asyncio.run(run())
+    logger.info(f"Подсчитано заголовков: {sum(letter_counts.values())}")
+    logger.info(f"Время выполнения: {time.time() - start_time:.2f} секунд")
+    return letter_counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Потоковый подсчёт животных по буквам")
+    parser.add_argument("--category", default=DEFAULT_CATEGORY)
+    parser.add_argument("--output", default="beasts.csv")
+    parser.add_argument("--snapshot-every", type=int, default=20,
+                        help="писать снимок CSV каждые N страниц")
+    parser.add_argument("--max-pages-in-flight", type=int, default=8)
+    args = parser.parse_args()
+
+    count_category_letters(args.category, snapshot_path=args.output,
+                           snapshot_every=args.snapshot_every,
+                           max_pages_in_flight=args.max_pages_in_flight)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""
+Общий адаптивный ограничитель запросов для асинхронного обхода API.
+
+Сочетает token bucket (темп запросов в секунду) и AIMD-управление числом
+одновременных запросов: каждый успешный ответ понемногу увеличивает темп
+и параллельность, а 429 / 503 / ошибка `maxlag` делит их на `backoff` и
+приостанавливает всех воркеров на `Retry-After` секунд.
+"""
+import asyncio
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class AdaptiveRateLimiter:
+    """Использование: `async with limiter: ...` вокруг каждого запроса."""
+
+    def __init__(self, rate: float = 10.0, burst: int = 10,
+                 min_rate: float = 0.5, max_rate: float = 100.0,
+                 concurrency: int = 8, min_concurrency: int = 1, max_concurrency: int = 64,
+                 rate_step: float = 1.0, backoff: float = 0.5,
+                 default_retry_after: float = 2.0, maxlag: int | None = 5):
+        """
+        :param rate: начальный темп, запросов в секунду
+        :param burst: ёмкость token bucket
+        :param rate_step: на сколько запросов в секунду растёт темп за «окно» из
+            `rate` успешных ответов (параллельность растёт на 1 за окно из `concurrency`)
+        :param backoff: множитель темпа и параллельности при троттлинге
+        :param default_retry_after: пауза, если сервер не прислал Retry-After
+        :param maxlag: значение параметра MediaWiki `maxlag` (None — не передавать)
+        """
+        self.rate = rate
+        self.burst = burst
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.concurrency = float(concurrency)
+        self.min_concurrency = min_concurrency
+        self.max_concurrency = max_concurrency
+        self.rate_step = rate_step
+        self.backoff = backoff
+        self.default_retry_after = default_retry_after
+        self.maxlag = maxlag
+
+        self.tokens = float(burst)
+        self.in_flight = 0
+        self.paused_until = 0.0
+        self.throttled = 0
+        self._updated_at = time.monotonic()
+        self._condition: asyncio.Condition | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    @property
+    def params(self) -> dict[str, int]:
+        """Дополнительные параметры запроса к API."""
+        return {} if self.maxlag is None else {"maxlag": self.maxlag}
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.burst, self.tokens + (now - self._updated_at) * self.rate)
+        self._updated_at = now
+
+    def _reserve(self) -> float:
+        """Резервирует токен; возвращает, сколько секунд ждать до его появления."""
+        now = time.monotonic()
+        self._refill(now)
+        self.tokens -= 1
+        token_wait = -self.tokens / self.rate if self.tokens < 0 else 0.0
+        return max(token_wait, self.paused_until - now)
+
+    def _get_condition(self) -> asyncio.Condition:
+        """
+        Условие ожидания слота для текущего цикла событий. `asyncio.Condition`
+        привязан к циклу, а ограничитель переживает `asyncio.run` (например, два
+        вызова `get_category_members_api` с одним ограничителем), поэтому в новом
+        цикле условие создаётся заново; запросы старого цикла к этому моменту завершены.
+        """
+        loop = asyncio.get_running_loop()
+        if self._condition is None or self._loop is not loop:
+            self._condition = asyncio.Condition()
+            self._loop = loop
+            self.in_flight = 0
+        return self._condition
+
+    async def acquire(self) -> None:
+        condition = self._get_condition()
+        async with condition:
+            await condition.wait_for(lambda: self.in_flight < int(self.concurrency))
+            self.in_flight += 1
+        wait = self._reserve()
+        if wait > 0:
+            try:
+                await asyncio.sleep(wait)
+            except BaseException:
+                # Отмена во время ожидания: __aexit__ не выполнится, слот освобождаем здесь
+                await self.release()
+                raise
+
+    async def release(self) -> None:
+        condition = self._get_condition()
+        async with condition:
+            self.in_flight -= 1
+            condition.notify()
+
+    async def __aenter__(self) -> "AdaptiveRateLimiter":
+        await self.acquire()
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.release()
+
+    def on_success(self) -> None:
+        """Аддитивное увеличение темпа и параллельности."""
+        self.rate = min(self.max_rate, self.rate + self.rate_step / self.rate)
+        self.concurrency = min(self.max_concurrency, self.concurrency + 1 / self.concurrency)
+
+    def on_throttle(self, retry_after: float | None = None) -> None:
+        """Мультипликативное снижение и общая пауза для всех воркеров."""
+        now = time.monotonic()
+        self.throttled += 1
+        if now < self.paused_until:
+            # Ответы на запросы, отправленные до паузы, повторно не снижают темп
+            return
+        retry_after = self.default_retry_after if retry_after is None else retry_after
+        self.paused_until = now + retry_after
+        self.rate = max(self.min_rate, self.rate * self.backoff)
+        self.concurrency = max(self.min_concurrency, self.concurrency * self.backoff)
+        self.tokens = min(self.tokens, 0.0)
+        logger.warning(f"Троттлинг: пауза {retry_after}s, темп {self.rate:.1f} запр/с, "
+                       f"параллельность {int(self.concurrency)}")
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    """Значение заголовка Retry-After в секундах (формат даты не поддерживается)."""
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
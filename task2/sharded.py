@@ -0,0 +1,235 @@
+"""
+Многопроцессный обход очень больших категорий.
+
+Один цикл событий упирается в процессор (декодирование JSON, обработка
+заголовков), когда параллельность запросов велика. Здесь однобуквенные
+диапазоны ключей сортировки (`get_prefixes`) делятся на шарды между
+процессами `ProcessPoolExecutor`; у каждого процесса свой цикл событий,
+своя сессия и свой `AdaptiveRateLimiter`. Все процессы дополнительно
+берут разрешение на запрос из общего бюджета (`SharedRequestBudget`), так
+что суммарный темп не превышает `max_rate`, а 429 в одном процессе
+приостанавливает все.
+
+Процесс возвращает компактный результат: счётчики по буквам (`array`),
+массив pageid и индексы букв для них; родитель суммирует счётчики и по
+pageid вычитает страницы, полученные несколькими шардами.
+
+    python -m task2.sharded --workers 8 --max-rate 50
+"""
+import argparse
+import asyncio
+import logging
+import multiprocessing
+import os
+import time
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from typing import NamedTuple
+
+import aiohttp
+
+from . import solution
+from .pipeline import PageIdSet
+from .rate_limit import AdaptiveRateLimiter
+from .solution import (DEFAULT_CATEGORY, ORDER_RUS_ALPHABET, RUS_ALPHABET, SortkeyRange,
+                       fetch_pages, first_letter, get_partitions, get_prefixes, write_to_csv)
+
+logger = logging.getLogger(__name__)
+
+NO_LETTER = 255  # индекс буквы для заголовков не из RUS_ALPHABET
+
+
+class SharedRequestBudget:
+    """
+    Общий для процессов темп запросов: не больше `rate` запросов в секунду.
+
+    Хранит в разделяемой памяти момент, с которого разрешён следующий запрос;
+    каждый запрос сдвигает его на 1 / rate. Передаётся в процессы при их
+    создании (через `initializer` пула), но не через аргументы задач.
+    """
+
+    def __init__(self, rate: float, context=multiprocessing):
+        self.rate = rate
+        self._next_slot = context.Value('d', 0.0)
+
+    def reserve(self) -> float:
+        """Занимает место в очереди; возвращает, сколько секунд ждать до запроса."""
+        with self._next_slot.get_lock():
+            now = time.monotonic()
+            slot = max(now, self._next_slot.value)
+            self._next_slot.value = slot + 1 / self.rate
+        return slot - now
+
+    def pause(self, seconds: float) -> None:
+        """Откладывает все следующие запросы всех процессов на `seconds`."""
+        with self._next_slot.get_lock():
+            self._next_slot.value = max(self._next_slot.value, time.monotonic() + seconds)
+
+
+class BudgetedRateLimiter(AdaptiveRateLimiter):
+    """Ограничитель процесса, который дополнительно ждёт общего бюджета."""
+
+    def __init__(self, budget: SharedRequestBudget | None, **kwargs):
+        super().__init__(**kwargs)
+        self.budget = budget
+
+    async def acquire(self) -> None:
+        await super().acquire()
+        if self.budget is not None:
+            wait = self.budget.reserve()
+            if wait > 0:
+                try:
+                    await asyncio.sleep(wait)
+                except BaseException:
+                    await self.release()
+                    raise
+
+    def on_throttle(self, retry_after: float | None = None) -> None:
+        super().on_throttle(retry_after)
+        if self.budget is not None:
+            self.budget.pause(max(self.paused_until - time.monotonic(), 0.0))
+
+
+class ShardResult(NamedTuple):
+    counts: array          # array('q') длины len(RUS_ALPHABET)
+    pageids: array         # array('q') уникальных pageid шарда
+    letters: bytes         # индекс буквы для каждого pageid (NO_LETTER — не русская)
+    pages: int             # полученных страниц API
+
+
+_budget: SharedRequestBudget | None = None
+
+
+def _init_worker(budget: SharedRequestBudget | None, api_url: str) -> None:
+    global _budget
+    _budget = budget
+    # Процессы запускаются через spawn и не видят изменений модуля в родителе
+    solution.API_URL = api_url
+
+
+async def crawl_shard(parts: list[SortkeyRange], category: str, session: aiohttp.ClientSession,
+                      limiter: AdaptiveRateLimiter) -> ShardResult:
+    """Обходит диапазоны шарда (плотные делятся на ходу) и сворачивает результат в массивы."""
+    counts = array('q', bytes(8 * len(RUS_ALPHABET)))
+    pageids = array('q')
+    letters = bytearray()
+    seen = PageIdSet()
+    pages = 0
+    pending: set[asyncio.Task] = set()
+
+    async def crawl(part: SortkeyRange) -> None:
+        nonlocal pages
+        async for members in fetch_pages(part, category, session, limiter, spawn):
+            pages += 1
+            for member in members:
+                if not seen.add(member["pageid"]):
+                    continue
+                letter = first_letter(member["title"])
+                index = NO_LETTER if letter is None else ORDER_RUS_ALPHABET[letter]
+                if letter is not None:
+                    counts[index] += 1
+                pageids.append(member["pageid"])
+                letters.append(index)
+
+    def spawn(part: SortkeyRange) -> None:
+        pending.add(asyncio.create_task(crawl(part)))
+
+    for part in parts:
+        spawn(part)
+    while pending:
+        done, _ = await asyncio.wait(pending)
+        pending.difference_update(done)
+        for task in done:
+            if task.exception() is not None:
+                logger.error(f"Ошибка при обходе диапазона: {task.exception()}")
+    return ShardResult(counts, pageids, bytes(letters), pages)
+
+
+def run_shard(parts: list[SortkeyRange], category: str, concurrency: int = 8) -> ShardResult:
+    """Точка входа процесса: свой цикл событий, сессия и ограничитель."""
+    # Общий предел задаёт бюджет; ограничитель процесса отвечает за параллельность и 429
+    rate = _budget.rate if _budget is not None else 10.0
+    limiter = BudgetedRateLimiter(_budget, rate=rate, burst=concurrency,
+                                  max_rate=max(rate, 100.0), concurrency=concurrency)
+
+    async def run() -> ShardResult:
+        async with aiohttp.ClientSession() as session:
+            return await crawl_shard(parts, category, session, limiter)
+
+    started = time.perf_counter()
+    result = asyncio.run(run())
+    logger.info(f"Процесс {os.getpid()}: {len(result.pageids)} заголовков, "
+                f"{result.pages} страниц API за {time.perf_counter() - started:.2f} секунд")
+    return result
+
+
+def make_shards(partitions: list[SortkeyRange], shards: int) -> list[list[SortkeyRange]]:
+    """Чередует диапазоны по шардам, чтобы плотные буквы не попадали в один шард подряд."""
+    return [part for part in (partitions[index::shards] for index in range(shards)) if part]
+
+
+def merge_shards(results: list[ShardResult]) -> dict[str, int]:
+    """Суммирует счётчики шардов, вычитая страницы, уже учтённые другим шардом."""
+    counts = [0] * len(RUS_ALPHABET)
+    seen = PageIdSet()
+    duplicates = 0
+    for result in results:
+        for index, count in enumerate(result.counts):
+            counts[index] += count
+        for pageid, index in zip(result.pageids, result.letters):
+            if not seen.add(pageid):
+                duplicates += 1
+                if index != NO_LETTER:
+                    counts[index] -= 1
+    if duplicates:
+        logger.info(f"Страниц, полученных несколькими шардами: {duplicates}")
+    return {letter: count for letter, count in zip(RUS_ALPHABET, counts) if count}
+
+
+def count_sharded(category: str = DEFAULT_CATEGORY, workers: int | None = None,
+                  max_rate: float = 50.0, concurrency: int = 8,
+                  shards: int | None = None) -> dict[str, int]:
+    """
+    Счётчики букв категории, собранные `workers` процессами.
+
+    :param max_rate: общий для всех процессов предел запросов в секунду
+    :param concurrency: начальная параллельность запросов в каждом процессе
+    :param shards: число шардов (по умолчанию — по одному на процесс)
+    """
+    workers = workers or os.cpu_count() or 1
+    context = multiprocessing.get_context("spawn")
+    budget = SharedRequestBudget(max_rate, context)
+    shard_parts = make_shards(get_partitions(get_prefixes(length=1)), shards or workers)
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context,
+                             initializer=_init_worker,
+                             initargs=(budget, solution.API_URL)) as executor:
+        results = list(executor.map(run_shard, shard_parts,
+                                    [category] * len(shard_parts),
+                                    [concurrency] * len(shard_parts)))
+    logger.info(f"Шардов: {len(results)}, "
+                f"страниц API: {sum(result.pages for result in results)}")
+    return merge_shards(results)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Многопроцессный подсчёт по буквам через API")
+    parser.add_argument("--category", default=DEFAULT_CATEGORY)
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="процессов")
+    parser.add_argument("--shards", type=int, help="шардов (по умолчанию — по числу процессов)")
+    parser.add_argument("--max-rate", type=float, default=50.0,
+                        help="общий предел запросов в секунду для всех процессов")
+    parser.add_argument("--concurrency", type=int, default=8,
+                        help="параллельных запросов в каждом процессе")
+    parser.add_argument("--output", default="beasts.csv")
+    args = parser.parse_args()
+
+    start_time = time.time()
+    letter_counts = count_sharded(args.category, args.workers, args.max_rate,
+                                  args.concurrency, args.shards)
+    write_to_csv(letter_counts, filename=args.output)
+    logger.info(f"Подсчитано заголовков: {sum(letter_counts.values())}")
+    logger.info(f"Время выполнения: {time.time() - start_time:.2f} секунд")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,106 +1,322 @@
+import argparse
 import asyncio
 import csv
 import logging
 import itertools
 import time
 from collections import defaultdict
+from typing import AsyncIterator, Callable, Iterable, NamedTuple
 from urllib.parse import urlencode
 
 import aiohttp
 
+from .metrics import Metrics
+from .rate_limit import AdaptiveRateLimiter, parse_retry_after
+
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
 RUS_ALPHABET = 'АБВГДЕЁЖЗИЙКЛМНОПРСТУФХЦЧШЩЪЫЬЭЮЯ'
 ORDER_RUS_ALPHABET = {letter: index for index, letter in enumerate(RUS_ALPHABET)}
+THROTTLE_STATUSES = (429, 503)
+SERVER_ERROR_STATUSES = (500, 502, 504)
+SERVER_ERROR_RETRIES = 5
+SERVER_ERROR_BACKOFF = 0.5  # база экспоненциальной паузы, с (как у HttpClient)
+DEFAULT_CATEGORY = "Животные по алфавиту"
+API_URL = "https://ru.wikipedia.org/w/api.php"
+
+
+def first_letter(title: str) -> str | None:
+    """Первая буква заголовка, если она из русского алфавита."""
+    letter = title[:1].upper()
+    return letter if letter and letter in RUS_ALPHABET else None
+
+
+def count_letters(titles: Iterable[str]) -> dict[str, int]:
+    """Число заголовков на каждую букву русского алфавита (остальные пропускаются)."""
+    letter_counts: dict[str, int] = defaultdict(int)
+    for title in titles:
+        letter = first_letter(title)
+        if letter is not None:
+            letter_counts[letter] += 1
+    return dict(letter_counts)
 
 
 def get_prefixes(prefix_alphabet: str = RUS_ALPHABET, length: int = 1) -> list[str]:
     return [''.join(letters) for letters in itertools.product(prefix_alphabet, repeat=length)]
 
 
-async def fetch_titles(prefix: str, category: str, session: aiohttp.ClientSession,
-                       semaphore: asyncio.Semaphore, titles: dict[str, int]) -> None:
-    """Собирает заголовки для префикса, добавляя в общий словарь."""
-    url = "https://ru.wikipedia.org/w/api.php"
+class SortkeyRange(NamedTuple):
+    """Полуинтервал [start, end) ключей сортировки категории; end=None — до конца."""
+    start: str
+    end: str | None = None
+
+
+def sortkey_position(key: str) -> tuple[int, ...]:
+    """Позиция ключа в порядке RUS_ALPHABET (остальные символы идут раньше букв)."""
+    return tuple(ORDER_RUS_ALPHABET.get(char, -1) for char in key.upper())
+
+
+def is_before(key: str, end: str | None) -> bool:
+    """Лежит ли ключ левее правой границы диапазона."""
+    return end is None or sortkey_position(key[:len(end)]) < sortkey_position(end)
+
+
+def member_sortkey(member: dict) -> str:
+    # Без явного ключа сортировки страница сортируется по заголовку
+    return member.get("sortkeyprefix") or member["title"]
+
+
+def get_partitions(prefixes: list[str]) -> list[SortkeyRange]:
+    """Непересекающиеся диапазоны, покрывающие категорию начиная с первого префикса."""
+    return [SortkeyRange(start, end) for start, end in zip(prefixes, [*prefixes[1:], None])]
+
+
+def split_range(part: SortkeyRange, reached_key: str) -> tuple[SortkeyRange, list[SortkeyRange]]:
+    """
+    Делит плотный однобуквенный диапазон по двухбуквенным префиксам (`get_prefixes(length=2)`).
+
+    Первая страница покрыла подпрефиксы до `reached_key`; остаток режется на куски
+    примерно той же ширины. Возвращает (суженный текущий диапазон, новые диапазоны).
+    """
+    if len(part.start) != 1:
+        return part, []
+    sub_prefixes = [prefix for prefix in get_prefixes(length=2) if prefix[0] == part.start]
+    reached = sortkey_position(reached_key[:2])
+    remaining = [prefix for prefix in sub_prefixes if sortkey_position(prefix) > reached]
+    if not remaining:
+        return part, []
+    covered = max(len(sub_prefixes) - len(remaining), 1)
+    bounds = remaining[::covered]
+    parts = get_partitions(bounds)
+    parts[-1] = SortkeyRange(parts[-1].start, part.end)
+    return SortkeyRange(part.start, bounds[0]), parts
+
+
+async def request_json(session: aiohttp.ClientSession, limiter: AdaptiveRateLimiter,
+                       params: dict[str, str | int], label: str,
+                       metrics: Metrics | None = None) -> dict:
+    """
+    GET-запрос к API через общий ограничитель.
+
+    После 429 / 503 и ошибки `maxlag` сообщает ограничителю о троттлинге
+    и повторяет запрос. Временные ошибки сервера (500 / 502 / 504) повторяются
+    до `SERVER_ERROR_RETRIES` раз с экспоненциальной паузой через тот же
+    ограничитель; после этого, как и ошибки соединения, пробрасываются вызывающему.
+    Если передан `metrics`, учитывает длительность, размер и статус ответа,
+    время декодирования JSON и паузы перед повторами.
+    """
+    def throttle(retry_after: float | None) -> None:
+        limiter.on_throttle(retry_after)
+        if metrics is not None:
+            metrics.retry_wait(max(limiter.paused_until - time.monotonic(), 0.0))
+
+    params = {**params, **limiter.params}
+    server_errors = 0
+    while True:
+        async with limiter:
+            started = metrics.request_started() if metrics is not None else 0.0
+            status: int | str = "error"
+            size = None
+            try:
+                async with session.get(API_URL, params=params) as response:
+                    status = response.status
+                    if response.status in THROTTLE_STATUSES:
+                        retry_after = parse_retry_after(response.headers.get("Retry-After"))
+                        logger.warning(f"{response.status} для '{label}', ждём {retry_after}s")
+                        throttle(retry_after)
+                        continue
+                    if (response.status in SERVER_ERROR_STATUSES
+                            and server_errors < SERVER_ERROR_RETRIES):
+                        delay = SERVER_ERROR_BACKOFF * 2 ** server_errors
+                        server_errors += 1
+                        logger.warning(f"{response.status} для '{label}', "
+                                       f"повтор {server_errors} через {delay}s")
+                        throttle(delay)
+                        continue
+                    response.raise_for_status()
+                    if metrics is not None:
+                        size = len(await response.read())
+                        decode_started = time.perf_counter()
+                    data = await response.json()
+                    if metrics is not None:
+                        metrics.observe("json_decode_seconds",
+                                        time.perf_counter() - decode_started)
+                    if data.get("error", {}).get("code") == "maxlag":
+                        retry_after = parse_retry_after(response.headers.get("Retry-After"))
+                        logger.warning(f"maxlag для '{label}': {data['error'].get('lag')}s")
+                        throttle(retry_after)
+                        continue
+            finally:
+                if metrics is not None:
+                    metrics.request_finished(started, status, size)
+        limiter.on_success()
+        return data
+
+
+async def fetch_pages(part: SortkeyRange | str, category: str, session: aiohttp.ClientSession,
+                      limiter: AdaptiveRateLimiter,
+                      spawn: Callable[[SortkeyRange], None] | None = None,
+                      cmcontinue: str | None = None,
+                      on_progress: Callable[[str | None], None] | None = None,
+                      metrics: Metrics | None = None,
+                      ) -> AsyncIterator[list[dict]]:
+    """
+    Постранично отдаёт участников (pageid, title, sortkeyprefix) диапазона ключей сортировки.
+
+    Диапазон начинается с `cmstartsortkeyprefix=start`; страницы листаются, пока
+    ключ сортировки участников меньше `end`. Если передан `spawn` и однобуквенный
+    диапазон не уместился в одну страницу, его остаток делится на поддиапазоны,
+    которые передаются в `spawn` для параллельного обхода.
+
+    Темп и параллельность запросов задаёт общий `limiter`: 429/503 и ошибка
+    `maxlag` приостанавливают всех воркеров, успешные ответы постепенно ускоряют обход.
+
+    `cmcontinue` продолжает ранее прерванный обход диапазона (диапазон тогда уже
+    не делится). `on_progress` вызывается после того, как потребитель обработал
+    страницу, с токеном следующей страницы или None, когда диапазон пройден
+    целиком; при ошибке он не вызывается.
+    """
+    if isinstance(part, str):
+        part = SortkeyRange(part, get_next_prefix(part))
     params: dict[str, str | int] = {
         "action": "query",
         "list": "categorymembers",
         "cmtitle": f"Категория:{category}",
         "cmtype": "page",
+        "cmprop": "ids|title|sortkeyprefix",
         "cmlimit": 500,
         "format": "json",
-        "cmstartsortkeyprefix": prefix,
+        "cmstartsortkeyprefix": part.start,
     }
-    async with semaphore:
-        full_url = f"{url}?{urlencode(params)}"
-        logger.info(f"Запрос к API для префикса '{prefix}'")
-        logger.debug(f"Полный URL: {full_url}")
-        while True:
-            try:
-                async with session.get(url, params=params) as response:
-                    if response.status == 429:
-                        retry_after = float(response.headers.get("Retry-After", 2))
-                        logger.warning(f"429 для '{prefix}', ждём {retry_after}s")
-                        await asyncio.sleep(retry_after)
-                        continue
-                    response.raise_for_status()
-                    data = await response.json()
-                    logger.debug(f"Ответ API для '{prefix}': {str(data)[:300]}...")
-                    if "error" in data:
-                        logger.error(f"API ошибка для '{prefix}': {data['error']}")
-                        return
-                    if "query" not in data or "categorymembers" not in data["query"]:
-                        logger.error(f"Некорректный ответ для '{prefix}'")
-                        return
-                    new_titles = [page["title"] for page in data["query"]["categorymembers"]]
-                    if not new_titles:
-                        logger.debug(f"Нет заголовков для '{prefix}'")
-                        return
-                    logger.debug(f"Добавление {len(new_titles)} "
-                                 f"заголовков для '{prefix}': {new_titles[:5]}...")
-                    for title in new_titles:
-                        titles[title] = titles.get(title, 0) + 1
-                    await asyncio.sleep(0.5)  # Задержка между запросами
-                    if 'continue' in data and new_titles[-1][:len(prefix)].upper() == prefix:
-                        params['cmcontinue'] = data['continue']['cmcontinue']
-                        logger.info(f"Снова запрос для префикса '{prefix}', "
-                                    f"(след. страница т.к. ещё есть заголовки на {prefix}...)")
-                    else:
-                        return
-            except aiohttp.ClientError as e:
-                logger.error(f"Ошибка для '{prefix}': {e}")
+    label = f"{part.start}..{part.end or ''}"
+    first_page = cmcontinue is None
+    if cmcontinue is not None:
+        params["cmcontinue"] = cmcontinue
+    full_url = f"{API_URL}?{urlencode({**params, **limiter.params})}"
+    logger.info(f"Запрос к API для диапазона '{label}'")
+    logger.debug(f"Полный URL: {full_url}")
+    while True:
+        try:
+            data = await request_json(session, limiter, params, label, metrics)
+            logger.debug(f"Ответ API для '{label}': {str(data)[:300]}...")
+            if "error" in data:
+                logger.error(f"API ошибка для '{label}': {data['error']}")
+                return
+            if "query" not in data or "categorymembers" not in data["query"]:
+                logger.error(f"Некорректный ответ для '{label}'")
+                return
+            members = data["query"]["categorymembers"]
+            if not members:
+                logger.debug(f"Нет заголовков для '{label}'")
+                if on_progress is not None:
+                    on_progress(None)
+                return
+            if first_page and spawn is not None and 'continue' in data:
+                part, extra_parts = split_range(part, member_sortkey(members[-1]))
+                for extra_part in extra_parts:
+                    spawn(extra_part)
+                if extra_parts:
+                    logger.info(f"Диапазон '{label}' разделён на "
+                                f"{len(extra_parts) + 1} частей")
+                    label = f"{part.start}..{part.end or ''}"
+            first_page = False
+            in_range = [member for member in members
+                        if is_before(member_sortkey(member), part.end)]
+            logger.debug(f"Получено {len(in_range)} заголовков для '{label}'")
+            yield in_range
+            if 'continue' in data and len(in_range) == len(members):
+                params['cmcontinue'] = data['continue']['cmcontinue']
+                if on_progress is not None:
+                    on_progress(data['continue']['cmcontinue'])
+                logger.info(f"Снова запрос для диапазона '{label}' (след. страница)")
+            else:
+                if on_progress is not None:
+                    on_progress(None)
                 return
+        except aiohttp.ClientError as e:
+            logger.error(f"Ошибка для '{label}': {e}")
+            return
 
 
-def get_category_members_api(category: str) -> dict[str, int]:
-    """Собирает заголовки асинхронно."""
-    titles: dict[str, int] = {}
-    # Устанавлием ограничение для баланса между скоростью и нагрузкой на сервер wikipedia
-    semaphore = asyncio.Semaphore(33 * 3)  # при value более 500 - ошибка 429
-    # Если появляется WARNING - 429, то либо уменьшить значение семафора,
-    # либо увеличить время задержки между запросами - await asyncio.sleep в fetch_titles
+async def fetch_titles(part: SortkeyRange | str, category: str, session: aiohttp.ClientSession,
+                       limiter: AdaptiveRateLimiter, titles: dict[str, int],
+                       spawn: Callable[[SortkeyRange], None] | None = None,
+                       metrics: Metrics | None = None) -> None:
+    """Собирает заголовки диапазона ключей сортировки, добавляя в общий словарь."""
+    async for members in fetch_pages(part, category, session, limiter, spawn,
+                                     metrics=metrics):
+        for member in members:
+            titles[member["title"]] = titles.get(member["title"], 0) + 1
 
-    async def gather_titles():
-        async with aiohttp.ClientSession() as session:
-            prefixes = get_prefixes(length=1)
-            tasks = [
-                fetch_titles(prefix, category, session, semaphore, titles)
-                for prefix in prefixes
-            ]
-            await asyncio.gather(*tasks, return_exceptions=True)
 
-    asyncio.run(gather_titles())
+def get_next_prefix(prefix: str) -> str | None:
+    """Следующая буква алфавита после первой буквы префикса (None для последней)."""
+    index = ORDER_RUS_ALPHABET.get(prefix[:1].upper())
+    if index is None or index + 1 >= len(RUS_ALPHABET):
+        return None
+    return RUS_ALPHABET[index + 1]
+
 
+async def collect_category_titles(category: str, session: aiohttp.ClientSession,
+                                  limiter: AdaptiveRateLimiter,
+                                  metrics: Metrics | None = None) -> dict[str, int]:
+    """
+    Обходит категорию по однобуквенным диапазонам ключей сортировки (плотные
+    диапазоны делятся на ходу) в уже открытой сессии. Возвращает заголовки с
+    числом их получений (больше 1 — пересечение диапазонов).
+
+    Ошибка в любом диапазоне отменяет остальные и пробрасывается: неполный
+    результат не выдаётся за полный.
+    """
+    titles: dict[str, int] = {}
+    pending: set[asyncio.Task] = set()
+
+    def spawn(part: SortkeyRange) -> None:
+        pending.add(asyncio.create_task(
+            fetch_titles(part, category, session, limiter, titles, spawn, metrics)
+        ))
+
+    for part in get_partitions(get_prefixes(length=1)):
+        spawn(part)
+    try:
+        while pending:
+            done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_EXCEPTION)
+            pending.difference_update(done)
+            for task in done:
+                if task.exception() is not None:
+                    logger.error(f"Ошибка при обходе диапазона: {task.exception()}")
+                    raise task.exception()
+    finally:
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
     return titles
 
 
-def count_animals_by_letter() -> dict[str, int]:
+def get_category_members_api(category: str,
+                             limiter: AdaptiveRateLimiter | None = None,
+                             metrics: Metrics | None = None) -> dict[str, int]:
+    """
+    Собирает заголовки асинхронно, каждый диапазон ключей сортировки — один раз.
+    Темп запросов подбирает `limiter` (по умолчанию — AdaptiveRateLimiter с настройками
+    по умолчанию; для тонкой настройки передайте свой экземпляр). Метрики запросов
+    собираются в `metrics`, если он передан.
+    """
+    limiter = limiter or AdaptiveRateLimiter()
+
+    async def gather_titles() -> dict[str, int]:
+        async with aiohttp.ClientSession() as session:
+            return await collect_category_titles(category, session, limiter, metrics)
+
+    return asyncio.run(gather_titles())
+
+
+def count_animals_by_letter(metrics: Metrics | None = None) -> dict[str, int]:
     logger.info("Начало обработки категорий через API асинхронно")
     start_time = time.time()
-    letter_counts: dict[str, int] = defaultdict(int)
 
-    titles = get_category_members_api("Животные по алфавиту")
+    titles = get_category_members_api(DEFAULT_CATEGORY, metrics=metrics)
 
     if titles:
         overlap_ratio = sum(titles.values()) / len(titles)
@@ -109,9 +325,7 @@ def count_animals_by_letter() -> dict[str, int]:
     else:
         logger.warning("Заголовки не собраны")
 
-    for title in titles:
-        if title and title[0].upper() in RUS_ALPHABET:
-            letter_counts[title[0].upper()] += 1
+    letter_counts = count_letters(titles)
     logger.info(f"Подсчитано заголовков: {sum(letter_counts.values())}")
     logger.info(f"Время выполнения: {time.time() - start_time:.2f} секунд")
     return letter_counts
@@ -129,8 +343,21 @@ def write_to_csv(letter_counts: dict[str, int], filename: str = "beasts.csv") ->
 
 
 def main():
-    letter_counts = count_animals_by_letter()
+    parser = argparse.ArgumentParser(description="Подсчёт животных по буквам через API")
+    parser.add_argument("--metrics-json", help="записать метрики запросов в JSON")
+    parser.add_argument("--metrics-prom", help="записать метрики в формате Prometheus")
+    args = parser.parse_args()
+
+    # Потоковый подсчёт: память не растёт с размером категории. pipeline сам
+    # импортирует solution, поэтому импорт здесь, а не в начале модуля
+    from .pipeline import count_category_letters
+
+    metrics = Metrics() if args.metrics_json or args.metrics_prom else None
+    logger.info("Начало обработки категорий через API асинхронно")
+    letter_counts = count_category_letters(DEFAULT_CATEGORY, metrics=metrics)
     write_to_csv(letter_counts, filename="beasts.csv")
+    if metrics is not None:
+        metrics.dump(args.metrics_json, args.metrics_prom)
 
 
 if __name__ == "__main__":
@@ -1,21 +1,30 @@
-import csv
+import argparse
 import logging
 import requests
 import time
-from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from html.parser import HTMLParser
+from typing import Callable, Iterator, TypeVar
+from urllib.parse import quote
 
 from bs4 import BeautifulSoup, PageElement, Tag
 
+from .http_client import HttpClient, get_default_client
+from .metrics import Metrics
+from .solution import (DEFAULT_CATEGORY, RUS_ALPHABET, SortkeyRange, count_letters, get_partitions,
+                       is_before, write_to_csv)
+
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-RUS_ALPHABET = 'АБВГДЕЁЖЗИЙКЛМНОПРСТУФХЦЧШЩЪЫЬЭЮЯ'
-ORDER_RUS_ALPHABET = {letter: index for index, letter in enumerate(RUS_ALPHABET)}
+BASE_URL = "https://ru.wikipedia.org"
+
+T = TypeVar('T')
 
 
-def get_wikipedia_page(url: str) -> str | None:
+def get_wikipedia_page(url: str, client: HttpClient | None = None) -> str | None:
     try:
-        response = requests.get(url, timeout=10)
+        response = (client or get_default_client()).get(url)
         response.raise_for_status()
         return response.text
     except requests.RequestException as e:
@@ -23,7 +32,119 @@ def get_wikipedia_page(url: str) -> str | None:
         return None
 
 
+NAVIGATION_LINKS = ('Следующая страница', 'Предыдущая страница')
+NEXT_PAGE_TEXT = NAVIGATION_LINKS[0]
+_PAGES_MARKER = 'id="mw-pages"'
+
+
+class _StopParsing(Exception):
+    pass
+
+
+class CategoryPageParser(HTMLParser):
+    """
+    Потоковый разбор страницы категории за один проход.
+
+    Обрабатывает только содержимое `<div id="mw-pages">`: собирает атрибуты
+    title ссылок и href ссылки «Следующая страница», а на закрывающем теге
+    контейнера прекращает разбор. Навигационные ссылки в заголовки не попадают.
+    Для каждой ссылки запоминается заголовок раздела `<h3>` — первая буква
+    ключа сортировки страницы.
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.titles: list[str] = []
+        self.sections: list[str | None] = []
+        self.next_page_url: str | None = None
+        self.found = False
+        self._depth = 0
+        self._section: str | None = None
+        self._link: dict[str, str | None] | None = None
+        self._heading: list[str] | None = None
+        self._link_text: list[str] = []
+
+    def parse(self, html: str) -> tuple[list[str], str | None]:
+        # Разметка до контейнера не нужна: пропускаем её поиском подстроки
+        marker = html.find(_PAGES_MARKER)
+        try:
+            self.feed(html[max(html.rfind('<', 0, marker), 0):] if marker != -1 else html)
+            self.close()
+        except _StopParsing:
+            pass
+        return self.titles, self.next_page_url
+
+    def handle_starttag(self, tag: str, attrs: list[tuple[str, str | None]]) -> None:
+        if not self._depth:
+            if tag == 'div' and ('id', 'mw-pages') in attrs:
+                self.found = True
+                self._depth = 1
+            return
+        if tag == 'div':
+            self._depth += 1
+        elif tag == 'a':
+            self._link = dict(attrs)
+            self._link_text = []
+        elif tag == 'h3':
+            self._heading = []
+
+    def handle_endtag(self, tag: str) -> None:
+        if not self._depth:
+            return
+        if tag == 'div':
+            self._depth -= 1
+            if not self._depth:
+                raise _StopParsing
+        elif tag == 'a' and self._link is not None:
+            self._finish_link(self._link, ''.join(self._link_text).strip())
+            self._link = None
+        elif tag == 'h3' and self._heading is not None:
+            self._section = ''.join(self._heading).strip() or None
+            self._heading = None
+
+    def handle_data(self, data: str) -> None:
+        if self._link is not None:
+            self._link_text.append(data)
+        elif self._heading is not None:
+            self._heading.append(data)
+
+    def _finish_link(self, attrs: dict[str, str | None], text: str) -> None:
+        if text in NAVIGATION_LINKS:
+            if text == NEXT_PAGE_TEXT and self.next_page_url is None:
+                self.next_page_url = attrs.get('href')
+            return
+        title = attrs.get('title')
+        if title is not None:
+            self.titles.append(title)
+            self.sections.append(self._section)
+
+
 def parse_category_page(html: str) -> tuple[list[str], str | None]:
+    """Заголовки и ссылка на следующую страницу; если контейнер не найден — через BeautifulSoup."""
+    parser = CategoryPageParser()
+    titles, next_page_url = parser.parse(html)
+    if not parser.found:
+        logger.debug("Потоковый разбор не нашёл контейнер, используется BeautifulSoup")
+        return parse_category_page_soup(html)
+    logger.debug(f"Найдено {len(titles)} заголовков на странице")
+    return titles, next_page_url
+
+
+def parse_category_page_sections(html: str) -> tuple[list[tuple[str, str]], str | None]:
+    """
+    Как `parse_category_page`, но к каждому заголовку добавляет букву раздела,
+    в котором он выведен (без разделов — первую букву заголовка).
+    """
+    parser = CategoryPageParser()
+    titles, next_page_url = parser.parse(html)
+    if not parser.found:
+        titles, next_page_url = parse_category_page_soup(html)
+        return [(title, title[:1].upper()) for title in titles], next_page_url
+    return [(title, section or title[:1].upper())
+            for title, section in zip(titles, parser.sections)], next_page_url
+
+
+def parse_category_page_soup(html: str) -> tuple[list[str], str | None]:
     soup = BeautifulSoup(html, 'html.parser')
     titles: list[str] = []
     next_page_url: str | None = None
@@ -37,6 +158,8 @@ def parse_category_page(html: str) -> tuple[list[str], str | None]:
         if not isinstance(link, Tag):
             logger.debug("Пропущен элемент, не являющийся тегом")
             continue
+        if link.get_text(strip=True) in NAVIGATION_LINKS:
+            continue
         title = link.get('title')
         if isinstance(title, str):
             titles.append(title)
@@ -45,7 +168,7 @@ def parse_category_page(html: str) -> tuple[list[str], str | None]:
             logger.debug(f"Пропущен заголовок, так как title не строка: {title}")
 
     logger.debug(f"Найдено {len(titles)} заголовков на странице")
-    next_page_link: PageElement | None = soup.find('a', string='Следующая страница')
+    next_page_link: PageElement | None = soup.find('a', string=NEXT_PAGE_TEXT)
     if isinstance(next_page_link, Tag) and 'href' in next_page_link.attrs:
         href = next_page_link['href']
         if isinstance(href, str):
@@ -56,55 +179,133 @@ def parse_category_page(html: str) -> tuple[list[str], str | None]:
     return titles, next_page_url
 
 
-def get_category_members_html() -> list[str]:
-    base_url = "https://ru.wikipedia.org"
-    current_url: str | None = f"{base_url}/wiki/Категория:Животные_по_алфавиту"
+def category_url(pagefrom: str = '', category: str = DEFAULT_CATEGORY) -> str:
+    url = f"{BASE_URL}/wiki/{quote('Категория:' + category.replace(' ', '_'))}"
+    return f"{url}?pagefrom={quote(pagefrom)}" if pagefrom else url
+
+
+def timed_parse(parse: Callable[[str], T], html: str, client: HttpClient | None) -> T:
+    """Разбирает страницу, записывая время разбора в метрики клиента (если они есть)."""
+    metrics = client.metrics if client is not None else None
+    if metrics is None:
+        return parse(html)
+    started = time.perf_counter()
+    result = parse(html)
+    metrics.observe("html_parse_seconds", time.perf_counter() - started)
+    return result
+
+
+def get_category_members_html(client: HttpClient | None = None,
+                              category: str = DEFAULT_CATEGORY) -> list[str]:
+    current_url: str | None = category_url(category=category)
     all_titles: list[str] = []
 
     while current_url:
         logger.debug(f"Обработка страницы: {current_url}")
-        html = get_wikipedia_page(current_url)
+        html = get_wikipedia_page(current_url, client)
         if not html:
             break
-        titles, next_page_url = parse_category_page(html)
+        titles, next_page_url = timed_parse(parse_category_page, html, client)
         all_titles.extend(titles)
-        current_url = f"{base_url}{next_page_url}" if next_page_url else None
+        current_url = f"{BASE_URL}{next_page_url}" if next_page_url else None
         time.sleep(0.5)
 
     logger.info(f"Всего получено {len(all_titles)} заголовков через HTML")
     return all_titles
 
 
-def count_animals_by_letter() -> dict[str, int]:
+def iter_chain_pages(part: SortkeyRange, client: HttpClient | None = None,
+                     delay: float = 0.5, start_url: str | None = None,
+                     category: str = DEFAULT_CATEGORY
+                     ) -> Iterator[tuple[list[str], str | None]]:
+    """
+    Цепочка страниц от `?pagefrom=<part.start>` (или от `start_url` при продолжении)
+    по ссылкам «Следующая страница».
+
+    Отдаёт пары (заголовки страницы из диапазона, URL следующей страницы или None,
+    если цепочка пройдена). Останавливается на первой ссылке из раздела, который
+    уже относится к диапазону следующей цепочки; такие ссылки не включаются.
+    При ошибке загрузки цепочка обрывается без завершающего None.
+    """
+    current_url = start_url or category_url(part.start, category)
+    while True:
+        logger.debug(f"Обработка страницы: {current_url}")
+        html = get_wikipedia_page(current_url, client)
+        if not html:
+            return
+        members, next_page_url = timed_parse(parse_category_page_sections, html, client)
+        in_range = [title for title, section in members if is_before(section, part.end)]
+        if len(in_range) < len(members) or not next_page_url:
+            yield in_range, None
+            return
+        current_url = f"{BASE_URL}{next_page_url}"
+        yield in_range, current_url
+        time.sleep(delay)
+
+
+def crawl_chain(part: SortkeyRange, client: HttpClient | None = None,
+                delay: float = 0.5, category: str = DEFAULT_CATEGORY) -> list[str]:
+    """Все заголовки цепочки страниц диапазона `part` (см. `iter_chain_pages`)."""
+    titles = [title for page, _ in iter_chain_pages(part, client, delay, category=category)
+              for title in page]
+    logger.debug(f"Цепочка '{part.start}..{part.end or ''}': {len(titles)} заголовков")
+    return titles
+
+
+def get_category_members_html_parallel(workers: int = 8, delay: float = 0.5,
+                                       metrics: Metrics | None = None,
+                                       category: str = DEFAULT_CATEGORY) -> list[str]:
+    """
+    Параллельный обход HTML: по цепочке страниц на каждую букву RUS_ALPHABET.
+
+    Первая цепочка начинается с начала категории (как последовательный обход),
+    поэтому конкатенация цепочек по порядку совпадает с результатом
+    `get_category_members_html`. Цепочки выполняются в пуле потоков с общей
+    `HttpClient` (пул соединений не меньше числа потоков).
+    """
+    partitions = get_partitions(['', *RUS_ALPHABET[1:]])
+    with HttpClient(pool_maxsize=workers, metrics=metrics) as client, \
+            ThreadPoolExecutor(max_workers=workers) as executor:
+        chains = list(executor.map(lambda part: crawl_chain(part, client, delay, category),
+                                   partitions))
+        client.log_stats()
+    all_titles = [title for chain in chains for title in chain]
+    logger.info(f"Всего получено {len(all_titles)} заголовков через HTML "
+                f"({len(partitions)} цепочек)")
+    return all_titles
+
+
+def count_animals_by_letter(parallel: bool = False, workers: int = 8,
+                            metrics: Metrics | None = None) -> dict[str, int]:
     logger.info("Начало обработки категорий через HTML")
     start_time = time.time()
-    letter_counts: dict[str, int] = defaultdict(int)
 
-    titles = get_category_members_html()
-
-    for title in titles:
-        if title and title[0].upper() in RUS_ALPHABET:
-            letter_counts[title[0].upper()] += 1
-            logger.debug(f"Подсчитан: {title}")
-        else:
-            logger.debug(f"Пропущен: {title}")
+    if parallel:
+        titles = get_category_members_html_parallel(workers, metrics=metrics)
+    else:
+        with HttpClient(metrics=metrics) as client:
+            titles = get_category_members_html(client)
 
+    letter_counts = count_letters(titles)
     logger.info(f"Обработано {sum(letter_counts.values())} заголовков через HTML")
     logger.info(f"Время выполнения: {time.time() - start_time:.2f} секунд")
     return letter_counts
 
 
-def write_to_csv(letter_counts: dict[str, int], filename: str = "beasts_html.csv"):
-    with open(filename, 'w', encoding='utf-8', newline='') as f:
-        writer = csv.writer(f)
-        for letter in sorted(letter_counts.keys(), key=lambda c: ORDER_RUS_ALPHABET[c]):
-            writer.writerow([letter, letter_counts[letter]])
-    logger.info(f"Результаты записаны в {filename}")
-
-
 def main():
-    letter_counts = count_animals_by_letter()
+    parser = argparse.ArgumentParser(description="Подсчёт животных по буквам через HTML")
+    parser.add_argument("--parallel", action="store_true",
+                        help="параллельные цепочки страниц по буквам")
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--metrics-json", help="записать метрики запросов в JSON")
+    parser.add_argument("--metrics-prom", help="записать метрики в формате Prometheus")
+    args = parser.parse_args()
+
+    metrics = Metrics() if args.metrics_json or args.metrics_prom else None
+    letter_counts = count_animals_by_letter(args.parallel, args.workers, metrics)
     write_to_csv(letter_counts, filename="beasts_html.csv")
+    if metrics is not None:
+        metrics.dump(args.metrics_json, args.metrics_prom)
 
 
 if __name__ == "__main__":
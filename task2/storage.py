@@ -0,0 +1,229 @@
+"""
+Локальное хранилище участников категории (SQLite) с инкрементальным обновлением.
+
+Первый запуск скачивает категорию целиком. Последующие запросы к API
+забирают только страницы, добавленные после последнего известного timestamp
+(`cmsort=timestamp`, `cmstart`). API categorymembers не отдаёт ленту удалений,
+поэтому удалённые из категории страницы находятся полной сверкой pageid,
+которая выполняется не чаще, чем раз в `reconcile_after` (или по `--full`).
+"""
+import argparse
+import asyncio
+import logging
+import sqlite3
+import time
+from collections.abc import AsyncIterator, Iterable
+from datetime import datetime, timedelta, timezone
+
+import aiohttp
+
+from .solution import first_letter, write_to_csv
+
+logger = logging.getLogger(__name__)
+
+API_URL = "https://ru.wikipedia.org/w/api.php"
+DEFAULT_DB_PATH = "category_members.sqlite3"
+RECONCILE_AFTER = timedelta(days=7)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS members (
+    category  TEXT    NOT NULL,
+    pageid    INTEGER NOT NULL,
+    title     TEXT    NOT NULL,
+    sortkey   TEXT,
+    timestamp TEXT,
+    letter    TEXT,
+    PRIMARY KEY (category, pageid)
+);
+CREATE INDEX IF NOT EXISTS members_letter ON members (category, letter);
+CREATE TABLE IF NOT EXISTS sync_state (
+    category       TEXT PRIMARY KEY,
+    last_timestamp TEXT,
+    last_full_sync TEXT
+);
+"""
+
+
+class MemberStore:
+    """Участники категорий, ключ — (категория, pageid)."""
+
+    def __init__(self, path: str = DEFAULT_DB_PATH):
+        self.connection = sqlite3.connect(path)
+        self.connection.executescript(_SCHEMA)
+
+    def __enter__(self) -> "MemberStore":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self.connection.close()
+
+    def upsert(self, category: str, members: Iterable[dict]) -> int:
+        """Добавляет или обновляет участников (словари ответа API). Возвращает их число."""
+        rows = [
+            (category, member["pageid"], member["title"], member.get("sortkeyprefix"),
+             member.get("timestamp"), first_letter(member["title"]))
+            for member in members
+        ]
+        with self.connection:
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO members "
+                "(category, pageid, title, sortkey, timestamp, letter) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+        return len(rows)
+
+    def remove(self, category: str, pageids: Iterable[int]) -> int:
+        rows = [(category, pageid) for pageid in pageids]
+        with self.connection:
+            self.connection.executemany(
+                "DELETE FROM members WHERE category = ? AND pageid = ?", rows
+            )
+        return len(rows)
+
+    def pageids(self, category: str) -> set[int]:
+        cursor = self.connection.execute(
+            "SELECT pageid FROM members WHERE category = ?", (category,)
+        )
+        return {pageid for (pageid,) in cursor}
+
+    def letter_counts(self, category: str) -> dict[str, int]:
+        cursor = self.connection.execute(
+            "SELECT letter, COUNT(*) FROM members "
+            "WHERE category = ? AND letter IS NOT NULL GROUP BY letter",
+            (category,),
+        )
+        return dict(cursor.fetchall())
+
+    def sync_state(self, category: str) -> tuple[str | None, datetime | None]:
+        """(последний timestamp добавления, время последней полной сверки)."""
+        row = self.connection.execute(
+            "SELECT last_timestamp, last_full_sync FROM sync_state WHERE category = ?",
+            (category,),
+        ).fetchone()
+        if row is None:
+            return None, None
+        last_timestamp, last_full_sync = row
+        return last_timestamp, datetime.fromisoformat(last_full_sync) if last_full_sync else None
+
+    def save_sync_state(self, category: str, last_timestamp: str | None,
+                        last_full_sync: datetime | None) -> None:
+        with self.connection:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO sync_state (category, last_timestamp, last_full_sync) "
+                "VALUES (?, ?, ?)",
+                (category, last_timestamp,
+                 last_full_sync.isoformat() if last_full_sync else None),
+            )
+
+
+async def iter_member_pages(session: aiohttp.ClientSession, category: str,
+                            extra_params: dict[str, str | int]) -> AsyncIterator[list[dict]]:
+    """Постранично отдаёт участников категории с pageid, заголовком, sortkey и timestamp."""
+    params: dict[str, str | int] = {
+        "action": "query",
+        "list": "categorymembers",
+        "cmtitle": f"Категория:{category}",
+        "cmtype": "page",
+        "cmprop": "ids|title|sortkeyprefix|timestamp",
+        "cmlimit": 500,
+        "format": "json",
+        **extra_params,
+    }
+    while True:
+        async with session.get(API_URL, params=params) as response:
+            if response.status == 429:
+                retry_after = float(response.headers.get("Retry-After", 2))
+                logger.warning(f"429 для категории '{category}', ждём {retry_after}s")
+                await asyncio.sleep(retry_after)
+                continue
+            response.raise_for_status()
+            data = await response.json()
+        if "error" in data:
+            raise RuntimeError(f"API ошибка для '{category}': {data['error']}")
+        yield data["query"]["categorymembers"]
+        if "continue" not in data:
+            return
+        params["cmcontinue"] = data["continue"]["cmcontinue"]
+
+
+def _latest_timestamp(current: str | None, members: list[dict]) -> str | None:
+    # ISO 8601 в UTC сравнивается как строка
+    timestamps = [member["timestamp"] for member in members]
+    if current is not None:
+        timestamps.append(current)
+    return max(timestamps, default=None)
+
+
+async def refresh_store(store: MemberStore, category: str, session: aiohttp.ClientSession,
+                        full: bool = False,
+                        reconcile_after: timedelta = RECONCILE_AFTER) -> tuple[int, int]:
+    """
+    Обновляет хранилище. Возвращает (число полученных записей, число удалённых).
+
+    Полная синхронизация выполняется при первом запуске, по `full=True` или если
+    последняя полная сверка старше `reconcile_after`; иначе запрашиваются
+    только страницы, добавленные начиная с последнего известного timestamp.
+    """
+    last_timestamp, last_full_sync = store.sync_state(category)
+    now = datetime.now(timezone.utc)
+    if (full or last_timestamp is None or last_full_sync is None
+            or now - last_full_sync > reconcile_after):
+        logger.info(f"Полная синхронизация категории '{category}'")
+        seen: set[int] = set()
+        fetched = 0
+        async for members in iter_member_pages(session, category, {}):
+            fetched += store.upsert(category, members)
+            seen.update(member["pageid"] for member in members)
+            last_timestamp = _latest_timestamp(last_timestamp, members)
+        removed = store.remove(category, store.pageids(category) - seen)
+        store.save_sync_state(category, last_timestamp, now)
+        return fetched, removed
+
+    logger.info(f"Инкрементальное обновление категории '{category}' с {last_timestamp}")
+    fetched = 0
+    # cmstart включает границу: страницы с тем же timestamp придут повторно, upsert идемпотентен
+    params = {"cmsort": "timestamp", "cmdir": "newer", "cmstart": last_timestamp}
+    async for members in iter_member_pages(session, category, params):
+        fetched += store.upsert(category, members)
+        last_timestamp = _latest_timestamp(last_timestamp, members)
+    store.save_sync_state(category, last_timestamp, last_full_sync)
+    return fetched, 0
+
+
+def count_animals_by_letter_cached(category: str = "Животные по алфавиту",
+                                   db_path: str = DEFAULT_DB_PATH,
+                                   full: bool = False) -> dict[str, int]:
+    """Обновляет локальное хранилище и считает буквы по нему."""
+    start_time = time.time()
+
+    async def refresh(store: MemberStore) -> tuple[int, int]:
+        async with aiohttp.ClientSession() as session:
+            return await refresh_store(store, category, session, full=full)
+
+    with MemberStore(db_path) as store:
+        fetched, removed = asyncio.run(refresh(store))
+        logger.info(f"Получено записей: {fetched}, удалено: {removed}")
+        letter_counts = store.letter_counts(category)
+    logger.info(f"Подсчитано заголовков: {sum(letter_counts.values())}")
+    logger.info(f"Время выполнения: {time.time() - start_time:.2f} секунд")
+    return letter_counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Подсчёт животных по буквам через локальный кэш")
+    parser.add_argument("--db", default=DEFAULT_DB_PATH, help="путь к файлу SQLite")
+    parser.add_argument("--category", default="Животные по алфавиту")
+    parser.add_argument("--full", action="store_true", help="полная синхронизация со сверкой")
+    parser.add_argument("--output", default="beasts.csv")
+    args = parser.parse_args()
+
+    letter_counts = count_animals_by_letter_cached(args.category, args.db, args.full)
+    write_to_csv(letter_counts, filename=args.output)
+
+
+if __name__ == "__main__":
+    main()
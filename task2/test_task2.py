@@ -1,4 +1,3 @@
-import asyncio
 import csv
 import logging
 from pathlib import Path
@@ -7,7 +6,9 @@ from unittest.mock import AsyncMock, MagicMock, patch
 import aiohttp
 import pytest
 
-from .solution import count_animals_by_letter, fetch_titles, get_prefixes, write_to_csv
+from .rate_limit import AdaptiveRateLimiter
+from .solution import (SortkeyRange, count_animals_by_letter, fetch_titles, get_partitions,
+                       get_prefixes, is_before, split_range, write_to_csv)
 
 
 # Отключаем логирование для тестов
@@ -68,9 +69,9 @@ async def test_fetch_titles_success(mock_api_response):
     mock_session = AsyncMock(spec=aiohttp.ClientSession)
     mock_session.get.return_value = mock_response
 
-    semaphore = asyncio.Semaphore(1)
+    limiter = AdaptiveRateLimiter()
     titles = {}
-    await fetch_titles("А", "TestCategory", mock_session, semaphore, titles)
+    await fetch_titles("А", "TestCategory", mock_session, limiter, titles)
     assert titles == {"Аардварк": 1, "Агути": 1, "Антилопа": 1, "Аист": 1}
     assert len(titles) == 4
 
@@ -88,9 +89,9 @@ async def test_fetch_titles_empty(mock_api_response_empty):
     mock_session = AsyncMock(spec=aiohttp.ClientSession)
     mock_session.get.return_value = mock_response
 
-    semaphore = asyncio.Semaphore(1)
+    limiter = AdaptiveRateLimiter()
     titles = {}
-    await fetch_titles("А", "EmptyCategory", mock_session, semaphore, titles)
+    await fetch_titles("А", "EmptyCategory", mock_session, limiter, titles)
     assert titles == {}
     assert len(titles) == 0
 
@@ -105,9 +106,9 @@ async def test_fetch_titles_error():
     mock_session = AsyncMock(spec=aiohttp.ClientSession)
     mock_session.get.return_value = mock_response
 
-    semaphore = asyncio.Semaphore(1)
+    limiter = AdaptiveRateLimiter()
     titles = {}
-    await fetch_titles("А", "ErrorCategory", mock_session, semaphore, titles)
+    await fetch_titles("А", "ErrorCategory", mock_session, limiter, titles)
     assert titles == {}
     assert len(titles) == 0
 
@@ -133,13 +134,13 @@ async def test_fetch_titles_429_empty(mock_api_response_empty):
     mock_session = AsyncMock(spec=aiohttp.ClientSession)
     mock_session.get.side_effect = [mock_response_429, mock_response_ok]
 
-    semaphore = asyncio.Semaphore(1)
+    limiter = AdaptiveRateLimiter()
     titles = {}
     with patch("asyncio.sleep", new=AsyncMock(return_value=None)) as mock_sleep:
-        await fetch_titles("А", "TestCategory", mock_session, semaphore, titles)
+        await fetch_titles("А", "TestCategory", mock_session, limiter, titles)
         assert mock_sleep.called
         assert mock_sleep.call_count == 1
-        assert mock_sleep.await_args == ((retry_after,),)
+        assert mock_sleep.await_args.args[0] == pytest.approx(retry_after, abs=0.1)
     assert titles == {}
     assert len(titles) == 0
 
@@ -167,17 +168,114 @@ async def test_fetch_titles_429_non_empty():
     mock_session = AsyncMock(spec=aiohttp.ClientSession)
     mock_session.get.side_effect = [mock_response_429, mock_response_non_empty]
 
-    semaphore = asyncio.Semaphore(1)
+    limiter = AdaptiveRateLimiter()
     titles = {}
     with patch("asyncio.sleep", new=AsyncMock(return_value=None)) as mock_sleep:
-        await fetch_titles("А", "TestCategory", mock_session, semaphore, titles)
+        await fetch_titles("А", "TestCategory", mock_session, limiter, titles)
         assert mock_sleep.called
-        assert mock_sleep.call_count == 2
-        assert mock_sleep.await_args_list == [((retry_after,),), ((0.5,),)]
+        # после 429 ждёт общая пауза ограничителя, фиксированной задержки между страницами нет
+        assert mock_sleep.call_count == 1
+        assert mock_sleep.await_args.args[0] == pytest.approx(retry_after, abs=0.1)
     assert titles == {"Аист": 1}
     assert len(titles) == 1
 
 
+def make_response(data: dict) -> MagicMock:
+    response = MagicMock()
+    response.__aenter__ = AsyncMock(return_value=response)
+    response.__aexit__ = AsyncMock(return_value=None)
+    response.status = 200
+    response.json = AsyncMock(return_value=data)
+    response.raise_for_status = MagicMock(return_value=None)
+    return response
+
+
+def test_get_partitions_disjoint():
+    """Тестирует разбиение алфавита на непересекающиеся диапазоны."""
+    partitions = get_partitions(get_prefixes(length=1))
+    assert len(partitions) == 33
+    assert partitions[0] == SortkeyRange("А", "Б")
+    assert partitions[6] == SortkeyRange("Ё", "Ж")
+    assert partitions[-1] == SortkeyRange("Я", None)
+
+
+@pytest.mark.parametrize(
+    "key, end, expected",
+    [
+        ("Аист", "Б", True),
+        ("Бобр", "Б", False),
+        ("бобр", "Б", False),
+        ("Ёж", "Ж", True),
+        ("Сайга", "Сб", True),
+        ("Сбор", "Сб", False),
+        ("Яблоко", None, True),
+    ],
+)
+def test_is_before(key, end, expected):
+    """Тестирует сравнение ключа сортировки с правой границей диапазона."""
+    assert is_before(key, end) is expected
+
+
+def test_split_range():
+    """Тестирует деление плотного диапазона по двухбуквенным префиксам."""
+    current, extra = split_range(SortkeyRange("С", "Т"), "Саранча")
+    assert current == SortkeyRange("С", "СБ")
+    assert len(extra) == 32
+    assert extra[0] == SortkeyRange("СБ", "СВ")
+    assert extra[-1] == SortkeyRange("СЯ", "Т")
+
+    current, extra = split_range(SortkeyRange("С", "Т"), "Слон")
+    assert current.end == "СМ"
+    assert [part.start for part in extra] == ["СМ", "СЩ"]
+    assert extra[-1].end == "Т"
+
+    assert split_range(SortkeyRange("СА", "СБ"), "Сайга") == (SortkeyRange("СА", "СБ"), [])
+
+
+@pytest.mark.asyncio
+async def test_fetch_titles_stops_at_range_end():
+    """Тестирует остановку обхода на правой границе по ключу сортировки."""
+    mock_session = AsyncMock(spec=aiohttp.ClientSession)
+    mock_session.get.side_effect = [make_response({
+        "query": {"categorymembers": [
+            {"title": "Аист", "sortkeyprefix": ""},
+            {"title": "Ёлка", "sortkeyprefix": "Аёлка"},
+            {"title": "Бобр", "sortkeyprefix": ""},
+        ]},
+        "continue": {"cmcontinue": "next_page"},
+    })]
+    titles = {}
+    with patch("asyncio.sleep", new=AsyncMock(return_value=None)):
+        await fetch_titles(SortkeyRange("А", "Б"), "TestCategory", mock_session,
+                           AdaptiveRateLimiter(), titles)
+    assert titles == {"Аист": 1, "Ёлка": 1}
+    assert mock_session.get.call_count == 1
+
+
+@pytest.mark.asyncio
+async def test_fetch_titles_splits_dense_range():
+    """Тестирует деление плотного диапазона и передачу остатка в spawn."""
+    mock_session = AsyncMock(spec=aiohttp.ClientSession)
+    mock_session.get.side_effect = [
+        make_response({
+            "query": {"categorymembers": [{"title": "Саванна"}, {"title": "Сайга"}]},
+            "continue": {"cmcontinue": "next_page"},
+        }),
+        make_response({
+            "query": {"categorymembers": [{"title": "Саламандра"}, {"title": "Сбор"}]},
+            "continue": {"cmcontinue": "next_page_2"},
+        }),
+    ]
+    spawned = []
+    titles = {}
+    with patch("asyncio.sleep", new=AsyncMock(return_value=None)):
+        await fetch_titles(SortkeyRange("С", "Т"), "TestCategory", mock_session,
+                           AdaptiveRateLimiter(), titles, spawn=spawned.append)
+    assert titles == {"Саванна": 1, "Сайга": 1, "Саламандра": 1}
+    assert spawned[0] == SortkeyRange("СБ", "СВ")
+    assert spawned[-1] == SortkeyRange("СЯ", "Т")
+
+
 @pytest.mark.parametrize(
     "titles, expected_counts",
     [
@@ -0,0 +1,108 @@
+import csv
+import logging
+from unittest.mock import patch
+
+import aiohttp
+import pytest
+
+from . import batch
+from .batch import (category_filename, category_filenames, count_categories,
+                    fetch_category_sizes, main, read_categories, write_long_csv)
+from .fake_wiki import SyntheticCategory
+from .metrics import Metrics
+
+
+logging.getLogger().setLevel(logging.CRITICAL)
+
+CATEGORIES = [SyntheticCategory("Малые", size=300, seed=1),
+              SyntheticCategory("Большие", size=2500, seed=2),
+              SyntheticCategory("Средние", size=1200, seed=3)]
+
+
+@pytest.fixture
+def server(fake_wiki):
+    return fake_wiki(CATEGORIES[0], extra_categories=tuple(CATEGORIES[1:]))
+
+
+@pytest.mark.asyncio
+async def test_fetch_category_sizes(server, fast_limiter):
+    """Тестирует размеры категорий из prop=categoryinfo, в том числе несуществующей."""
+    names = [category.name for category in CATEGORIES] + ["Нет такой"]
+    with patch.object(batch, "TITLES_PER_REQUEST", 2):
+        async with aiohttp.ClientSession() as session:
+            sizes = await fetch_category_sizes(names, session, fast_limiter())
+    assert sizes == {"Малые": 300, "Большие": 2500, "Средние": 1200, "Нет такой": 0}
+
+
+def test_batch_counts_all_categories_largest_first(server, fast_limiter):
+    """Тестирует обход нескольких категорий одной сессией от больших к меньшим."""
+    started = []
+    original = batch.collect_category_titles
+
+    async def record(category, *args):
+        started.append(category)
+        return await original(category, *args)
+
+    server.reset_stats()
+    metrics = Metrics()
+    with patch.object(batch, "collect_category_titles", record):
+        results = count_categories(["Малые", "Большие", "Нет такой", "Средние", "Малые"],
+                                   fast_limiter(), parallel=1, metrics=metrics)
+    assert list(results) == ["Малые", "Большие", "Нет такой", "Средние"]
+    assert started == ["Большие", "Средние", "Малые"]
+    for category in CATEGORIES:
+        assert results[category.name] == category.letter_counts()
+    assert results["Нет такой"] == {}
+    assert sum(metrics.statuses.values()) == server.requests
+
+
+def test_batch_outputs(tmp_path):
+    """Тестирует CSV по категориям и общий CSV в длинном формате."""
+    results = {"Птицы/Совы": {"С": 2, "А": 1}, "Рыбы": {}}
+    assert category_filename("Птицы/Совы") == "Птицы_Совы.csv"
+    assert category_filenames(["Птицы/Совы", "Рыбы"]) == {"Птицы/Совы": "Птицы_Совы.csv",
+                                                          "Рыбы": "Рыбы.csv"}
+    paths = batch.write_category_csvs(results, str(tmp_path / "out"))
+    with open(paths[0], encoding="utf-8") as f:
+        assert list(csv.reader(f)) == [["А", "1"], ["С", "2"]]
+
+    combined = tmp_path / "long.csv"
+    write_long_csv(results, str(combined))
+    with open(combined, encoding="utf-8") as f:
+        assert list(csv.reader(f)) == [["category", "letter", "count"],
+                                       ["Птицы/Совы", "А", "1"], ["Птицы/Совы", "С", "2"]]
+
+
+def test_batch_colliding_filenames(tmp_path):
+    """Тестирует, что категории с совпадающими после очистки именами не перезаписывают CSV."""
+    results = {"Птицы/Совы": {"А": 1}, "Птицы Совы": {"Б": 2}, "птицы_совы": {"В": 3}}
+    filenames = category_filenames(results)
+    assert len({name.casefold() for name in filenames.values()}) == 3
+    assert all(name.startswith("Птицы_Совы-") or name.startswith("птицы_совы-")
+               for name in filenames.values())
+    assert category_filenames(results) == filenames
+
+    paths = batch.write_category_csvs(results, str(tmp_path / "out"))
+    assert len(set(paths)) == 3
+    letters = set()
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            letters.update(row[0] for row in csv.reader(f))
+    assert letters == {"А", "Б", "В"}
+
+
+def test_cli_reads_category_file(server, tmp_path, fast_limiter):
+    """Тестирует CLI со списком категорий из файла."""
+    categories_file = tmp_path / "categories.txt"
+    categories_file.write_text("# таксоны\nСредние\n\nМалые\n", encoding="utf-8")
+    assert read_categories(str(categories_file)) == ["Средние", "Малые"]
+    combined = tmp_path / "long.csv"
+    with patch.object(batch, "AdaptiveRateLimiter", fast_limiter):
+        main(["Большие", "--file", str(categories_file), "--combined", str(combined)])
+    with open(combined, encoding="utf-8") as f:
+        rows = list(csv.DictReader(f))
+    totals = {}
+    for row in rows:
+        totals[row["category"]] = totals.get(row["category"], 0) + int(row["count"])
+    assert totals == {category.name: sum(category.letter_counts().values())
+                      for category in CATEGORIES}
@@ -0,0 +1,119 @@
+import logging
+from unittest.mock import patch
+
+import pytest
+import requests
+
+from .benchmark import (format_table, main, measure_engine, missing_titles, run_parser_benchmark,
+                        synthetic_pages)
+from .fake_wiki import Faults, FakeWikiServer, SyntheticCategory, percentile
+
+
+logging.getLogger().setLevel(logging.CRITICAL)
+
+
+@pytest.fixture(scope="module")
+def server():
+    with FakeWikiServer(SyntheticCategory(size=1200, seed=1)) as server:
+        yield server
+
+
+def test_synthetic_category_sorted_and_unique():
+    """Тестирует синтетическую категорию: порядок ключей и распределение букв."""
+    category = SyntheticCategory(size=500, letter_weights={"А": 3, "Б": 1, "Z": 1}, seed=2)
+    assert len(set(category.titles)) == len(set(category.pageids)) == 500
+    assert category.titles == sorted(category.titles, key=lambda t: category.position(t))
+    counts = category.letter_counts()
+    assert set(counts) == {"А", "Б"}
+    assert counts["А"] > counts["Б"]
+
+
+def test_percentile():
+    """Тестирует перцентиль по ближайшему рангу."""
+    values = [float(n) for n in range(1, 101)]
+    assert percentile(values, 50) == 50.0
+    assert percentile(values, 99) == 99.0
+    assert percentile([], 99) == 0.0
+
+
+def test_api_pagination(server):
+    """Тестирует постраничную выдачу categorymembers и старт с префикса."""
+    params = {"action": "query", "list": "categorymembers", "format": "json",
+              "cmtitle": "Категория:Животные_по_алфавиту", "cmlimit": 500,
+              "cmprop": "ids|title|sortkeyprefix"}
+    titles = []
+    while True:
+        data = requests.get(server.api_url, params=params, timeout=5).json()
+        titles.extend(member["title"] for member in data["query"]["categorymembers"])
+        if "continue" not in data:
+            break
+        params["cmcontinue"] = data["continue"]["cmcontinue"]
+    assert titles == server.category.titles
+
+    del params["cmcontinue"]
+    params["cmstartsortkeyprefix"] = "Я"
+    data = requests.get(server.api_url, params=params, timeout=5).json()
+    assert all(m["title"].startswith("Я") for m in data["query"]["categorymembers"])
+
+
+def test_throttle_injection():
+    """Тестирует ответы 429 с Retry-After."""
+    faults = Faults(throttle_rate=1.0, retry_after=3)
+    with FakeWikiServer(SyntheticCategory(size=10), faults) as server:
+        response = requests.get(server.api_url, timeout=5)
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == "3"
+    assert server.throttled == 1
+
+    # Дробное значение округляется вверх: urllib3 принимает только целые секунды
+    with FakeWikiServer(SyntheticCategory(size=10), Faults(throttle_rate=1.0)) as server:
+        response = requests.get(server.api_url, timeout=5)
+    assert response.headers["Retry-After"] == "1"
+
+
+def test_missing_titles():
+    """Тестирует сравнение каждого движка с числом заголовков категории."""
+    assert missing_titles({"async": {"titles": 3000, "expected_titles": 3000}}) == {}
+    # Одинаково неполные движки тоже считаются ошибкой
+    results = {"async": {"titles": 2900, "expected_titles": 3000},
+               "sync": {"titles": 2900, "expected_titles": 3000}}
+    assert missing_titles(results) == {"async": 100, "sync": 100}
+
+
+def test_main_fails_on_missing_titles(capsys):
+    """Тестирует, что таблица печатается, а код выхода ненулевой при недостаче."""
+    row = {"requests": 1, "pages_per_s": 1.0, "titles_per_s": 1.0, "p50_ms": 1.0,
+           "p99_ms": 1.0, "wall_s": 1.0, "titles": 90, "expected_titles": 100}
+    with patch("task2.benchmark.run_benchmark", return_value={"async": row}):
+        assert main(["--engines", "async"]) == 1
+    output = capsys.readouterr().out
+    assert "90/100" in output
+    assert output.index("90/100") < output.index("async -10")
+
+
+def test_async_engine_retries_server_errors():
+    """Тестирует, что 5xx повторяются и асинхронный обход собирает всю категорию."""
+    faults = Faults(error_rate=0.2, error_status=502)
+    with FakeWikiServer(SyntheticCategory(size=3000, seed=2), faults) as server, \
+            patch("task2.solution.SERVER_ERROR_BACKOFF", 0.001):
+        row = measure_engine("async", server)
+    assert row["errors"] > 0
+    assert row["titles"] == row["expected_titles"]
+
+
+@pytest.mark.parametrize("engine", ["async", "sync", "html", "html-parallel"])
+def test_measure_engine_collects_all_titles(server, engine):
+    """Тестирует прогон каждого краулера против локального сервера."""
+    with patch("task2.solution_html.time.sleep"):
+        row = measure_engine(engine, server)
+    assert row["titles"] >= row["expected_titles"] == 1200
+    assert row["pages"] == row["requests"] > 0
+    assert row["p99_ms"] >= row["p50_ms"] > 0
+    assert engine in format_table({engine: row})
+
+
+def test_run_parser_benchmark():
+    """Тестирует бенчмарк разбора HTML на сгенерированных страницах."""
+    result = run_parser_benchmark(synthetic_pages(SyntheticCategory(size=300)), repeat=1)
+    assert result["pages"] == 2
+    assert result["stream_ms"] > 0 and result["soup_ms"] > 0
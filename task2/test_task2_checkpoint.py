@@ -0,0 +1,98 @@
+import json
+import logging
+from unittest.mock import patch
+
+import aiohttp
+import pytest
+
+from .checkpoint import Checkpoint, crawl_api, crawl_html, initial_partitions
+from .fake_wiki import Faults, SyntheticCategory
+from .http_client import HttpClient
+from .solution import SortkeyRange
+
+
+logging.getLogger().setLevel(logging.CRITICAL)
+
+
+def new_checkpoint(path, category, engine):
+    checkpoint = Checkpoint(str(path), category.name, engine, save_every=1)
+    for part in initial_partitions(engine):
+        checkpoint.add(part)
+    return checkpoint
+
+
+def test_checkpoint_roundtrip(tmp_path):
+    """Тестирует атомарное сохранение и загрузку прогресса."""
+    path = tmp_path / "checkpoint.json"
+    checkpoint = Checkpoint(str(path), "Cat", "api", save_every=2)
+    first = checkpoint.add(SortkeyRange("А", "Б"))
+    second = checkpoint.add(SortkeyRange("Б", None))
+    checkpoint.advance(first, "page|1", ["Аист", "Zebra"])
+    assert not path.exists()  # ещё не набралось save_every страниц
+    checkpoint.advance(second, None, ["Бобр"])
+    assert not (tmp_path / "checkpoint.json.tmp").exists()
+
+    loaded = Checkpoint.load(str(path), "Cat", "api")
+    assert [progress.start for progress in loaded.unfinished()] == ["А"]
+    assert loaded.partitions["А"].cursor == "page|1"
+    assert loaded.partitions["А"].titles == 2
+    assert loaded.letter_counts() == {"А": 1, "Б": 1}
+    assert not Checkpoint.load(str(path), "Other", "api").partitions
+    with open(path, encoding="utf-8") as f:
+        assert json.load(f)["engine"] == "api"
+
+
+@pytest.mark.asyncio
+async def test_api_resume_restarts_only_unfinished(tmp_path, fake_wiki, fast_limiter):
+    """Тестирует продолжение обхода API после ошибок сервера."""
+    category = SyntheticCategory(size=20000, seed=6)
+    path = tmp_path / "checkpoint.json"
+    server = fake_wiki(category, Faults(error_rate=0.3), seed=1)
+    async with aiohttp.ClientSession() as session:
+        checkpoint = new_checkpoint(path, category, "api")
+        # Без повторов ошибки 5xx прерывают диапазоны — их и продолжаем
+        with patch("task2.solution.SERVER_ERROR_RETRIES", 0):
+            await crawl_api(checkpoint, session, fast_limiter())
+        checkpoint.save()
+        assert checkpoint.unfinished()
+        finished = len(checkpoint.partitions) - len(checkpoint.unfinished())
+
+        server.faults = Faults()
+        server.reset_stats()
+        resumed = Checkpoint.load(str(path), category.name, "api")
+        assert len(resumed.unfinished()) == len(checkpoint.partitions) - finished
+        await crawl_api(resumed, session, fast_limiter(), split=False)
+    assert not resumed.unfinished()
+    assert resumed.letter_counts() == category.letter_counts()
+    assert sum(progress.titles for progress in resumed.partitions.values()) == len(category)
+    assert server.requests < 20000 // 500 + len(resumed.partitions)
+
+
+def test_html_resume_restarts_only_unfinished(tmp_path, fake_wiki):
+    """Тестирует продолжение обхода HTML с сохранённого URL следующей страницы."""
+    category = SyntheticCategory(size=3000, letter_weights={"А": 4, "Б": 1, "В": 1}, seed=7)
+    path = tmp_path / "checkpoint.json"
+    server = fake_wiki(category, Faults(error_rate=0.3), seed=0)
+    checkpoint = new_checkpoint(path, category, "html")
+    # Один поток и без повторов — воспроизводимый порядок ошибок
+    crawl_html(checkpoint, workers=1, client=HttpClient(retries=0))
+    assert checkpoint.unfinished()
+    assert any(progress.cursor for progress in checkpoint.unfinished())
+
+    server.faults = Faults()
+    resumed = Checkpoint.load(str(path), category.name, "html")
+    crawl_html(resumed, workers=4)
+    assert not resumed.unfinished()
+    assert resumed.letter_counts() == category.letter_counts()
+
+
+def test_crawl_html_keeps_caller_client_open(tmp_path, fake_wiki):
+    """Тестирует, что crawl_html закрывает только созданный им клиент."""
+    category = SyntheticCategory(size=300, seed=8)
+    fake_wiki(category)
+    client = HttpClient()
+    with patch.object(client, "close") as close:
+        crawl_html(new_checkpoint(tmp_path / "checkpoint.json", category, "html"),
+                   workers=2, client=client)
+    close.assert_not_called()
+    client.close()
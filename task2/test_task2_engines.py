@@ -0,0 +1,84 @@
+import csv
+import logging
+
+import pytest
+
+from .__main__ import main
+from .engines import (ENGINES, EngineResult, HtmlEngine, SyncApiEngine, compare_results,
+                      create_engine, format_comparison, run_engine)
+from .fake_wiki import SyntheticCategory
+from .metrics import Metrics
+
+
+logging.getLogger().setLevel(logging.CRITICAL)
+
+CATEGORY = "Тестовые животные"
+
+
+@pytest.fixture
+def server(fake_wiki):
+    return fake_wiki(SyntheticCategory(CATEGORY, size=900, seed=3))
+
+
+@pytest.mark.parametrize("name", list(ENGINES))
+def test_engines_agree_on_category(server, name):
+    """Тестирует, что каждый движок собирает всю категорию и считает запросы."""
+    result = run_engine(create_engine(name, concurrency=4), CATEGORY)
+    assert result.engine == name
+    assert result.titles == set(server.category.titles)
+    assert result.letter_counts == server.category.letter_counts()
+    assert result.requests >= 2
+    assert result.wall_time > 0
+
+
+def test_sequential_html_engine(server):
+    """Тестирует последовательный обход HTML при concurrency=1."""
+    server.reset_stats()
+    metrics = Metrics()
+    result = run_engine(HtmlEngine(concurrency=1), CATEGORY, metrics)
+    assert result.titles == set(server.category.titles)
+    assert result.requests == server.requests == metrics.statuses["200"]
+
+
+def test_unknown_engine():
+    with pytest.raises(ValueError):
+        create_engine("soap")
+
+
+def test_compare_results_reports_diffs():
+    """Тестирует расхождения с эталонным движком."""
+    reference = EngineResult("async-api", frozenset({"Аист", "Бобр"}), {"А": 1, "Б": 1}, 3, 1.0)
+    same = EngineResult("sync-api", frozenset({"Аист", "Бобр"}), {"А": 1, "Б": 1}, 2, 2.0)
+    other = EngineResult("html", frozenset({"Аист", "Агама"}), {"А": 2}, 1, 3.0)
+    diffs = compare_results([reference, same, other])
+    assert diffs["sync-api"] == {"missing": [], "extra": [], "letters": {}}
+    assert diffs["html"] == {"missing": ["Бобр"], "extra": ["Агама"],
+                             "letters": {"А": (1, 2), "Б": (1, 0)}}
+    table = format_comparison([reference, same, other])
+    assert "совпадает" in table
+    assert "html missing: Бобр" in table
+
+
+def test_cli_single_engine(server, tmp_path):
+    """Тестирует запуск одного движка из командной строки."""
+    output = tmp_path / "counts.csv"
+    metrics_path = tmp_path / "metrics.json"
+    assert main(["--engine", "sync-api", "--category", CATEGORY, "--output", str(output),
+                 "--metrics-json", str(metrics_path)]) == 0
+    with open(output, encoding="utf-8") as f:
+        rows = {letter: int(count) for letter, count in csv.reader(f)}
+    assert rows == server.category.letter_counts()
+    assert metrics_path.exists()
+
+
+def test_cli_compare(server, capsys):
+    """Тестирует режим сравнения движков."""
+    assert main(["--compare", "async-api", "sync-api", "html",
+                 "--category", CATEGORY, "--concurrency", "2"]) == 0
+    out = capsys.readouterr().out
+    assert "эталон" in out
+    assert out.count("совпадает") == 2
+
+
+def test_sync_engine_ignores_concurrency():
+    assert SyncApiEngine(concurrency=8).concurrency == 1
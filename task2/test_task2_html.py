@@ -0,0 +1,91 @@
+import logging
+from unittest.mock import patch
+
+import pytest
+
+from .fake_wiki import FakeWikiServer, SyntheticCategory
+from .solution import SortkeyRange
+from .solution_html import (CategoryPageParser, crawl_chain, get_category_members_html,
+                            get_category_members_html_parallel, parse_category_page,
+                            parse_category_page_sections, parse_category_page_soup)
+
+
+logging.getLogger().setLevel(logging.CRITICAL)
+
+
+PAGE = """<html><body>
+<div id="mw-head"><a href="/wiki/Main" title="Заглавная">Заглавная</a></div>
+<div id="mw-pages"><h2>Страницы в категории</h2>
+(<a href="/w/index.php?title=X&amp;pageuntil=A" title="Категория:X">Предыдущая страница</a>)
+(<a href="/w/index.php?title=X&amp;pagefrom=B" title="Категория:X">Следующая страница</a>)
+<div class="mw-category"><div class="mw-category-group"><h3>А</h3><ul>
+<li><a href="/wiki/Aist" title="Аист">Аист</a></li>
+<li><a href="/wiki/Akula" title="Акула &amp; скат">Акула &amp; скат</a></li>
+</ul></div></div>
+(<a href="/w/index.php?title=X&amp;pagefrom=B" title="Категория:X">Следующая страница</a>)
+</div>
+<div id="catlinks"><a href="/wiki/C" title="Категория:Прочее">Прочее</a></div>
+</body></html>"""
+
+
+def test_parse_category_page_skips_navigation():
+    """Тестирует извлечение заголовков и ссылки на следующую страницу за один проход."""
+    titles, next_page_url = parse_category_page(PAGE)
+    assert titles == ["Аист", "Акула & скат"]
+    assert next_page_url == "/w/index.php?title=X&pagefrom=B"
+    assert parse_category_page_soup(PAGE) == (titles, next_page_url)
+    assert parse_category_page_sections(PAGE)[0] == [("Аист", "А"), ("Акула & скат", "А")]
+
+
+def test_parser_stops_after_container():
+    """Тестирует остановку разбора на закрывающем теге контейнера."""
+    parser = CategoryPageParser()
+    with patch.object(CategoryPageParser, "handle_data", autospec=True,
+                      side_effect=CategoryPageParser.handle_data) as handle_data:
+        parser.parse(PAGE)
+    assert parser.found
+    assert not any("Прочее" in call.args[1] for call in handle_data.call_args_list)
+
+
+@pytest.mark.parametrize(
+    "html",
+    ["<html><body><p>Пусто</p></body></html>",
+     "<div id='mw-pages'><a title='Аист' href='/wiki/A'>Аист</a></div>"],
+    ids=["no_container", "single_quotes"],
+)
+def test_parse_category_page_falls_back_to_soup(html):
+    """Тестирует переход на BeautifulSoup, если потоковый разбор не нашёл контейнер."""
+    assert parse_category_page(html) == parse_category_page_soup(html)
+
+
+def test_stream_parser_matches_soup_on_generated_pages():
+    """Тестирует совпадение результатов парсеров на страницах локального сервера."""
+    category = SyntheticCategory(size=450, seed=3)
+    server = FakeWikiServer(category)
+    titles = []
+    for start in range(0, len(category), 200):
+        page = server.render_page(start, min(start + 200, len(category)))
+        result = parse_category_page(page)
+        assert result == parse_category_page_soup(page)
+        titles.extend(result[0])
+    assert titles == category.titles
+
+
+@pytest.mark.parametrize("weights", [None, {"A": 1, "Б": 5, "Я": 1}], ids=["uniform", "skewed"])
+def test_parallel_crawl_matches_sequential(weights, fake_wiki):
+    """Тестирует, что параллельные цепочки дают ровно результат последовательного обхода."""
+    category = SyntheticCategory(size=1500, letter_weights=weights, seed=4)
+    fake_wiki(category)
+    sequential = get_category_members_html()
+    parallel = get_category_members_html_parallel(workers=4)
+    assert parallel == sequential == category.titles
+
+
+def test_crawl_chain_stops_at_next_range(fake_wiki):
+    """Тестирует остановку цепочки на разделе следующего диапазона."""
+    category = SyntheticCategory(size=1000, seed=5)
+    server = fake_wiki(category)
+    titles = crawl_chain(SortkeyRange("В", "Г"))
+    requests_made = server.requests
+    assert titles == [title for title in category.titles if title.startswith("В")]
+    assert requests_made == 1
@@ -0,0 +1,58 @@
+import logging
+
+import pytest
+import requests
+
+from .fake_wiki import Faults, FakeWikiServer, SyntheticCategory
+from .http_client import DEFAULT_USER_AGENT, HttpClient
+
+
+logging.getLogger().setLevel(logging.CRITICAL)
+
+
+@pytest.fixture(scope="module")
+def server():
+    with FakeWikiServer(SyntheticCategory(size=2000, seed=8)) as server:
+        yield server
+
+
+def api_params(**extra):
+    return {"action": "query", "list": "categorymembers", "format": "json",
+            "cmtitle": "Категория:Животные по алфавиту", "cmlimit": 500, **extra}
+
+
+def test_connection_reuse_and_compression(server):
+    """Тестирует keep-alive соединение и подсчёт сжатых байтов."""
+    with HttpClient() as client:
+        for _ in range(10):
+            response = client.get(server.api_url, params=api_params())
+            assert len(response.json()["query"]["categorymembers"]) == 500
+        stats = client.stats()
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert response.request.headers["User-Agent"] == DEFAULT_USER_AGENT
+    assert stats["requests"] == stats["responses"] == 10
+    assert stats["connections"] == 1
+    assert stats["reuse_rate"] == pytest.approx(0.9)
+    assert 0 < stats["bytes_wire"] < stats["bytes_decoded"]
+
+
+def test_retries_on_throttling_and_server_errors():
+    """Тестирует повторы на 429 и 5xx."""
+    faults = Faults(throttle_rate=0.3, retry_after=0, error_rate=0.3, error_status=502)
+    with FakeWikiServer(SyntheticCategory(size=10), faults, seed=3) as server, \
+            HttpClient(retries=20, backoff_factor=0, user_agent="test-agent") as client:
+        for _ in range(10):
+            response = client.get(server.api_url, params=api_params())
+            assert response.status_code == 200
+        assert response.request.headers["User-Agent"] == "test-agent"
+        assert server.throttled + server.errors > 0
+        assert client.stats()["requests"] == server.requests
+
+
+def test_retries_exhausted():
+    """Тестирует ошибку после исчерпания повторов."""
+    with FakeWikiServer(SyntheticCategory(size=10), Faults(error_rate=1.0)) as server, \
+            HttpClient(retries=2, backoff_factor=0) as client:
+        with pytest.raises(requests.RequestException):
+            client.get(server.api_url, params=api_params())
+        assert server.requests == 3
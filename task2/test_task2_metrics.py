@@ -0,0 +1,79 @@
+import json
+import logging
+
+from .fake_wiki import Faults, SyntheticCategory
+from .metrics import Histogram, Metrics
+from .rate_limit import AdaptiveRateLimiter
+from .solution import get_category_members_api
+from .solution_html import get_category_members_html_parallel
+
+
+logging.getLogger().setLevel(logging.CRITICAL)
+
+
+def test_histogram_buckets():
+    """Тестирует кумулятивные корзины гистограммы."""
+    histogram = Histogram((1, 10))
+    for value in (0.5, 1, 5, 50):
+        histogram.observe(value)
+    assert histogram.cumulative() == [("1", 2), ("10", 3), ("+Inf", 4)]
+    assert histogram.sum == 56.5
+    assert histogram.count == 4
+
+
+def test_dump_json_and_prometheus(tmp_path):
+    """Тестирует выгрузку метрик в JSON и текстовый формат Prometheus."""
+    metrics = Metrics()
+    started = metrics.request_started()
+    metrics.request_finished(started, 200, 2048)
+    metrics.request_finished(metrics.request_started(), 429)
+    metrics.retry_wait(1.5)
+    json_path, prom_path = tmp_path / "metrics.json", tmp_path / "metrics.prom"
+    metrics.dump(str(json_path), str(prom_path))
+
+    data = json.loads(json_path.read_text(encoding="utf-8"))
+    assert data["statuses"] == {"200": 1, "429": 1}
+    assert data["throttled"] == 1
+    assert data["retry_wait_seconds"] == 1.5
+    assert data["max_in_flight"] == 1
+    assert data["histograms"]["response_size_bytes"]["buckets"]["4096"] == 1
+
+    prom = prom_path.read_text(encoding="utf-8")
+    assert "# TYPE crawler_request_duration_seconds histogram" in prom
+    assert 'crawler_request_duration_seconds_bucket{le="+Inf"} 2' in prom
+    assert 'crawler_responses_total{status="429"} 1' in prom
+    assert "crawler_retry_wait_seconds_total 1.5" in prom
+
+
+def test_async_crawler_metrics(fake_wiki):
+    """Тестирует метрики асинхронного обхода API с троттлингом."""
+    category = SyntheticCategory(size=3000, seed=9)
+    faults = Faults(throttle_rate=0.2, retry_after=0.01)
+    metrics = Metrics()
+    server = fake_wiki(category, faults, seed=4)
+    limiter = AdaptiveRateLimiter(rate=1000.0, burst=1000, min_rate=500.0, min_concurrency=4)
+    titles = get_category_members_api(category.name, limiter, metrics)
+    requests_made = server.requests
+    data = metrics.to_dict()
+    assert len(titles) == len(category)
+    assert data["histograms"]["request_duration_seconds"]["count"] == requests_made
+    assert data["histograms"]["json_decode_seconds"]["count"] == data["statuses"]["200"]
+    assert data["throttled"] == server.throttled > 0
+    assert data["retries"] == data["throttled"]
+    assert data["max_in_flight"] >= 1
+    assert metrics.in_flight == 0
+
+
+def test_html_crawler_metrics(fake_wiki):
+    """Тестирует метрики параллельного обхода HTML: запросы, размеры и время разбора."""
+    category = SyntheticCategory(size=1000, seed=10)
+    metrics = Metrics()
+    server = fake_wiki(category, Faults(error_rate=0.2, error_status=503), seed=5)
+    titles = get_category_members_html_parallel(workers=4, metrics=metrics)
+    data = metrics.to_dict()
+    assert titles == category.titles
+    pages = data["statuses"]["200"]
+    assert data["histograms"]["html_parse_seconds"]["count"] == pages
+    assert data["histograms"]["response_size_bytes"]["count"] == pages
+    assert data["server_errors"] == server.errors > 0
+    assert data["retries"] == server.errors
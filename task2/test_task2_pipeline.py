@@ -0,0 +1,121 @@
+import csv
+import logging
+from unittest.mock import patch
+
+import pytest
+
+from . import solution
+from .fake_wiki import SyntheticCategory
+from .pipeline import (LetterCounter, PageIdSet, count_letters_streaming, stream_pages,
+                       write_snapshot)
+from .rate_limit import AdaptiveRateLimiter
+from .solution import SortkeyRange
+
+
+logging.getLogger().setLevel(logging.CRITICAL)
+
+
+PAGES = {
+    "А": [[{"pageid": 1, "title": "Аист"}, {"pageid": 2, "title": "Акула"}],
+          [{"pageid": 3, "title": "Антилопа"}]],
+    "Б": [[{"pageid": 4, "title": "Бобр"}, {"pageid": 1, "title": "Аист"}]],
+    "В": [],
+}
+
+
+def fake_fetch_pages(part, category, session, limiter, spawn=None, metrics=None):
+    async def pages():
+        for page in PAGES[part.start]:
+            yield page
+    return pages()
+
+
+PARTITIONS = [SortkeyRange("А", "Б"), SortkeyRange("Б", "В"), SortkeyRange("В", None)]
+
+
+def test_page_id_set():
+    """Тестирует битовую карту pageid."""
+    seen = PageIdSet()
+    assert seen.add(5)
+    assert not seen.add(5)
+    assert seen.add(1_000_000)
+    assert 5 in seen
+    assert 6 not in seen
+    assert 10**9 not in seen
+    assert len(seen) == 2
+
+
+def test_letter_counter_dedups_by_pageid():
+    """Тестирует подсчёт букв с дедупликацией по pageid."""
+    counter = LetterCounter()
+    counter.add_page([{"pageid": 1, "title": "Аист"}, {"pageid": 2, "title": "Zebra"}])
+    counter.add_page([{"pageid": 1, "title": "Аист"}, {"pageid": 3, "title": "ёж"}])
+    assert counter.snapshot() == {"А": 1, "Ё": 1}
+    assert counter.duplicates == 1
+    assert counter.pages == 2
+
+
+def test_write_snapshot(tmp_path):
+    """Тестирует атомарную запись снимка CSV."""
+    filename = tmp_path / "snapshot.csv"
+    write_snapshot({"Б": 1, "А": 2}, str(filename))
+    with open(filename, encoding="utf-8") as f:
+        assert list(csv.reader(f)) == [["А", "2"], ["Б", "1"]]
+    assert not (tmp_path / "snapshot.csv.tmp").exists()
+
+
+@pytest.mark.asyncio
+async def test_stream_pages_merges_partitions():
+    """Тестирует слияние страниц всех диапазонов в один поток."""
+    with patch("task2.pipeline.fetch_pages", new=fake_fetch_pages):
+        pages = [page async for page in stream_pages("Cat", None, AdaptiveRateLimiter(),
+                                                     PARTITIONS, max_pages_in_flight=1)]
+    assert sorted(member["pageid"] for page in pages for member in page) == [1, 1, 2, 3, 4]
+
+
+@pytest.mark.asyncio
+async def test_count_letters_streaming_writes_snapshots(tmp_path):
+    """Тестирует потоковый подсчёт и снимки CSV во время обхода."""
+    filename = tmp_path / "beasts.csv"
+    snapshots = []
+
+    def record_snapshot(letter_counts, path):
+        snapshots.append(dict(letter_counts))
+        write_snapshot(letter_counts, path)
+
+    with patch("task2.pipeline.fetch_pages", new=fake_fetch_pages), \
+            patch("task2.pipeline.get_partitions", return_value=PARTITIONS), \
+            patch("task2.pipeline.write_snapshot", side_effect=record_snapshot):
+        result = await count_letters_streaming("Cat", None, snapshot_path=str(filename),
+                                               snapshot_every=1)
+    assert result == {"А": 3, "Б": 1}
+    assert len(snapshots) == 4  # после каждой из трёх страниц и итоговый
+    with open(filename, encoding="utf-8") as f:
+        assert list(csv.reader(f)) == [["А", "3"], ["Б", "1"]]
+
+
+@pytest.mark.asyncio
+async def test_stream_pages_reraises_range_errors():
+    """Тестирует, что ошибка диапазона прерывает поток, а не теряет его страницы."""
+    def failing_fetch_pages(part, *args, **kwargs):
+        if part.start == "Б":
+            raise RuntimeError("сбой диапазона")
+        return fake_fetch_pages(part, *args, **kwargs)
+
+    with patch("task2.pipeline.fetch_pages", new=failing_fetch_pages):
+        with pytest.raises(RuntimeError, match="сбой диапазона"):
+            async for _ in stream_pages("Cat", None, AdaptiveRateLimiter(), PARTITIONS):
+                pass
+
+
+def test_solution_main_counts_streaming(fake_wiki, tmp_path, monkeypatch):
+    """Тестирует, что `python -m task2.solution` считает буквы потоково, без списка заголовков."""
+    category = SyntheticCategory(solution.DEFAULT_CATEGORY, size=2000, seed=8)
+    fake_wiki(category)
+    monkeypatch.chdir(tmp_path)
+    with patch("sys.argv", ["solution"]), \
+            patch("task2.solution.get_category_members_api", side_effect=AssertionError):
+        solution.main()
+    with open(tmp_path / "beasts.csv", encoding="utf-8") as f:
+        rows = {letter: int(count) for letter, count in csv.reader(f)}
+    assert rows == category.letter_counts()
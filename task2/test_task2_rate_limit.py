@@ -0,0 +1,162 @@
+import asyncio
+import logging
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import aiohttp
+import pytest
+
+from .fake_wiki import SyntheticCategory
+from .rate_limit import AdaptiveRateLimiter, parse_retry_after
+from .solution import collect_category_titles, fetch_titles, get_category_members_api
+
+
+logging.getLogger().setLevel(logging.CRITICAL)
+
+
+def test_on_success_increases_additively():
+    """Тестирует аддитивный рост темпа и параллельности."""
+    limiter = AdaptiveRateLimiter(rate=10.0, concurrency=4, rate_step=1.0)
+    for _ in range(10):
+        limiter.on_success()
+    assert limiter.rate == pytest.approx(11.0, abs=0.05)
+    assert int(limiter.concurrency) >= 6
+
+
+def test_on_throttle_decreases_once_per_pause():
+    """Тестирует мультипликативное снижение и общую паузу."""
+    limiter = AdaptiveRateLimiter(rate=10.0, concurrency=8, backoff=0.5)
+    limiter.on_throttle(3)
+    limiter.on_throttle(3)  # ответ на запрос, отправленный до паузы
+    assert limiter.rate == 5.0
+    assert limiter.concurrency == 4.0
+    assert limiter.throttled == 2
+    assert limiter.paused_until > 0
+
+
+def test_limits_respected():
+    """Тестирует нижние и верхние границы темпа и параллельности."""
+    limiter = AdaptiveRateLimiter(rate=1.0, min_rate=0.8, max_rate=1.5,
+                                  concurrency=1, min_concurrency=1, max_concurrency=2)
+    limiter.on_throttle(0)
+    assert limiter.rate == 0.8
+    assert limiter.concurrency == 1
+    for _ in range(100):
+        limiter.on_success()
+    assert limiter.rate == 1.5
+    assert limiter.concurrency == 2
+
+
+@pytest.mark.parametrize(
+    "value, expected",
+    [("3", 3.0), ("0.5", 0.5), (None, None), ("Wed, 21 Oct 2015 07:28:00 GMT", None)],
+)
+def test_parse_retry_after(value, expected):
+    """Тестирует разбор заголовка Retry-After."""
+    assert parse_retry_after(value) == expected
+
+
+def test_maxlag_param():
+    """Тестирует передачу параметра maxlag."""
+    assert AdaptiveRateLimiter(maxlag=5).params == {"maxlag": 5}
+    assert AdaptiveRateLimiter(maxlag=None).params == {}
+
+
+@pytest.mark.asyncio
+async def test_concurrency_limit():
+    """Тестирует ограничение числа одновременных запросов."""
+    limiter = AdaptiveRateLimiter(rate=1000.0, burst=1000, concurrency=2)
+    active = 0
+    peak = 0
+
+    async def request():
+        nonlocal active, peak
+        async with limiter:
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.01)
+            active -= 1
+
+    await asyncio.gather(*(request() for _ in range(6)))
+    assert peak == 2
+    assert limiter.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_token_bucket_waits_for_tokens():
+    """Тестирует ожидание токена, когда ёмкость bucket исчерпана."""
+    limiter = AdaptiveRateLimiter(rate=10.0, burst=1)
+    with patch("asyncio.sleep", new=AsyncMock(return_value=None)) as mock_sleep:
+        async with limiter:
+            pass
+        async with limiter:
+            pass
+    assert mock_sleep.call_count == 1
+    assert mock_sleep.await_args.args[0] == pytest.approx(0.1, abs=0.02)
+
+
+@pytest.mark.asyncio
+async def test_fetch_titles_retries_on_maxlag():
+    """Тестирует повтор запроса после ошибки maxlag с общей паузой."""
+    def make_response(data, headers=None):
+        response = MagicMock()
+        response.__aenter__ = AsyncMock(return_value=response)
+        response.__aexit__ = AsyncMock(return_value=None)
+        response.status = 200
+        response.headers = headers or {}
+        response.json = AsyncMock(return_value=data)
+        response.raise_for_status = MagicMock(return_value=None)
+        return response
+
+    mock_session = AsyncMock(spec=aiohttp.ClientSession)
+    mock_session.get.side_effect = [
+        make_response({"error": {"code": "maxlag", "lag": 7}}, {"Retry-After": "5"}),
+        make_response({"query": {"categorymembers": [{"title": "Аист"}]}}),
+    ]
+    limiter = AdaptiveRateLimiter(maxlag=3)
+    titles = {}
+    with patch("asyncio.sleep", new=AsyncMock(return_value=None)) as mock_sleep:
+        await fetch_titles("А", "TestCategory", mock_session, limiter, titles)
+    assert titles == {"Аист": 1}
+    assert limiter.throttled == 1
+    assert mock_sleep.await_args.args[0] == pytest.approx(5, abs=0.1)
+    assert mock_session.get.call_args.kwargs["params"]["maxlag"] == 3
+
+
+@pytest.mark.asyncio
+async def test_cancel_while_waiting_releases_slot():
+    """Тестирует, что отмена во время ожидания токена не занимает слот навсегда."""
+    limiter = AdaptiveRateLimiter(rate=1.0, burst=1, concurrency=1)
+    async with limiter:
+        pass
+    task = asyncio.create_task(limiter.acquire())
+    await asyncio.sleep(0.01)  # токенов нет — задача ждёт в asyncio.sleep
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+    assert limiter.in_flight == 0
+    limiter.tokens = 1.0
+    await asyncio.wait_for(limiter.acquire(), timeout=1)
+    assert limiter.in_flight == 1
+
+
+def test_limiter_reused_across_event_loops(fake_wiki, fast_limiter):
+    """Тестирует два обхода с одним ограничителем: каждый asyncio.run — новый цикл событий."""
+    category = SyntheticCategory(size=3000, seed=2)
+    fake_wiki(category)
+    limiter = fast_limiter()
+    first = get_category_members_api(category.name, limiter)
+    second = get_category_members_api(category.name, limiter)
+    assert set(first) == set(second) == set(category.titles)
+    assert limiter.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_collect_category_titles_reraises_range_errors():
+    """Тестирует, что ошибка диапазона не превращается в неполный результат."""
+    async def failing_fetch_titles(part, *args):
+        if part.start == "В":
+            raise RuntimeError("сбой диапазона")
+
+    with patch("task2.solution.fetch_titles", side_effect=failing_fetch_titles):
+        with pytest.raises(RuntimeError, match="сбой диапазона"):
+            await collect_category_titles("Cat", None, AdaptiveRateLimiter())
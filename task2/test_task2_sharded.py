@@ -0,0 +1,67 @@
+import asyncio
+import logging
+from array import array
+
+from .fake_wiki import SyntheticCategory
+from .sharded import (NO_LETTER, BudgetedRateLimiter, ShardResult, SharedRequestBudget,
+                      count_sharded, make_shards, merge_shards)
+from .solution import SortkeyRange, get_partitions, get_prefixes
+
+
+logging.getLogger().setLevel(logging.CRITICAL)
+
+
+def test_make_shards_interleaves_partitions():
+    """Тестирует чередование диапазонов по шардам без потерь и пересечений."""
+    partitions = get_partitions(get_prefixes(length=1))
+    shards = make_shards(partitions, 4)
+    assert len(shards) == 4
+    assert shards[0][:2] == [partitions[0], partitions[4]]
+    assert sorted(part for shard in shards for part in shard) == sorted(partitions)
+    assert make_shards([SortkeyRange("А")], 3) == [[SortkeyRange("А")]]
+
+
+def test_merge_shards_drops_cross_shard_duplicates():
+    """Тестирует слияние счётчиков с вычитанием страниц из нескольких шардов."""
+    first = ShardResult(array('q', [2, 1] + [0] * 31), array('q', [10, 11, 12, 13]),
+                        bytes([0, 0, 1, NO_LETTER]), 1)
+    second = ShardResult(array('q', [0, 1] + [0] * 31), array('q', [12, 13]),
+                         bytes([1, NO_LETTER]), 1)
+    assert merge_shards([first, second]) == {"А": 2, "Б": 1}
+
+
+def test_shared_budget_spaces_requests():
+    """Тестирует общий темп запросов и паузу после троттлинга."""
+    budget = SharedRequestBudget(rate=100.0)
+    waits = [budget.reserve() for _ in range(5)]
+    assert waits[0] < 0.005
+    assert 0.035 < waits[4] <= 0.041
+    budget.pause(1.0)
+    assert budget.reserve() > 0.9
+
+
+def test_budget_wait_cancel_releases_slot():
+    """Тестирует, что отмена во время ожидания общего бюджета освобождает слот."""
+    budget = SharedRequestBudget(rate=100.0)
+    budget.pause(10.0)
+    limiter = BudgetedRateLimiter(budget, rate=1000.0, burst=10, concurrency=1)
+
+    async def run():
+        task = asyncio.create_task(limiter.acquire())
+        await asyncio.sleep(0.01)
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+
+    asyncio.run(run())
+    assert limiter.in_flight == 0
+
+
+def test_sharded_crawl_matches_category(fake_wiki):
+    """Тестирует многопроцессный обход локальной категории."""
+    category = SyntheticCategory(size=6000, seed=4)
+    fake_wiki(category)
+    counts = count_sharded(category.name, workers=2, max_rate=1000.0, shards=3)
+    assert counts == category.letter_counts()
@@ -0,0 +1,99 @@
+import logging
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock, MagicMock
+
+import aiohttp
+import pytest
+
+from .storage import MemberStore, first_letter, refresh_store
+
+
+logging.getLogger().setLevel(logging.CRITICAL)
+
+
+def make_response(data: dict) -> MagicMock:
+    response = MagicMock()
+    response.__aenter__ = AsyncMock(return_value=response)
+    response.__aexit__ = AsyncMock(return_value=None)
+    response.status = 200
+    response.json = AsyncMock(return_value=data)
+    response.raise_for_status = MagicMock(return_value=None)
+    return response
+
+
+def member(pageid: int, title: str, timestamp: str) -> dict:
+    return {"pageid": pageid, "ns": 0, "title": title, "sortkeyprefix": "",
+            "timestamp": timestamp}
+
+
+@pytest.fixture
+def store():
+    with MemberStore(":memory:") as store:
+        yield store
+
+
+def test_first_letter():
+    """Тестирует определение первой буквы заголовка."""
+    assert first_letter("аист") == "А"
+    assert first_letter("Ёж") == "Ё"
+    assert first_letter("Aardvark") is None
+    assert first_letter("") is None
+
+
+def test_store_upsert_and_counts(store):
+    """Тестирует запись участников и подсчёт по буквам."""
+    store.upsert("Cat", [member(1, "Аист", "2020-01-01T00:00:00Z"),
+                         member(2, "Бобр", "2020-01-02T00:00:00Z"),
+                         member(3, "Zebra", "2020-01-03T00:00:00Z")])
+    store.upsert("Cat", [member(1, "Аист белый", "2020-01-01T00:00:00Z")])
+    store.upsert("Other", [member(4, "Волк", "2020-01-01T00:00:00Z")])
+    assert store.letter_counts("Cat") == {"А": 1, "Б": 1}
+    assert store.pageids("Cat") == {1, 2, 3}
+    store.remove("Cat", [2])
+    assert store.letter_counts("Cat") == {"А": 1}
+
+
+@pytest.mark.asyncio
+async def test_refresh_store_full_then_incremental(store):
+    """Тестирует полную синхронизацию, затем получение только новых страниц."""
+    store.upsert("Cat", [member(99, "Удалённая", "2019-01-01T00:00:00Z")])
+    session = AsyncMock(spec=aiohttp.ClientSession)
+    session.get.side_effect = [
+        make_response({
+            "query": {"categorymembers": [member(1, "Аист", "2020-01-01T00:00:00Z")]},
+            "continue": {"cmcontinue": "next"},
+        }),
+        make_response({
+            "query": {"categorymembers": [member(2, "Бобр", "2020-02-01T00:00:00Z")]},
+        }),
+    ]
+    assert await refresh_store(store, "Cat", session) == (2, 1)
+    assert store.letter_counts("Cat") == {"А": 1, "Б": 1}
+    last_timestamp, last_full_sync = store.sync_state("Cat")
+    assert last_timestamp == "2020-02-01T00:00:00Z"
+    assert last_full_sync is not None
+
+    session.get.reset_mock()
+    session.get.side_effect = [make_response({
+        "query": {"categorymembers": [member(2, "Бобр", "2020-02-01T00:00:00Z"),
+                                      member(3, "Волк", "2020-03-01T00:00:00Z")]},
+    })]
+    assert await refresh_store(store, "Cat", session) == (2, 0)
+    params = session.get.call_args.kwargs["params"]
+    assert params["cmsort"] == "timestamp"
+    assert params["cmstart"] == "2020-02-01T00:00:00Z"
+    assert store.letter_counts("Cat") == {"А": 1, "Б": 1, "В": 1}
+    assert store.sync_state("Cat")[0] == "2020-03-01T00:00:00Z"
+
+
+@pytest.mark.asyncio
+async def test_refresh_store_reconciles_when_stale(store):
+    """Тестирует полную сверку, если последняя была давно."""
+    store.upsert("Cat", [member(1, "Аист", "2020-01-01T00:00:00Z")])
+    store.save_sync_state("Cat", "2020-01-01T00:00:00Z",
+                          datetime.now(timezone.utc) - timedelta(days=30))
+    session = AsyncMock(spec=aiohttp.ClientSession)
+    session.get.return_value = make_response({"query": {"categorymembers": []}})
+    assert await refresh_store(store, "Cat", session) == (0, 1)
+    assert "cmsort" not in session.get.call_args.kwargs["params"]
+    assert store.letter_counts("Cat") == {}
@@ -6,6 +6,8 @@ from unittest.mock import Mock, patch
 
 import pytest
 
+from .http_client import HttpClient
+from .metrics import Metrics
 from .solution_sync import count_animals_by_letter, get_category_members_api, write_to_csv
 
 
@@ -57,12 +59,30 @@ def test_get_category_members_api_success(mock_api_response: dict) -> None:
     ]
     mock_response.raise_for_status.return_value = None
 
-    with patch("requests.get", return_value=mock_response):
+    with patch.object(HttpClient, "get", return_value=mock_response):
         titles = get_category_members_api("TestCategory")
         assert titles == {"Аардварк", "Бегемот", "123 Не животное", "Волк"}
         assert len(titles) == 4
 
 
+def test_get_category_members_api_observes_json_decode(mock_api_response: dict) -> None:
+    """
+    Тестирует замер времени декодирования JSON в синхронном обходе.
+    """
+    mock_response = Mock()
+    mock_response.json.side_effect = [
+        mock_api_response,
+        {"query": {"categorymembers": [{"title": "Волк"}]}},
+    ]
+    mock_response.raise_for_status.return_value = None
+    metrics = Metrics()
+
+    with patch.object(HttpClient, "get", return_value=mock_response), \
+            patch("task2.solution_sync.time.sleep"):
+        get_category_members_api("TestCategory", HttpClient(metrics=metrics))
+    assert metrics.to_dict()["histograms"]["json_decode_seconds"]["count"] == 2
+
+
 def test_get_category_members_api_empty(mock_api_response_empty: dict) -> None:
     """
     Тестирует обработку пустой категории.
@@ -71,7 +91,7 @@ def test_get_category_members_api_empty(mock_api_response_empty: dict) -> None:
     mock_response.json.return_value = mock_api_response_empty
     mock_response.raise_for_status.return_value = None
 
-    with patch("requests.get", return_value=mock_response):
+    with patch.object(HttpClient, "get", return_value=mock_response):
         titles = get_category_members_api("EmptyCategory")
         assert titles == set()
         assert len(titles) == 0
@@ -84,7 +104,7 @@ def test_get_category_members_api_error() -> None:
     mock_response = Mock()
     mock_response.raise_for_status.side_effect = requests.RequestException("API error")
 
-    with patch("requests.get", return_value=mock_response):
+    with patch.object(HttpClient, "get", return_value=mock_response):
         titles = get_category_members_api("ErrorCategory")
         assert titles == set()
         assert len(titles) == 0
@@ -106,7 +126,7 @@ def test_count_animals_by_letter(titles: list[str], expected_counts: dict[str, i
     """
     Тестирует подсчёт страниц по кириллическим буквам.
     """
-    with patch("task2.solution_sync.get_category_members_api", return_value=titles):
+    with patch("task2.solution_sync.iter_category_members_api", return_value=iter(titles)):
         result = count_animals_by_letter()
         assert result == expected_counts
 
@@ -0,0 +1,93 @@
+import asyncio
+import logging
+from unittest.mock import patch
+
+import pytest
+
+from .rate_limit import AdaptiveRateLimiter
+from .tree import CategoryTreeCrawler, category_title
+
+
+logging.getLogger().setLevel(logging.CRITICAL)
+
+
+def page(pageid, title):
+    return {"pageid": pageid, "ns": 0, "title": title, "type": "page"}
+
+
+def subcat(pageid, title):
+    return {"pageid": pageid, "ns": 14, "title": title, "type": "subcat"}
+
+
+# Корень → Птицы → Хищные → Птицы (цикл); Аист есть и в корне, и в Птицах
+TREE = {
+    "Категория:Животные": [[page(1, "Аист"), subcat(100, "Категория:Птицы")],
+                           [page(2, "Бобр"), subcat(101, "Категория:Звери")]],
+    "Категория:Птицы": [[page(1, "Аист"), page(3, "Воробей"),
+                         subcat(102, "Категория:Хищные птицы")]],
+    "Категория:Звери": [[page(4, "Волк"), subcat(100, "Категория:Птицы")]],
+    "Категория:Хищные птицы": [[page(5, "Ястреб"), subcat(100, "Категория:Птицы"),
+                                subcat(99, "Категория:Животные")]],
+}
+
+
+def fake_iter_tree_members(cmtitle, session, limiter):
+    async def pages():
+        for members in TREE[cmtitle]:
+            yield members
+    return pages()
+
+
+async def crawl(max_depth=None, workers=4):
+    crawler = CategoryTreeCrawler(None, AdaptiveRateLimiter(), max_depth=max_depth,
+                                  workers=workers)
+    with patch("task2.tree.iter_tree_members", side_effect=fake_iter_tree_members) as mock:
+        result = await crawler.crawl("Животные")
+    return crawler, result, [call.args[0] for call in mock.call_args_list]
+
+
+def test_category_title():
+    """Тестирует добавление префикса пространства имён."""
+    assert category_title("Животные") == "Категория:Животные"
+    assert category_title("Категория:Животные") == "Категория:Животные"
+
+
+@pytest.mark.asyncio
+async def test_tree_crawl_dedups_pages_and_breaks_cycles():
+    """Тестирует обход всего дерева: каждая категория и страница учитываются один раз."""
+    crawler, result, visited = await crawl()
+    assert result == {"А": 1, "Б": 1, "В": 2, "Я": 1}
+    assert sorted(visited) == sorted(TREE)
+    assert crawler.categories == 4
+    assert crawler.counter.duplicates == 1
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "max_depth, expected",
+    [(0, {"А": 1, "Б": 1}), (1, {"А": 1, "Б": 1, "В": 2})],
+)
+async def test_tree_crawl_respects_max_depth(max_depth, expected):
+    """Тестирует ограничение глубины обхода."""
+    _, result, visited = await crawl(max_depth=max_depth)
+    assert result == expected
+    assert "Категория:Хищные птицы" not in visited
+
+
+@pytest.mark.asyncio
+async def test_tree_crawl_survives_worker_errors():
+    """Тестирует, что ошибки вне aiohttp не убивают воркеров и обход завершается."""
+    def failing_iter_tree_members(cmtitle, session, limiter):
+        if cmtitle == "Категория:Животные":
+            return fake_iter_tree_members(cmtitle, session, limiter)
+
+        async def pages():
+            raise KeyError("query")
+            yield
+        return pages()
+
+    crawler = CategoryTreeCrawler(None, AdaptiveRateLimiter(), workers=1)
+    with patch("task2.tree.iter_tree_members", side_effect=failing_iter_tree_members):
+        result = await asyncio.wait_for(crawler.crawl("Животные"), timeout=5)
+    assert result == {"А": 1, "Б": 1}
+    assert crawler.categories == 3
@@ -0,0 +1,155 @@
+"""
+Подсчёт букв по всему дереву категории: страницы подкатегорий тоже учитываются.
+
+Обход в ширину: очередь категорий разбирают `workers` воркеров, все запросы
+идут через одну сессию и общий `AdaptiveRateLimiter`, поэтому подкатегории
+обрабатываются параллельно в пределах общего бюджета запросов. Страницы
+дедуплицируются по pageid (битовая карта), подкатегории — тоже по pageid,
+что защищает от циклов в графе категорий; глубина ограничена `max_depth`.
+"""
+import argparse
+import asyncio
+import logging
+import time
+from collections.abc import AsyncIterator
+
+import aiohttp
+
+from .pipeline import LetterCounter, PageIdSet
+from .rate_limit import AdaptiveRateLimiter
+from .solution import request_json, write_to_csv
+
+logger = logging.getLogger(__name__)
+
+CATEGORY_NAMESPACE = 14
+CATEGORY_PREFIX = "Категория:"
+
+
+def category_title(category: str) -> str:
+    """Полное название категории с префиксом пространства имён."""
+    return category if category.startswith(CATEGORY_PREFIX) else f"{CATEGORY_PREFIX}{category}"
+
+
+async def iter_tree_members(cmtitle: str, session: aiohttp.ClientSession,
+                            limiter: AdaptiveRateLimiter) -> AsyncIterator[list[dict]]:
+    """Постранично отдаёт страницы и подкатегории одной категории."""
+    params: dict[str, str | int] = {
+        "action": "query",
+        "list": "categorymembers",
+        "cmtitle": cmtitle,
+        "cmtype": "page|subcat",
+        "cmprop": "ids|title|type",
+        "cmlimit": 500,
+        "format": "json",
+    }
+    while True:
+        data = await request_json(session, limiter, params, cmtitle)
+        if "error" in data:
+            logger.error(f"API ошибка для '{cmtitle}': {data['error']}")
+            return
+        yield data.get("query", {}).get("categorymembers", [])
+        if "continue" not in data:
+            return
+        params["cmcontinue"] = data["continue"]["cmcontinue"]
+
+
+def is_subcategory(member: dict) -> bool:
+    return member.get("type") == "subcat" or member.get("ns") == CATEGORY_NAMESPACE
+
+
+class CategoryTreeCrawler:
+    """Параллельный обход дерева категорий в ширину."""
+
+    def __init__(self, session: aiohttp.ClientSession,
+                 limiter: AdaptiveRateLimiter | None = None,
+                 max_depth: int | None = None, workers: int = 8,
+                 counter: LetterCounter | None = None):
+        """
+        :param max_depth: глубина подкатегорий (0 — только сама категория, None — без ограничения)
+        :param workers: сколько категорий обходится одновременно; число одновременных
+            запросов дополнительно ограничено `limiter`
+        """
+        self.session = session
+        self.limiter = limiter or AdaptiveRateLimiter()
+        self.max_depth = max_depth
+        self.workers = workers
+        self.counter = counter or LetterCounter()
+        self.seen_categories = PageIdSet()
+        self.categories = 0
+
+    async def crawl(self, category: str) -> dict[str, int]:
+        """Обходит дерево от `category` и возвращает счётчики букв."""
+        root = category_title(category)
+        queue: asyncio.Queue[tuple[str, int]] = asyncio.Queue()
+        queue.put_nowait((root, 0))
+        workers = [asyncio.create_task(self._worker(queue, root))
+                   for _ in range(self.workers)]
+        try:
+            await queue.join()
+        finally:
+            for worker in workers:
+                worker.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+        logger.info(f"Обойдено категорий: {self.categories}, "
+                    f"уникальных страниц: {len(self.counter.seen)}, "
+                    f"повторов: {self.counter.duplicates}")
+        return self.counter.snapshot()
+
+    async def _worker(self, queue: asyncio.Queue, root: str) -> None:
+        while True:
+            cmtitle, depth = await queue.get()
+            try:
+                await self._crawl_category(cmtitle, depth, queue, root)
+            except Exception:
+                # Воркер не должен умирать: иначе queue.join() может ждать вечно
+                logger.exception(f"Ошибка для категории '{cmtitle}'")
+            finally:
+                queue.task_done()
+
+    async def _crawl_category(self, cmtitle: str, depth: int,
+                              queue: asyncio.Queue, root: str) -> None:
+        self.categories += 1
+        logger.info(f"Категория '{cmtitle}' (глубина {depth})")
+        descend = self.max_depth is None or depth < self.max_depth
+        async for members in iter_tree_members(cmtitle, self.session, self.limiter):
+            pages = []
+            for member in members:
+                if not is_subcategory(member):
+                    pages.append(member)
+                elif (descend and member["title"] != root
+                        and self.seen_categories.add(member["pageid"])):
+                    queue.put_nowait((member["title"], depth + 1))
+            self.counter.add_page(pages)
+
+
+async def count_tree_by_letter(category: str, session: aiohttp.ClientSession,
+                               limiter: AdaptiveRateLimiter | None = None,
+                               max_depth: int | None = None, workers: int = 8) -> dict[str, int]:
+    crawler = CategoryTreeCrawler(session, limiter, max_depth=max_depth, workers=workers)
+    return await crawler.crawl(category)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Подсчёт по буквам по дереву категории")
+    parser.add_argument("--category", default="Животные по алфавиту")
+    parser.add_argument("--max-depth", type=int, default=None,
+                        help="глубина подкатегорий (по умолчанию без ограничения)")
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--output", default="beasts.csv")
+    args = parser.parse_args()
+
+    start_time = time.time()
+
+    async def run() -> dict[str, int]:
+        async with aiohttp.ClientSession() as session:
+            return await count_tree_by_letter(args.category, session,
+                                              max_depth=args.max_depth, workers=args.workers)
+
+    letter_counts = asyncio.run(run())
+    write_to_csv(letter_counts, filename=args.output)
+    logger.info(f"Подсчитано заголовков: {sum(letter_counts.values())}")
+    logger.info(f"Время выполнения: {time.time() - start_time:.2f} секунд")
+
+
+if __name__ == "__main__":
+    main()
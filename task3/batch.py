@@ -0,0 +1,116 @@
+"""
+Подсчёт `appearance` для большого числа уроков за один вызов.
+
+Уроки передаются либо итерируемым словарей, как для `appearance`, либо в
+упакованном виде `PackedLessons`: все таймстемпы подряд в одном
+`array('q')` и массив смещений, где у каждого урока три отрезка — lesson,
+pupil и tutor. Большие батчи делятся на куски по `chunk_size` уроков и
+считаются в `ProcessPoolExecutor`; кусок уходит в процесс как два
+массива, а не как список словарей. Маленькие батчи считаются в текущем
+процессе.
+
+Движок расчёта: "python" (`merged_runs` и `intersection_length` по урокам)
+или "numpy" (`task3.vectorized`, весь кусок разом); "auto" выбирает NumPy,
+если он установлен.
+"""
+import os
+from array import array
+from collections.abc import Iterable
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from itertools import chain
+from typing import NamedTuple
+
+from . import vectorized
+from .solution import appearance, intersection_length, merged_runs
+
+ROLES = ('lesson', 'pupil', 'tutor')
+DEFAULT_CHUNK_SIZE = 5000
+ENGINES = ('auto', 'python', 'numpy')
+
+
+class PackedLessons(NamedTuple):
+    """
+    Уроки в плоском виде: отрезок роли `r` урока `k` —
+    `timestamps[offsets[3 * k + r]:offsets[3 * k + r + 1]]` (r — индекс в ROLES).
+    """
+    timestamps: array
+    offsets: array
+
+    def __len__(self) -> int:
+        return (len(self.offsets) - 1) // len(ROLES)
+
+    def chunk(self, first: int, last: int) -> "PackedLessons":
+        """Уроки [first, last) с отдельной копией массивов (смещения от нуля)."""
+        offsets = self.offsets[len(ROLES) * first:len(ROLES) * last + 1]
+        base = offsets[0]
+        return PackedLessons(self.timestamps[base:offsets[-1]],
+                             array('q', [offset - base for offset in offsets]))
+
+
+def pack_lessons(lessons: Iterable[dict[str, list[int]]]) -> PackedLessons:
+    timestamps = array('q')
+    offsets = array('q', [0])
+    for intervals in lessons:
+        for role in ROLES:
+            timestamps.extend(intervals[role])
+            offsets.append(len(timestamps))
+    return PackedLessons(timestamps, offsets)
+
+
+def resolve_engine(engine: str) -> str:
+    if engine not in ENGINES:
+        raise ValueError(f"Неизвестный движок: {engine}")
+    if engine == 'auto':
+        return 'numpy' if vectorized.HAS_NUMPY else 'python'
+    if engine == 'numpy' and not vectorized.HAS_NUMPY:
+        raise ImportError("Движок numpy недоступен: NumPy не установлен")
+    return engine
+
+
+def appearance_packed(lessons: PackedLessons, engine: str = 'auto') -> list[int]:
+    """`appearance` для каждого упакованного урока."""
+    if resolve_engine(engine) == 'numpy':
+        return vectorized.appearance_packed_numpy(*lessons).tolist()
+    return appearance_packed_python(lessons).tolist()
+
+
+def appearance_packed_python(lessons: PackedLessons) -> array:
+    timestamps, offsets = lessons
+    results = array('q')
+    for index in range(0, len(offsets) - 1, len(ROLES)):
+        lesson_start, lesson_end = timestamps[offsets[index]:offsets[index + 1]]
+        pupil = merged_runs(timestamps[offsets[index + 1]:offsets[index + 2]],
+                            lesson_start, lesson_end)
+        tutor = merged_runs(timestamps[offsets[index + 2]:offsets[index + 3]],
+                            lesson_start, lesson_end)
+        results.append(intersection_length(pupil, tutor))
+    return results
+
+
+def appearance_many(lessons: Iterable[dict[str, list[int]]] | PackedLessons,
+                    chunk_size: int = DEFAULT_CHUNK_SIZE,
+                    workers: int | None = None, engine: str = 'auto') -> list[int]:
+    """
+    Результаты `appearance` для всех уроков в исходном порядке.
+
+    :param chunk_size: уроков в одной задаче пула процессов; батч не больше
+        двух кусков (или `workers=1`) считается без пула
+    :param workers: число процессов (по умолчанию — по числу ядер)
+    :param engine: "auto", "python" или "numpy"
+    """
+    workers = workers or os.cpu_count() or 1
+    engine = resolve_engine(engine)
+    if not isinstance(lessons, PackedLessons):
+        lessons = list(lessons)
+        if engine == 'python' and (workers == 1 or len(lessons) <= 2 * chunk_size):
+            return [appearance(intervals) for intervals in lessons]
+        lessons = pack_lessons(lessons)
+    if workers == 1 or len(lessons) <= 2 * chunk_size:
+        return appearance_packed(lessons, engine)
+
+    chunks = (lessons.chunk(first, min(first + chunk_size, len(lessons)))
+              for first in range(0, len(lessons), chunk_size))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(chain.from_iterable(
+            executor.map(partial(appearance_packed, engine=engine), chunks)))
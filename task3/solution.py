@@ -1,39 +1,50 @@
-from enum import IntEnum
-
-
-class Action(IntEnum):
-    ENTER = 1
-    EXIT = -1
+from collections.abc import Sequence
+
+
+def merged_runs(timestamps: Sequence[int], lesson_start: int, lesson_end: int) -> list[int]:
+    """
+    Интервалы присутствия одного участника, обрезанные по уроку и объединённые:
+    плоский список [start0, end0, start1, end1, ...] с возрастающими непересекающимися
+    интервалами. Пустые и перевёрнутые интервалы отбрасываются.
+    """
+    starts: Sequence[int] = range(0, len(timestamps) - 1, 2)
+    # Обычно интервалы уже упорядочены по входу — тогда сортировка не нужна
+    if any(timestamps[i] > timestamps[i + 2] for i in range(0, len(timestamps) - 3, 2)):
+        starts = sorted(starts, key=timestamps.__getitem__)
+
+    runs: list[int] = []
+    for i in starts:
+        start = max(timestamps[i], lesson_start)
+        end = min(timestamps[i + 1], lesson_end)
+        if start >= end:
+            continue
+        if runs and start <= runs[-1]:
+            if end > runs[-1]:
+                runs[-1] = end
+        else:
+            runs.append(start)
+            runs.append(end)
+    return runs
+
+
+def intersection_length(first: Sequence[int], second: Sequence[int]) -> int:
+    """Суммарная длина пересечения двух наборов интервалов из `merged_runs`."""
+    total = i = j = 0
+    while i < len(first) and j < len(second):
+        start = max(first[i], second[j])
+        end = min(first[i + 1], second[j + 1])
+        if start < end:
+            total += end - start
+        # Сдвигаем интервал, который заканчивается раньше
+        if first[i + 1] < second[j + 1]:
+            i += 2
+        else:
+            j += 2
+    return total
 
 
 def appearance(intervals: dict[str, list[int]]) -> int:
     lesson_start, lesson_end = intervals['lesson']
-
-    events = []
-    for role in ['pupil', 'tutor']:
-        for i in range(0, len(intervals[role]), 2):
-            events.append((intervals[role][i], Action.ENTER, role))
-            events.append((intervals[role][i+1], Action.EXIT, role))
-
-    events.sort()
-
-    pupil_active = 0
-    tutor_active = 0
-    total_time = 0
-    prev_time = None
-
-    for time, action, role in events:
-        if pupil_active and tutor_active and prev_time is not None:
-            start = max(prev_time, lesson_start)
-            end = min(time, lesson_end)
-            if start < end:
-                total_time += end - start
-
-        if role == 'pupil':
-            pupil_active += action
-        else:
-            tutor_active += action
-
-        prev_time = time
-
-    return total_time
+    pupil = merged_runs(intervals['pupil'], lesson_start, lesson_end)
+    tutor = merged_runs(intervals['tutor'], lesson_start, lesson_end)
+    return intersection_length(pupil, tutor)
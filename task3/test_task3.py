@@ -1,6 +1,8 @@
+import random
+
 import pytest
 
-from .solution import appearance
+from .solution import appearance, intersection_length, merged_runs
 
 
 @pytest.mark.parametrize(
@@ -61,3 +63,39 @@ def test_appearance(intervals: dict[str, list[int]], expected: int):
     """Тестирует вычисление времени присутствия ученика и преподавателя на уроке."""
     result = appearance(intervals)
     assert result == expected, f"Ожидалось {expected}, получено {result}"
+
+
+def test_merged_runs_sorts_merges_and_clips():
+    """Тестирует нормализацию интервалов: сортировку, объединение и обрезку по уроку."""
+    assert merged_runs([5, 8, 1, 3, 2, 4, 8, 9, 12, 12, 20, 30], 2, 25) == [2, 4, 5, 9, 20, 25]
+    assert merged_runs([1, 3, 3, 6], 0, 10) == [1, 6]
+    assert merged_runs([7, 5, 11, 15], 0, 10) == []
+    assert merged_runs([], 0, 10) == []
+
+
+def test_intersection_length():
+    """Тестирует пересечение двух наборов интервалов методом двух указателей."""
+    assert intersection_length([1, 5, 7, 10], [0, 2, 4, 8, 9, 20]) == 1 + 1 + 1 + 1
+    assert intersection_length([1, 5], []) == 0
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_appearance_matches_brute_force(seed: int):
+    """Тестирует совпадение со счётом по секундам на случайных пересекающихся интервалах."""
+    rng = random.Random(seed)
+
+    def random_intervals() -> list[int]:
+        timestamps = []
+        for _ in range(rng.randint(0, 8)):
+            start = rng.randint(0, 90)
+            timestamps += [start, start + rng.randint(0, 20)]
+        return timestamps
+
+    intervals = {'lesson': [20, 80], 'pupil': random_intervals(), 'tutor': random_intervals()}
+
+    def seconds(timestamps: list[int]) -> set[int]:
+        return {second for start, end in zip(timestamps[::2], timestamps[1::2])
+                for second in range(max(start, 20), min(end, 80))}
+
+    expected = len(seconds(intervals['pupil']) & seconds(intervals['tutor']))
+    assert appearance(intervals) == expected
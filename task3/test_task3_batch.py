@@ -0,0 +1,69 @@
+import random
+
+import pytest
+
+from .batch import (PackedLessons, appearance_many, appearance_packed, pack_lessons,
+                    resolve_engine)
+from .solution import appearance
+
+
+def random_lessons(count: int, seed: int = 0) -> list[dict[str, list[int]]]:
+    rng = random.Random(seed)
+
+    def random_intervals() -> list[int]:
+        timestamps = []
+        for _ in range(rng.randint(0, 6)):
+            start = rng.randint(0, 4000)
+            timestamps += [start, start + rng.randint(0, 1500)]
+        return timestamps
+
+    return [{'lesson': [600, 3600], 'pupil': random_intervals(), 'tutor': random_intervals()}
+            for _ in range(count)]
+
+
+def test_pack_lessons_layout():
+    """Тестирует упаковку уроков в массив таймстемпов и смещений."""
+    lessons = [{'lesson': [0, 10], 'pupil': [1, 5], 'tutor': []},
+               {'lesson': [0, 10], 'pupil': [], 'tutor': [2, 3, 4, 6]}]
+    packed = pack_lessons(lessons)
+    assert len(packed) == 2
+    assert packed.timestamps.tolist() == [0, 10, 1, 5, 0, 10, 2, 3, 4, 6]
+    assert packed.offsets.tolist() == [0, 2, 4, 4, 6, 6, 10]
+    second = packed.chunk(1, 2)
+    assert second.timestamps.tolist() == [0, 10, 2, 3, 4, 6]
+    assert second.offsets.tolist() == [0, 2, 2, 6]
+    assert appearance_packed(packed, engine='python') == [0, 0]
+
+
+@pytest.mark.parametrize("packed", [False, True], ids=["dicts", "packed"])
+def test_appearance_many_in_process_pool(packed: bool):
+    """Тестирует батч, разбитый на куски для пула процессов, в исходном порядке."""
+    lessons = random_lessons(1000)
+    expected = [appearance(intervals) for intervals in lessons]
+    batch = pack_lessons(lessons) if packed else iter(lessons)
+    assert appearance_many(batch, chunk_size=150, workers=2) == expected
+
+
+def test_small_batch_without_pool(monkeypatch):
+    """Тестирует, что маленький батч считается без пула процессов."""
+    def no_pool(*args, **kwargs):
+        raise AssertionError("пул процессов не нужен")
+
+    monkeypatch.setattr("task3.batch.ProcessPoolExecutor", no_pool)
+    lessons = random_lessons(50, seed=1)
+    expected = [appearance(intervals) for intervals in lessons]
+    assert appearance_many(lessons, chunk_size=100) == expected
+    assert appearance_many(pack_lessons(lessons), chunk_size=100) == expected
+    assert appearance_many(PackedLessons(*pack_lessons([]))) == []
+
+
+def test_engine_falls_back_without_numpy(monkeypatch):
+    """Тестирует выбор движка, когда NumPy не установлен."""
+    monkeypatch.setattr("task3.vectorized.HAS_NUMPY", False)
+    assert resolve_engine('auto') == 'python'
+    with pytest.raises(ImportError):
+        resolve_engine('numpy')
+    with pytest.raises(ValueError):
+        resolve_engine('cuda')
+    lessons = random_lessons(20, seed=2)
+    assert appearance_many(lessons) == [appearance(intervals) for intervals in lessons]
@@ -0,0 +1,83 @@
+import random
+
+import pytest
+
+from .solution import appearance
+from .tracker import LessonPresenceTracker
+
+
+def events(intervals: dict[str, list[int]]) -> list[tuple[int, str, str]]:
+    """События входа и выхода в порядке времени, как они приходят во время урока."""
+    result = []
+    for role in ('pupil', 'tutor'):
+        timestamps = intervals[role]
+        for start, end in zip(timestamps[::2], timestamps[1::2]):
+            result += [(start, 'enter', role), (end, 'exit', role)]
+    return sorted(result, key=lambda event: event[0])
+
+
+def replay(intervals: dict[str, list[int]]) -> LessonPresenceTracker:
+    tracker = LessonPresenceTracker(*intervals['lesson'])
+    for ts, action, role in events(intervals):
+        getattr(tracker, action)(role, ts)
+    return tracker
+
+
+def test_overlap_so_far_during_lesson():
+    """Тестирует совместное время посреди урока, включая открытый интервал."""
+    tracker = LessonPresenceTracker(100, 200)
+    tracker.enter('tutor', 90)
+    tracker.enter('pupil', 110)
+    assert tracker.overlap_so_far(130) == 20
+    tracker.enter('pupil', 140)  # вторая вкладка
+    tracker.exit('pupil', 150)
+    assert tracker.overlap_so_far(160) == 50
+    tracker.exit('pupil', 170)
+    assert tracker.overlap_so_far(190) == 60
+    tracker.enter('pupil', 180)
+    assert tracker.overlap_so_far(250) == 80
+
+
+def test_invalid_events():
+    tracker = LessonPresenceTracker(0, 10)
+    tracker.exit('pupil', 1)  # выход без входа не ломает счётчик
+    tracker.enter('pupil', 2)
+    tracker.enter('tutor', 3)
+    assert tracker.overlap_so_far(5) == 2
+    with pytest.raises(ValueError):
+        tracker.enter('parent', 4)
+    with pytest.raises(ValueError):
+        tracker.exit('pupil', 2)
+
+
+def test_matches_appearance_on_overlapping_pupil_intervals():
+    """Тестирует итог на логах с пересекающимися интервалами ученика из нескольких вкладок."""
+    intervals = {
+        'lesson': [1594702800, 1594706400],
+        'pupil': [
+            1594702789, 1594704500, 1594702807, 1594704542, 1594704512, 1594704513,
+            1594704564, 1594705150, 1594704581, 1594704582, 1594704734, 1594705009,
+            1594705095, 1594705096, 1594705106, 1594706480, 1594705158, 1594705773,
+            1594705849, 1594706480, 1594706500, 1594706875, 1594706502, 1594706503,
+            1594706524, 1594706524, 1594706579, 1594706641
+        ],
+        'tutor': [1594700035, 1594700364, 1594702749, 1594705148, 1594705149, 1594706463]
+    }
+    tracker = replay(intervals)
+    assert tracker.overlap_so_far(1594707000) == appearance(intervals) == 3577
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_matches_appearance_on_random_events(seed: int):
+    """Тестирует совпадение итога с `appearance` на случайных интервалах."""
+    rng = random.Random(seed)
+
+    def random_intervals() -> list[int]:
+        timestamps = []
+        for _ in range(rng.randint(0, 10)):
+            start = rng.randint(0, 120)
+            timestamps += [start, start + rng.randint(0, 30)]
+        return timestamps
+
+    intervals = {'lesson': [20, 100], 'pupil': random_intervals(), 'tutor': random_intervals()}
+    assert replay(intervals).overlap_so_far(200) == appearance(intervals)
@@ -0,0 +1,51 @@
+import random
+
+import pytest
+
+from .batch import appearance_many, pack_lessons
+from .solution import appearance
+
+np = pytest.importorskip("numpy")
+
+from .vectorized import appearance_packed_numpy  # noqa: E402
+
+
+def random_lessons(count: int, seed: int) -> list[dict[str, list[int]]]:
+    """Уроки с шумными логами: неупорядоченные, пересекающиеся, пустые и перевёрнутые интервалы."""
+    rng = random.Random(seed)
+
+    def random_intervals() -> list[int]:
+        timestamps = []
+        for _ in range(rng.choice([0, 1, 3, 30])):
+            start = rng.randint(-500, 4500)
+            timestamps += [start, start + rng.randint(-50, 900)]
+        return timestamps
+
+    lessons = []
+    for _ in range(count):
+        lesson_start = rng.randint(0, 1000)
+        lesson_end = lesson_start + rng.choice([0, 60, 3600])
+        lessons.append({'lesson': [lesson_start, lesson_end],
+                        'pupil': random_intervals(), 'tutor': random_intervals()})
+    return lessons
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_numpy_engine_matches_python(seed: int):
+    """Тестирует совпадение векторизованного движка с чистым Python на случайных уроках."""
+    lessons = random_lessons(300, seed)
+    expected = [appearance(intervals) for intervals in lessons]
+    assert appearance_packed_numpy(*pack_lessons(lessons)).tolist() == expected
+    assert appearance_many(lessons, engine='numpy', workers=1) == expected
+
+
+def test_numpy_engine_long_noisy_log():
+    """Тестирует урок с десятками тысяч переподключений."""
+    rng = random.Random(0)
+    pupil = []
+    for _ in range(20000):
+        start = rng.randint(1594702000, 1594707000)
+        pupil += [start, start + rng.randint(0, 30)]
+    lesson = {'lesson': [1594702800, 1594706400], 'pupil': pupil,
+              'tutor': [1594700035, 1594700364, 1594702749, 1594705148, 1594705149, 1594706463]}
+    assert appearance_packed_numpy(*pack_lessons([lesson])).tolist() == [appearance(lesson)]
@@ -0,0 +1,51 @@
+"""
+Совместное время ученика и учителя на уроке, который ещё идёт.
+
+`LessonPresenceTracker` получает входы и выходы по мере их появления (в
+порядке времени) и в любой момент отдаёт накопленное совместное время.
+Для каждой роли хранится только число открытых подключений: повторный вход
+из второй вкладки увеличивает счётчик, и роль присутствует, пока он
+больше нуля. Поэтому обновление — O(1), а память не растёт с числом
+событий. Итог после всех событий совпадает с `appearance`.
+"""
+
+ROLES = ('pupil', 'tutor')
+
+
+class LessonPresenceTracker:
+    __slots__ = ('lesson_start', 'lesson_end', 'active', 'overlap', 'last_ts')
+
+    def __init__(self, lesson_start: int, lesson_end: int):
+        self.lesson_start = lesson_start
+        self.lesson_end = lesson_end
+        self.active = dict.fromkeys(ROLES, 0)
+        self.overlap = 0
+        self.last_ts: int | None = None
+
+    def _joint_time(self, until: int) -> int:
+        """Совместное время от последнего события до `until` (в пределах урока)."""
+        if self.last_ts is None or not all(self.active.values()):
+            return 0
+        return max(min(until, self.lesson_end) - max(self.last_ts, self.lesson_start), 0)
+
+    def _advance(self, role: str, ts: int) -> None:
+        if role not in self.active:
+            raise ValueError(f"Неизвестная роль: {role}")
+        if self.last_ts is not None and ts < self.last_ts:
+            raise ValueError(f"События должны идти по времени: {ts} < {self.last_ts}")
+        self.overlap += self._joint_time(ts)
+        self.last_ts = ts
+
+    def enter(self, role: str, ts: int) -> None:
+        self._advance(role, ts)
+        self.active[role] += 1
+
+    def exit(self, role: str, ts: int) -> None:
+        self._advance(role, ts)
+        # Выход без входа (например, трекер запущен посреди урока) игнорируется
+        if self.active[role]:
+            self.active[role] -= 1
+
+    def overlap_so_far(self, now: int) -> int:
+        """Совместное время к моменту `now`, включая ещё открытый общий интервал."""
+        return self.overlap + self._joint_time(now)
@@ -0,0 +1,102 @@
+"""
+Векторизованный расчёт `appearance` на NumPy для целого батча уроков.
+
+NumPy — необязательная зависимость: без него `HAS_NUMPY` ложно, и
+`task3.batch` считает на чистом Python. Вход — упакованные уроки
+(`timestamps` и `offsets`, см. `task3.batch.PackedLessons`).
+
+Все интервалы батча обрабатываются разом. Концы интервалов переводятся в
+общую шкалу `урок * span + (t - начало урока)`: в ней уроки не пересекаются
+и идут по порядку, поэтому одна сортировка и один `np.maximum.accumulate`
+объединяют интервалы сразу всех уроков. Пересечение ученика с учителем
+считается через функцию покрытия F(x) — суммарную длину интервалов ученика
+левее x (`searchsorted` по концам интервалов): на интервал учителя [s, e)
+приходится F(e) - F(s).
+"""
+from collections.abc import Sequence
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - зависит от окружения
+    np = None
+
+HAS_NUMPY = np is not None
+
+_ROLE_COUNT = 3  # lesson, pupil, tutor — как ROLES в task3.batch
+_PUPIL, _TUTOR = 1, 2
+
+
+def _merged_runs(timestamps, offsets, role: int, lesson_start, lesson_end, span: int):
+    """
+    Объединённые интервалы роли всех уроков в общей шкале: (начала, концы),
+    оба массива возрастают, интервалы не пересекаются.
+    """
+    lengths = np.diff(offsets)
+    lessons = len(lesson_start)
+    segment_starts = offsets[role:-1:_ROLE_COUNT]
+    segment_lengths = lengths[role::_ROLE_COUNT]
+    # Нечётный последний таймстемп отрезка, как и в чистом Python, пропускается
+    pairs = segment_lengths // 2
+    lesson_ids = np.repeat(np.arange(lessons), pairs)
+    first_pair = np.cumsum(pairs) - pairs
+    positions = (np.repeat(segment_starts, pairs)
+                 + 2 * (np.arange(pairs.sum()) - np.repeat(first_pair, pairs)))
+
+    base = lesson_start[lesson_ids]
+    starts = np.maximum(timestamps[positions], base) - base
+    ends = np.minimum(timestamps[positions + 1], lesson_end[lesson_ids]) - base
+    keep = starts < ends
+    starts = starts[keep] + lesson_ids[keep] * span
+    ends = ends[keep] + lesson_ids[keep] * span
+    if not len(starts):
+        return starts, ends
+
+    order = np.argsort(starts, kind='stable')
+    starts, ends = starts[order], ends[order]
+    reach = np.maximum.accumulate(ends)
+    # Новый интервал начинается, если он не касается уже покрытого
+    new_run = np.empty(len(starts), dtype=bool)
+    new_run[0] = True
+    new_run[1:] = starts[1:] > reach[:-1]
+    run_starts = np.flatnonzero(new_run)
+    run_ends = np.append(run_starts[1:] - 1, len(starts) - 1)
+    return starts[run_starts], reach[run_ends]
+
+
+def _coverage(starts, ends, points):
+    """Суммарная длина интервалов [starts, ends) левее каждой точки."""
+    covered = np.concatenate(([0], np.cumsum(ends - starts)))
+    finished = np.searchsorted(ends, points, side='right')
+    partial = np.zeros(len(points), dtype=np.int64)
+    inside = finished < len(starts)
+    partial[inside] = np.maximum(points[inside] - starts[finished[inside]], 0)
+    return covered[finished] + partial
+
+
+def appearance_packed_numpy(timestamps: Sequence[int], offsets: Sequence[int]):
+    """`appearance` для каждого упакованного урока; возвращает `np.ndarray` int64."""
+    if np is None:
+        raise ImportError("Для векторизованного расчёта нужен NumPy")
+    timestamps = np.asarray(timestamps, dtype=np.int64)
+    offsets = np.asarray(offsets, dtype=np.int64)
+    lessons = (len(offsets) - 1) // _ROLE_COUNT
+    if not lessons:
+        return np.zeros(0, dtype=np.int64)
+
+    lesson_offsets = offsets[0:-1:_ROLE_COUNT]
+    lesson_start = timestamps[lesson_offsets]
+    lesson_end = timestamps[lesson_offsets + 1]
+    # Ширина урока в общей шкале: интервалы разных уроков не соприкасаются
+    span = int(max((lesson_end - lesson_start).max(), 0)) + 1
+
+    pupil_starts, pupil_ends = _merged_runs(timestamps, offsets, _PUPIL,
+                                            lesson_start, lesson_end, span)
+    tutor_starts, tutor_ends = _merged_runs(timestamps, offsets, _TUTOR,
+                                            lesson_start, lesson_end, span)
+    totals = np.zeros(lessons, dtype=np.int64)
+    if not len(pupil_starts) or not len(tutor_starts):
+        return totals
+    overlap = (_coverage(pupil_starts, pupil_ends, tutor_ends)
+               - _coverage(pupil_starts, pupil_ends, tutor_starts))
+    np.add.at(totals, tutor_starts // span, overlap)
+    return totals